@@ -76,4 +76,59 @@ PATTERNS_TO_EXCLUDE = [
     r"^F-COM -",
     r"^Para BAC Credomatic",
     r"^https?://",
-]
\ No newline at end of file
+]
+
+# Columnas que la normalización de tipos convierte a fecha, hora o entero
+DATE_COLUMNS = ["Fecha de Reporte", "Fecha resolución"]
+TIME_COLUMNS = ["Hora de llegada", "Hora de salida"]
+INTEGER_COLUMNS = ["Cantidad GSM"]
+
+# Columnas con el origen de cada reporte: ruta completa del PDF y posición del
+# reporte dentro del archivo (un PDF puede contener varios reportes seguidos)
+FILE_PATH_COLUMN = "Ruta del Archivo"
+REPORT_INDEX_COLUMN = "Reporte en el Archivo"
+
+# Columnas derivadas por la normalización de tipos
+PAPELERIA_TOTAL_COLUMN = "Cantidad total de papelería"
+VISIT_DURATION_COLUMN = "Duración de la visita (min)"
+
+# Sufijo de las columnas que conservan los valores que no se pudieron convertir
+UNPARSED_SUFFIX = " (sin normalizar)"
+
+# Sufijo de las columnas con el desplazamiento GMT de cada hora, en minutos
+TIME_OFFSET_SUFFIX = " (desplazamiento GMT, min)"
+
+# Límites de las exportaciones a Excel: filas de datos por hoja (el máximo de
+# Excel, 1.048.576 filas, menos el encabezado) y tamaño estimado por archivo (MB)
+EXCEL_MAX_ROWS_PER_SHEET = 1048576 - 1
+EXCEL_DEFAULT_MAX_MB_PER_FILE = 200
+
+# Campos de terminal con pocos valores distintos; en el resultado final se
+# guardan como categorías (un código por celda) en lugar de texto
+CATEGORY_FIELDS = [
+    "Modelo de Terminal",
+    "Esta serie fue",
+    "Esta serie lleva SIM",
+    "Actualización en Sistema Adquirente",
+]
+
+# Detección previa del formulario: un PDF se considera un reporte F-COM si sus
+# metadatos o alguna línea de la primera página coinciden con un marcador, o si
+# la primera página contiene al menos FORM_MIN_SIGNATURE_TITLES títulos firma
+FORM_MARKER_PATTERNS = [
+    r"^F-COM -",
+]
+FORM_METADATA_MARKERS = ["F-COM"]
+FORM_SIGNATURE_TITLES = [
+    "Fecha de Reporte",
+    "Correlativo",
+    "Indique número de SS",
+    "#Oportunidad",
+    "Número Afiliado Gestión Afiliado principal",
+    "Nombre del Afiliado",
+]
+FORM_MIN_SIGNATURE_TITLES = 2
+
+# Títulos de encabezado que marcan el inicio de un reporte; si vuelven a aparecer
+# en otra página, el PDF contiene varios reportes seguidos
+REPORT_BOUNDARY_TITLES = ["Fecha de Reporte", "Correlativo"]
@@ -0,0 +1,1148 @@
+# data_export.py
+
+"""
+Funciones para exportar los datos extraídos a archivos Excel, CSV, Parquet y
+a bases de datos SQLite (ver sqlite_export.py).
+Permite crear archivos nuevos o añadir filas a una exportación existente
+conservando el orden fijo de columnas generado por merge_dataframes.
+Las exportaciones a Excel que superan el límite de filas de una hoja o el
+tamaño máximo por archivo se dividen en varias hojas y archivos numerados.
+
+Módulos relacionados:
+- data_processing.py: Genera el DataFrame combinado que se exporta
+- pdf_extractor_app.py: Utiliza estas funciones desde la interfaz
+- sqlite_export.py: Exportación a SQLite con actualización de reportes existentes
+"""
+
+import itertools
+import os
+import pandas as pd
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
+from openpyxl.utils import get_column_letter
+from constants import (EXCEL_MAX_ROWS_PER_SHEET, EXCEL_DEFAULT_MAX_MB_PER_FILE,
+                       FILE_PATH_COLUMN, REPORT_INDEX_COLUMN)
+from data_processing import dataframe_to_arrow, report_keys
+from sqlite_export import (export_sqlite, export_sqlite_chunks, read_sqlite_keys,
+                           SQLITE_EXTENSIONS)
+
+# Nombre de la hoja principal en los archivos Excel
+SHEET_NAME = "Datos Extraídos"
+
+# Hoja con la lista de partes cuando la exportación se divide
+INDEX_SHEET_NAME = "Índice"
+
+# Columna del índice con el tamaño estimado de cada parte, que usa el modo de
+# anexado para no volver a medir las filas ya exportadas
+INDEX_BYTES_HEADER = "Tamaño estimado (bytes)"
+
+# Filas de datos por hoja: límite de Excel (1.048.576) menos el encabezado
+DEFAULT_MAX_ROWS_PER_SHEET = EXCEL_MAX_ROWS_PER_SHEET
+
+# Tamaño estimado (texto sin comprimir) a partir del cual se inicia un archivo nuevo
+DEFAULT_MAX_BYTES_PER_FILE = EXCEL_DEFAULT_MAX_MB_PER_FILE * 1024 * 1024
+
+# Estilos con nombre de las hojas escritas en modo write_only
+HEADER_STYLE = "Encabezado de exportación"
+DATA_STYLE = "Datos de exportación"
+ALTERNATE_DATA_STYLE = "Datos de exportación (fila par)"
+
+# Filas del primer bloque que se usan para calcular el ancho de las columnas
+WIDTH_SAMPLE_ROWS = 1000
+
+# Columnas que identifican un reporte ya exportado: ruta, posición en el archivo
+# y correlativo; el nombre del archivo solo se usa en las filas sin ruta
+# (exportaciones anteriores a FILE_PATH_COLUMN)
+KEY_COLUMNS = [FILE_PATH_COLUMN, REPORT_INDEX_COLUMN, 'Nombre del Archivo', 'Correlativo']
+
+# Filas que se convierten juntas a valores de Python al escribir en Excel
+ROW_BATCH_SIZE = 10000
+
+# Formatos soportados según la extensión del archivo
+SUPPORTED_EXTENSIONS = ('.xlsx', '.csv', '.parquet') + SQLITE_EXTENSIONS
+
+
+def get_export_format(file_path):
+    """
+    Determina el formato de exportación a partir de la extensión del archivo.
+
+    Args:
+        file_path (str): Ruta del archivo de salida
+
+    Returns:
+        str: Extensión en minúsculas ('.xlsx', '.csv', '.parquet', '.sqlite' o '.db')
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension not in SUPPORTED_EXTENSIONS:
+        raise ValueError(f"Formato de archivo no soportado: {extension}")
+    return extension
+
+
+def _export_styles():
+    """
+    Estilos de las exportaciones a Excel, compartidos por apply_excel_styles y
+    por las hojas escritas en modo write_only.
+
+    Returns:
+        dict: Fuentes, rellenos, alineaciones y borde de encabezados y datos
+    """
+    thin_side = Side(style='thin', color="000000")
+    return {
+        # Estilos para los encabezados
+        "header_font": Font(name='Arial', size=11, bold=True, color="FFFFFF"),
+        "header_fill": PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid"),
+        "header_alignment": Alignment(horizontal='center', vertical='center', wrap_text=True),
+        # Estilos para las filas de datos
+        "data_font": Font(name='Arial', size=10),
+        "data_alignment": Alignment(vertical='center', wrap_text=True),
+        "border": Border(left=thin_side, right=thin_side, top=thin_side, bottom=thin_side),
+        # Colores alternos para las filas (celeste claro y blanco)
+        "alternate_fill": PatternFill(start_color="DEEBF7", end_color="DEEBF7", fill_type="solid"),
+    }
+
+
+def apply_excel_styles(worksheet, first_data_row=2):
+    """
+    Aplica estilos al archivo Excel para mejorar su apariencia.
+
+    Args:
+        worksheet: Hoja de cálculo (objeto openpyxl.Worksheet)
+        first_data_row (int): Primera fila de datos a la que se aplican estilos.
+            Al añadir filas a un archivo existente solo se estilizan las nuevas.
+    """
+    styles = _export_styles()
+    header_font = styles["header_font"]
+    header_fill = styles["header_fill"]
+    header_alignment = styles["header_alignment"]
+    header_border = styles["border"]
+    data_font = styles["data_font"]
+    data_alignment = styles["data_alignment"]
+    data_border = styles["border"]
+    light_blue_fill = styles["alternate_fill"]
+
+    # Aplicar estilo a los encabezados (primera fila)
+    for col in range(1, worksheet.max_column + 1):
+        cell = worksheet.cell(1, col)
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.alignment = header_alignment
+        cell.border = header_border
+
+    # Ajustar el alto de la primera fila
+    worksheet.row_dimensions[1].height = 30
+
+    # Aplicar estilos a las filas de datos con colores alternados
+    for row in range(first_data_row, worksheet.max_row + 1):
+        for col in range(1, worksheet.max_column + 1):
+            cell = worksheet.cell(row, col)
+            cell.font = data_font
+            cell.alignment = data_alignment
+            cell.border = data_border
+
+            # Aplicar color alterno a las filas
+            if row % 2 == 0:
+                cell.fill = light_blue_fill
+
+    # Ajustar el ancho de las columnas para mejor visualización
+    for col in range(1, worksheet.max_column + 1):
+        column_letter = get_column_letter(col)
+        max_length = 0
+
+        # En modo de anexado se parte del ancho actual y solo se revisan las filas nuevas
+        first_row = 1
+        if first_data_row > 2:
+            first_row = first_data_row
+            current_width = worksheet.column_dimensions[column_letter].width or 0
+            max_length = max(0, int(current_width) - 2)
+
+        # Encontrar la celda con el contenido más largo en esta columna
+        for row in range(first_row, worksheet.max_row + 1):
+            cell_value = str(worksheet.cell(row, col).value)
+            max_length = max(max_length, len(cell_value))
+
+        # Limitar el ancho máximo a 50 caracteres para evitar columnas demasiado anchas
+        adjusted_width = min(max_length + 2, 50)
+        worksheet.column_dimensions[column_letter].width = adjusted_width
+
+    # Congelar la primera fila
+    worksheet.freeze_panes = "A2"
+
+    # Aplicar autofilter para facilitar la navegación
+    worksheet.auto_filter.ref = f"A1:{get_column_letter(worksheet.max_column)}{worksheet.max_row}"
+
+
+def format_times_as_text(dataframe):
+    """
+    Convierte las horas normalizadas (timedelta desde medianoche) a texto
+    "HH:MM" para los formatos de texto (CSV y Excel), en lugar de la
+    representación "0 days 09:15:00" de pandas. El desplazamiento GMT queda
+    en su propia columna (ver normalize_result_types).
+
+    Args:
+        dataframe (pd.DataFrame): Datos a exportar
+
+    Returns:
+        pd.DataFrame: Copia con las horas como texto; el resto de las columnas
+            no se copia
+    """
+    time_columns = [column for column in dataframe.columns
+                    if pd.api.types.is_timedelta64_dtype(dataframe[column])]
+    if not time_columns:
+        return dataframe
+    dataframe = dataframe.copy(deep=False)
+    for column in time_columns:
+        dataframe[column] = (pd.Timestamp(0) + dataframe[column]).dt.strftime("%H:%M")
+    return dataframe
+
+
+def _iter_rows(dataframe, batch_size=ROW_BATCH_SIZE):
+    """
+    Recorre las filas de un DataFrame como tuplas de valores de Python, con
+    cadena vacía en lugar de los nulos. Los valores se convierten por columna y
+    por lotes de filas, de modo que las columnas de Arrow y las categorías se
+    leen sin copiar el DataFrame ni convertir cada celda por separado.
+
+    Args:
+        dataframe (pd.DataFrame): Datos a recorrer
+        batch_size (int): Filas convertidas a la vez
+
+    Yields:
+        tuple: Valores de cada fila en el orden de las columnas
+    """
+    for start in range(0, len(dataframe), batch_size):
+        block = dataframe.iloc[start:start + batch_size]
+        columns = []
+        for _, series in block.items():
+            missing = series.isna().tolist()
+            columns.append(["" if is_missing else value
+                            for value, is_missing in zip(series.tolist(), missing)])
+        yield from zip(*columns)
+
+
+def _data_sheet_name(sheet_number):
+    """Nombre de la hoja de datos número sheet_number dentro de un archivo"""
+    return SHEET_NAME if sheet_number == 1 else f"{SHEET_NAME} {sheet_number}"
+
+
+def _data_sheets(workbook):
+    """
+    Obtiene las hojas de datos de un libro, en orden.
+
+    Args:
+        workbook: Libro de Excel (objeto openpyxl.Workbook)
+
+    Returns:
+        list: Hojas cuyo nombre empieza con SHEET_NAME, o la hoja activa si no hay
+    """
+    sheets = [workbook[name] for name in workbook.sheetnames if name.startswith(SHEET_NAME)]
+    return sheets or [workbook.active]
+
+
+def _part_file_path(file_path, file_number):
+    """Ruta del archivo número file_number: datos.xlsx, datos_parte2.xlsx, ..."""
+    if file_number == 1:
+        return file_path
+    base, extension = os.path.splitext(file_path)
+    return f"{base}_parte{file_number}{extension}"
+
+
+def excel_part_paths(file_path):
+    """
+    Rutas de los archivos existentes de una exportación a Excel: el archivo
+    indicado y los _parte2, _parte3, ... consecutivos.
+
+    Args:
+        file_path (str): Ruta del primer archivo .xlsx
+
+    Returns:
+        list: Rutas existentes, en orden (vacía si el primer archivo no existe)
+    """
+    part_paths = []
+    while os.path.exists(_part_file_path(file_path, len(part_paths) + 1)):
+        part_paths.append(_part_file_path(file_path, len(part_paths) + 1))
+    return part_paths
+
+
+def _add_named_styles(workbook):
+    """Registra en el libro los estilos con nombre de encabezados y datos"""
+    styles = _export_styles()
+    workbook.add_named_style(NamedStyle(
+        name=HEADER_STYLE, font=styles["header_font"], fill=styles["header_fill"],
+        alignment=styles["header_alignment"], border=styles["border"]))
+    workbook.add_named_style(NamedStyle(
+        name=DATA_STYLE, font=styles["data_font"], alignment=styles["data_alignment"],
+        border=styles["border"]))
+    workbook.add_named_style(NamedStyle(
+        name=ALTERNATE_DATA_STYLE, font=styles["data_font"], fill=styles["alternate_fill"],
+        alignment=styles["data_alignment"], border=styles["border"]))
+
+
+def _styled_cells(worksheet, values, style):
+    """Celdas de una fila de una hoja write_only con el estilo con nombre indicado"""
+    cells = []
+    for value in values:
+        cell = WriteOnlyCell(worksheet, value)
+        cell.style = style
+        cells.append(cell)
+    return cells
+
+
+def _column_widths(columns, sample_rows):
+    """
+    Ancho de cada columna según el encabezado y una muestra de filas, con el
+    mismo criterio que apply_excel_styles (máximo de 50 caracteres).
+
+    Args:
+        columns (list): Encabezados
+        sample_rows (list): Filas (tuplas de valores) de la muestra
+
+    Returns:
+        list: Ancho de cada columna
+    """
+    lengths = [len(str(column)) for column in columns]
+    for row in sample_rows:
+        for col_idx, value in enumerate(row):
+            lengths[col_idx] = max(lengths[col_idx], len(str(value)))
+    return [min(length + 2, 50) for length in lengths]
+
+
+def _start_write_only_sheet(workbook, title, columns, widths, index=None):
+    """
+    Crea una hoja write_only con los anchos, la fila de encabezado fija y los
+    encabezados con estilo. Las dimensiones se fijan antes de escribir filas.
+
+    Returns:
+        Hoja creada (objeto openpyxl WriteOnlyWorksheet)
+    """
+    worksheet = workbook.create_sheet(title, index)
+    for col_idx, width in enumerate(widths, start=1):
+        worksheet.column_dimensions[get_column_letter(col_idx)].width = width
+    worksheet.row_dimensions[1].height = 30
+    worksheet.freeze_panes = "A2"
+    worksheet.append(_styled_cells(worksheet, columns, HEADER_STYLE))
+    return worksheet
+
+
+def _append_styled_row(worksheet, values, row_number):
+    """Añade una fila de datos con el color alterno de las filas pares"""
+    style = ALTERNATE_DATA_STYLE if row_number % 2 == 0 else DATA_STYLE
+    worksheet.append(_styled_cells(worksheet, values, style))
+
+
+def _set_auto_filter(worksheet, column_count, data_rows):
+    """Aplica el autofiltro al encabezado y las filas de datos de una hoja"""
+    worksheet.auto_filter.ref = f"A1:{get_column_letter(column_count)}{data_rows + 1}"
+
+
+def _renumber_parts(parts):
+    """Recalcula la primera y la última fila global de cada parte según sus filas"""
+    total_rows = 0
+    for part in parts:
+        part["first_row"] = total_rows + 1
+        total_rows += part["rows"]
+        part["last_row"] = total_rows
+    return parts
+
+
+def _write_index_sheet(workbook, parts):
+    """
+    Añade al inicio del libro una hoja con la lista de partes de la exportación.
+    Acepta libros normales y libros write_only.
+
+    Args:
+        workbook: Libro de Excel (objeto openpyxl.Workbook)
+        parts (list): Diccionarios con archivo, hoja, primera y última fila, filas
+            y tamaño estimado (bytes)
+    """
+    headers = ["Parte", "Archivo", "Hoja", "Primera fila", "Última fila", "Filas", INDEX_BYTES_HEADER]
+    rows = [[number, part["file"], part["sheet"], part["first_row"], part["last_row"], part["rows"],
+             part.get("bytes")]
+            for number, part in enumerate(parts, start=1)]
+
+    if workbook.write_only:
+        if HEADER_STYLE not in workbook.named_styles:
+            _add_named_styles(workbook)
+        worksheet = _start_write_only_sheet(workbook, INDEX_SHEET_NAME, headers,
+                                            _column_widths(headers, rows), index=0)
+        for row_number, row in enumerate(rows, start=2):
+            _append_styled_row(worksheet, row, row_number)
+        _set_auto_filter(worksheet, len(headers), len(rows))
+        return
+
+    if INDEX_SHEET_NAME in workbook.sheetnames:
+        del workbook[INDEX_SHEET_NAME]
+    worksheet = workbook.create_sheet(INDEX_SHEET_NAME, 0)
+    for row in [headers] + rows:
+        worksheet.append(row)
+    apply_excel_styles(worksheet)
+
+
+def _read_index_parts(file_path):
+    """
+    Lee la hoja de índice del primer archivo de una exportación.
+
+    Returns:
+        list or None: Partes (file, sheet, rows, bytes), o None si el archivo no
+            tiene índice; bytes es None en los índices anteriores a esa columna
+    """
+    workbook = openpyxl.load_workbook(file_path, read_only=True)
+    try:
+        if INDEX_SHEET_NAME not in workbook.sheetnames:
+            return None
+        parts = []
+        for row in workbook[INDEX_SHEET_NAME].iter_rows(min_row=2, values_only=True):
+            if row and row[1]:
+                estimated_bytes = row[6] if len(row) > 6 else None
+                parts.append({"file": row[1], "sheet": row[2], "rows": int(row[5] or 0),
+                              "bytes": int(estimated_bytes) if estimated_bytes is not None else None})
+        return parts
+    finally:
+        workbook.close()
+
+
+def _scan_part_sheets(part_path):
+    """
+    Cuenta las filas de datos de cada hoja de un archivo de la exportación,
+    para cuando el primer archivo no tiene índice.
+
+    Returns:
+        list: Partes (file, sheet, rows) del archivo
+    """
+    workbook = openpyxl.load_workbook(part_path, read_only=True)
+    try:
+        return [{"file": os.path.basename(part_path), "sheet": worksheet.title,
+                 "rows": sum(1 for _ in worksheet.iter_rows(min_row=2, max_col=1))}
+                for worksheet in _data_sheets(workbook)]
+    finally:
+        workbook.close()
+
+
+class _ExcelPartWriter:
+    """
+    Escribe filas en libros write_only, abriendo una hoja nueva al llegar a
+    max_rows_per_sheet filas y un archivo nuevo (_parteN) cuando el tamaño
+    estimado supera max_bytes_per_file. Las filas van directamente al archivo
+    temporal de cada hoja, sin mantener el libro en memoria.
+    """
+
+    def __init__(self, file_path, columns, widths, max_rows_per_sheet, max_bytes_per_file,
+                 first_file_number=1):
+        """
+        Args:
+            file_path (str): Ruta del primer archivo de la exportación
+            columns (list): Encabezados de las hojas
+            widths (list): Ancho de cada columna
+            max_rows_per_sheet (int): Filas de datos por hoja
+            max_bytes_per_file (int): Tamaño estimado máximo por archivo
+            first_file_number (int): Número del primer archivo a escribir; el
+                archivo 1 se guarda al final para poder añadirle el índice
+        """
+        self.file_path = file_path
+        self.columns = columns
+        self.widths = widths
+        self.max_rows_per_sheet = max(1, min(max_rows_per_sheet, DEFAULT_MAX_ROWS_PER_SHEET))
+        self.max_bytes_per_file = max_bytes_per_file
+        self.file_number = first_file_number - 1
+        self.sheet_number = 0
+        self.file_bytes = 0
+        self.workbook = None
+        self.worksheet = None
+        self.first_workbook = None
+        self.parts = []
+
+    def _finish_sheet(self):
+        if self.worksheet is not None:
+            _set_auto_filter(self.worksheet, len(self.columns), self.parts[-1]["rows"])
+            self.worksheet = None
+
+    def _finish_file(self):
+        self._finish_sheet()
+        if self.workbook is None:
+            return
+        if self.file_number == 1:
+            # El primer archivo se guarda al final para incluir el índice
+            self.first_workbook = self.workbook
+        else:
+            self.workbook.save(_part_file_path(self.file_path, self.file_number))
+        self.workbook = None
+
+    def _start_sheet(self, new_file):
+        self._finish_sheet()
+        if new_file:
+            self._finish_file()
+            self.workbook = openpyxl.Workbook(write_only=True)
+            _add_named_styles(self.workbook)
+            self.file_number += 1
+            self.sheet_number = 0
+            self.file_bytes = 0
+        self.sheet_number += 1
+        self.worksheet = _start_write_only_sheet(self.workbook, _data_sheet_name(self.sheet_number),
+                                                 self.columns, self.widths)
+        self.parts.append({"file": os.path.basename(_part_file_path(self.file_path, self.file_number)),
+                           "sheet": self.worksheet.title, "rows": 0, "bytes": 0})
+
+    def write_row(self, row):
+        """
+        Escribe una fila, abriendo antes la hoja o el archivo que corresponda.
+
+        Args:
+            row (tuple): Valores de la fila en el orden de columns
+        """
+        if not self.parts:
+            self._start_sheet(new_file=True)
+        elif self.parts[-1]["rows"] >= self.max_rows_per_sheet:
+            self._start_sheet(new_file=self.file_bytes >= self.max_bytes_per_file)
+        elif self.parts[-1]["rows"] and self.file_bytes >= self.max_bytes_per_file:
+            self._start_sheet(new_file=True)
+
+        part = self.parts[-1]
+        part["rows"] += 1
+        _append_styled_row(self.worksheet, row, part["rows"] + 1)
+        row_bytes = sum(len(str(value)) for value in row)
+        part["bytes"] += row_bytes
+        self.file_bytes += row_bytes
+
+    def copy_sheet(self, rows, estimated_bytes=None, row_bytes=0):
+        """
+        Copia en una hoja nueva del archivo actual las filas de una hoja ya
+        exportada, sin aplicar los límites (la hoja original ya los cumplía) y
+        sin medir cada valor: el tamaño se toma de estimated_bytes o, si no se
+        conoce, de las filas copiadas por row_bytes.
+
+        Args:
+            rows (iterable): Filas (tuplas de valores en el orden de columns)
+            estimated_bytes (int or None): Tamaño estimado de la hoja original
+            row_bytes (float): Tamaño estimado por fila si falta estimated_bytes
+        """
+        self._start_sheet(new_file=not self.parts)
+        part = self.parts[-1]
+        for row in rows:
+            part["rows"] += 1
+            _append_styled_row(self.worksheet, row, part["rows"] + 1)
+        if estimated_bytes is None:
+            estimated_bytes = int(part["rows"] * row_bytes)
+        part["bytes"] = estimated_bytes
+        self.file_bytes += estimated_bytes
+
+    def close(self):
+        """
+        Guarda los archivos pendientes salvo el primero.
+
+        Returns:
+            Workbook or None: Primer libro (sin guardar) si lo escribió este
+                escritor, para añadirle el índice antes de guardarlo
+        """
+        if not self.parts:
+            # Sin filas: solo la hoja con los encabezados
+            self._start_sheet(new_file=True)
+        self._finish_file()
+        return self.first_workbook
+
+
+def export_excel_parts(chunks, file_path, max_rows_per_sheet=DEFAULT_MAX_ROWS_PER_SHEET,
+                       max_bytes_per_file=DEFAULT_MAX_BYTES_PER_FILE):
+    """
+    Exporta bloques de filas a Excel dividiendo el resultado en varias hojas
+    ("Datos Extraídos", "Datos Extraídos 2", ...) cuando se alcanza el límite de
+    filas por hoja, y en varios archivos (datos.xlsx, datos_parte2.xlsx, ...)
+    cuando el tamaño estimado supera max_bytes_per_file. Cada parte conserva los
+    encabezados, los estilos y el orden de columnas. Si hay más de una parte, el
+    primer archivo incluye una hoja "Índice" con la lista de partes.
+
+    Los libros se escriben en modo write_only: las filas se vuelcan a disco a
+    medida que llegan y los anchos de columna se calculan con las primeras
+    WIDTH_SAMPLE_ROWS filas. Los archivos _parteN de una exportación anterior
+    con el mismo nombre que ya no forman parte del resultado se eliminan.
+
+    Args:
+        chunks (iterable): Bloques (pd.DataFrame) con las mismas columnas
+        file_path (str): Ruta del primer archivo .xlsx
+        max_rows_per_sheet (int): Filas de datos por hoja
+        max_bytes_per_file (int): Tamaño estimado máximo por archivo
+
+    Returns:
+        list: Partes escritas (diccionarios con file, sheet, first_row, last_row, rows)
+    """
+    writer = None
+    for chunk in chunks:
+        rows = _iter_rows(format_times_as_text(chunk))
+        if writer is None:
+            sample_rows = list(itertools.islice(rows, WIDTH_SAMPLE_ROWS))
+            writer = _ExcelPartWriter(file_path, list(chunk.columns),
+                                      _column_widths(chunk.columns, sample_rows),
+                                      max_rows_per_sheet, max_bytes_per_file)
+            rows = itertools.chain(sample_rows, rows)
+        for row in rows:
+            writer.write_row(row)
+
+    if writer is None:
+        raise ValueError("No hay datos para exportar")
+
+    first_workbook = writer.close()
+    parts = _renumber_parts(writer.parts)
+    if len(parts) > 1:
+        _write_index_sheet(first_workbook, parts)
+    first_workbook.save(file_path)
+
+    # Eliminar partes sobrantes de una exportación anterior con el mismo nombre
+    for stale_path in excel_part_paths(file_path)[writer.file_number:]:
+        os.remove(stale_path)
+    return parts
+
+
+def export_excel(dataframe, file_path, max_rows_per_sheet=DEFAULT_MAX_ROWS_PER_SHEET,
+                 max_bytes_per_file=DEFAULT_MAX_BYTES_PER_FILE):
+    """
+    Crea un archivo Excel nuevo con los datos y los estilos de la aplicación.
+    Si los datos superan el límite de filas de una hoja o el tamaño por
+    archivo, se dividen en varias hojas y archivos (ver export_excel_parts).
+
+    Args:
+        dataframe (pd.DataFrame): Datos a exportar
+        file_path (str): Ruta del archivo .xlsx
+        max_rows_per_sheet (int): Filas de datos por hoja
+        max_bytes_per_file (int): Tamaño estimado máximo por archivo
+    """
+    export_excel_parts([dataframe], file_path, max_rows_per_sheet, max_bytes_per_file)
+
+
+def export_csv(dataframe, file_path):
+    """
+    Crea un archivo CSV nuevo con los datos.
+
+    Args:
+        dataframe (pd.DataFrame): Datos a exportar
+        file_path (str): Ruta del archivo .csv
+    """
+    format_times_as_text(dataframe).to_csv(file_path, index=False, encoding='utf-8-sig')
+
+
+def export_parquet(dataframe, file_path):
+    """
+    Crea un archivo Parquet nuevo con los datos.
+
+    Args:
+        dataframe (pd.DataFrame): Datos a exportar
+        file_path (str): Ruta del archivo .parquet
+    """
+    import pyarrow.parquet as pq
+    pq.write_table(dataframe_to_arrow(dataframe), file_path)
+
+
+def export_dataframe(dataframe, file_path, max_rows_per_sheet=DEFAULT_MAX_ROWS_PER_SHEET,
+                     max_bytes_per_file=DEFAULT_MAX_BYTES_PER_FILE):
+    """
+    Exporta los datos a un archivo nuevo según la extensión de la ruta. Una base
+    SQLite existente no se reemplaza: sus reportes se actualizan.
+
+    Args:
+        dataframe (pd.DataFrame): Datos a exportar
+        file_path (str): Ruta del archivo de salida (.xlsx, .csv, .parquet, .sqlite o .db)
+        max_rows_per_sheet (int): Filas de datos por hoja (solo Excel)
+        max_bytes_per_file (int): Tamaño estimado máximo por archivo (solo Excel)
+    """
+    if get_export_format(file_path) == '.xlsx':
+        export_excel(dataframe, file_path, max_rows_per_sheet, max_bytes_per_file)
+        return
+
+    exporters = {
+        '.csv': export_csv,
+        '.parquet': export_parquet,
+        '.sqlite': export_sqlite,
+        '.db': export_sqlite,
+    }
+    exporters[get_export_format(file_path)](dataframe, file_path)
+
+
+def iter_parquet_chunks(parquet_path, batch_size=10000):
+    """
+    Lee un archivo Parquet por bloques, por ejemplo el resultado volcado a disco
+    por pdf_pipeline.py cuando supera el límite de memoria.
+
+    Args:
+        parquet_path (str): Ruta al archivo Parquet
+        batch_size (int): Filas por bloque
+
+    Yields:
+        pd.DataFrame: Bloque de filas
+    """
+    import pyarrow.parquet as pq
+    parquet_file = pq.ParquetFile(parquet_path)
+    try:
+        for batch in parquet_file.iter_batches(batch_size=batch_size):
+            yield batch.to_pandas()
+    finally:
+        parquet_file.close()
+
+
+def export_chunks(chunks, file_path, max_rows_per_sheet=DEFAULT_MAX_ROWS_PER_SHEET,
+                  max_bytes_per_file=DEFAULT_MAX_BYTES_PER_FILE):
+    """
+    Exporta a un archivo nuevo una secuencia de bloques con las mismas columnas,
+    sin reunirlos en un único DataFrame.
+
+    Args:
+        chunks (iterable): Bloques (pd.DataFrame) a exportar en orden
+        file_path (str): Ruta del archivo de salida (.xlsx, .csv, .parquet, .sqlite o .db)
+        max_rows_per_sheet (int): Filas de datos por hoja (solo Excel)
+        max_bytes_per_file (int): Tamaño estimado máximo por archivo (solo Excel)
+
+    Returns:
+        int: Número de filas exportadas
+    """
+    extension = get_export_format(file_path)
+    total_rows = 0
+
+    if extension in SQLITE_EXTENSIONS:
+        return export_sqlite_chunks(chunks, file_path)
+
+    if extension == '.xlsx':
+        parts = export_excel_parts(chunks, file_path, max_rows_per_sheet, max_bytes_per_file)
+        return sum(part["rows"] for part in parts)
+
+    if extension == '.csv':
+        first_chunk = True
+        for chunk in chunks:
+            format_times_as_text(chunk).to_csv(
+                file_path, mode='w' if first_chunk else 'a', header=first_chunk,
+                index=False, encoding='utf-8-sig' if first_chunk else 'utf-8')
+            first_chunk = False
+            total_rows += len(chunk)
+        return total_rows
+
+    import pyarrow.parquet as pq
+    writer = None
+    try:
+        for chunk in chunks:
+            table = dataframe_to_arrow(chunk)
+            if writer is None:
+                writer = pq.ParquetWriter(file_path, table.schema)
+            writer.write_table(table.cast(writer.schema))
+            total_rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return total_rows
+
+
+def _add_existing_keys(keys, key_df):
+    """
+    Añade a keys las claves de reporte y de archivo de unas filas exportadas.
+
+    Args:
+        keys (dict): Claves acumuladas (ver read_existing_keys)
+        key_df (pd.DataFrame): Columnas clave de las filas exportadas
+    """
+    if key_df.empty:
+        return
+    keys['reports'].update(report_keys(key_df))
+    if FILE_PATH_COLUMN in key_df.columns:
+        paths = key_df[FILE_PATH_COLUMN].astype("string").fillna("")
+    else:
+        paths = pd.Series("", index=key_df.index, dtype="string")
+    keys['files'].update(paths[paths != ""])
+    if 'Nombre del Archivo' in key_df.columns:
+        names = key_df['Nombre del Archivo'].astype("string").fillna("")
+        keys['files'].update(names[(paths == "") & (names != "")])
+
+
+def read_existing_keys(file_path):
+    """
+    Lee únicamente las columnas clave de una exportación existente.
+
+    Args:
+        file_path (str): Ruta del archivo exportado previamente
+
+    Returns:
+        dict: 'reports' con las claves de los reportes exportados (ver
+            data_processing.report_keys) y 'files' con las rutas de sus PDFs;
+            de las filas sin ruta se guarda el nombre del archivo
+    """
+    keys = {'reports': set(), 'files': set()}
+    if not os.path.exists(file_path):
+        return keys
+
+    extension = get_export_format(file_path)
+
+    if extension in SQLITE_EXTENSIONS:
+        _add_existing_keys(keys, read_sqlite_keys(file_path, KEY_COLUMNS))
+        return keys
+
+    if extension == '.xlsx':
+        # Las claves se leen de todos los archivos de la exportación (_parteN)
+        for part_path in excel_part_paths(file_path):
+            workbook = openpyxl.load_workbook(part_path, read_only=True)
+            try:
+                for worksheet in _data_sheets(workbook):
+                    header = next(worksheet.iter_rows(min_row=1, max_row=1, values_only=True), ())
+                    key_columns = {}
+                    for column in KEY_COLUMNS:
+                        if column not in header:
+                            continue
+                        col_idx = header.index(column) + 1
+                        key_columns[column] = [
+                            value for (value,) in worksheet.iter_rows(
+                                min_row=2, min_col=col_idx, max_col=col_idx, values_only=True)]
+                    _add_existing_keys(keys, pd.DataFrame(key_columns))
+            finally:
+                workbook.close()
+        return keys
+
+    if extension == '.csv':
+        header = pd.read_csv(file_path, nrows=0, encoding='utf-8-sig').columns
+        columns = [column for column in KEY_COLUMNS if column in header]
+        existing_df = pd.read_csv(file_path, usecols=columns, dtype=str, encoding='utf-8-sig')
+    else:
+        import pyarrow.parquet as pq
+        header = pq.read_schema(file_path).names
+        columns = [column for column in KEY_COLUMNS if column in header]
+        existing_df = pd.read_parquet(file_path, columns=columns)
+
+    _add_existing_keys(keys, existing_df)
+    return keys
+
+
+def filter_new_files(pdf_files, existing_keys):
+    """
+    Descarta los PDFs cuya ruta ya aparece en una exportación existente (o su
+    nombre, si la exportación es anterior a la columna de ruta).
+
+    Args:
+        pdf_files (list): Lista de rutas a archivos PDF
+        existing_keys (dict): Resultado de read_existing_keys
+
+    Returns:
+        list: Rutas de los PDFs que aún no han sido exportados
+    """
+    exported_files = existing_keys.get('files', set())
+    return [pdf for pdf in pdf_files
+            if os.path.abspath(pdf) not in exported_files
+            and os.path.basename(pdf) not in exported_files]
+
+
+def filter_new_rows(dataframe, existing_keys):
+    """
+    Descarta las filas de reportes ya exportados: misma ruta, posición en el
+    archivo y correlativo. Contra las filas exportadas sin ruta se compara el
+    par nombre de archivo y correlativo.
+
+    Args:
+        dataframe (pd.DataFrame): Datos extraídos
+        existing_keys (dict): Resultado de read_existing_keys
+
+    Returns:
+        pd.DataFrame: Filas que no existen en la exportación previa
+    """
+    exported_reports = existing_keys.get('reports', set())
+    if not exported_reports or dataframe.empty:
+        return dataframe
+    mask = (report_keys(dataframe).isin(exported_reports)
+            | report_keys(dataframe, by_path=False).isin(exported_reports))
+    return dataframe[~mask.to_numpy()]
+
+
+def _read_existing_header(file_path, extension):
+    """
+    Lee la fila de encabezados de una exportación existente. En Excel se usa
+    la última hoja del último archivo, que es donde se añaden las filas.
+
+    Args:
+        file_path (str): Ruta del archivo exportado previamente
+        extension (str): Formato del archivo
+
+    Returns:
+        list: Nombres de columna en el orden del archivo
+    """
+    if extension == '.xlsx':
+        workbook = openpyxl.load_workbook(excel_part_paths(file_path)[-1], read_only=True)
+        try:
+            worksheet = _data_sheets(workbook)[-1]
+            header = next(worksheet.iter_rows(min_row=1, max_row=1, values_only=True), ())
+        finally:
+            workbook.close()
+        return [column for column in header if column is not None]
+    if extension == '.csv':
+        return list(pd.read_csv(file_path, nrows=0, encoding='utf-8-sig').columns)
+    import pyarrow.parquet as pq
+    return list(pq.read_schema(file_path).names)
+
+
+def _align_columns(dataframe, header):
+    """
+    Ajusta las columnas de los datos nuevos al orden del archivo existente.
+    Las columnas nuevas que el archivo no tenga se añaden al final.
+
+    Args:
+        dataframe (pd.DataFrame): Datos nuevos
+        header (list): Encabezados del archivo existente
+
+    Returns:
+        tuple: (DataFrame reordenado, lista completa de columnas)
+    """
+    extra_columns = [col for col in dataframe.columns if col not in header]
+    all_columns = list(header) + extra_columns
+    return dataframe.reindex(columns=all_columns), all_columns
+
+
+def _new_aligned_chunks(chunks, existing_keys, header):
+    """
+    Filtra los bloques contra las claves existentes y los alinea con el
+    encabezado del archivo. Las columnas se fijan con el primer bloque que
+    tiene filas nuevas (los bloques comparten columnas, como en export_chunks).
+
+    Args:
+        chunks (iterable): Bloques (pd.DataFrame) de datos extraídos
+        existing_keys (dict): Resultado de read_existing_keys
+        header (list): Encabezados del archivo existente
+
+    Returns:
+        tuple: (lista completa de columnas o None si no hay filas nuevas,
+                iterador de bloques alineados)
+    """
+    new_chunks = (filter_new_rows(chunk, existing_keys) for chunk in chunks)
+    new_chunks = (chunk for chunk in new_chunks if not chunk.empty)
+    first_chunk = next(new_chunks, None)
+    if first_chunk is None:
+        return None, iter(())
+
+    first_chunk, all_columns = _align_columns(first_chunk, header)
+
+    def aligned_chunks():
+        yield first_chunk
+        for chunk in new_chunks:
+            yield chunk.reindex(columns=all_columns)
+
+    return all_columns, aligned_chunks()
+
+
+def _rewrite_first_file(file_path, parts):
+    """
+    Reescribe el primer archivo de una exportación con la hoja "Índice"
+    actualizada. Las hojas de datos se copian fila a fila de un libro
+    read_only a uno write_only, cada una con su propio encabezado.
+
+    Args:
+        file_path (str): Ruta del primer archivo .xlsx
+        parts (list): Partes de la exportación (ver _write_index_sheet)
+    """
+    base, extension = os.path.splitext(file_path)
+    temp_path = f"{base}.tmp{extension}"
+    source = openpyxl.load_workbook(file_path, read_only=True)
+    try:
+        workbook = openpyxl.Workbook(write_only=True)
+        _add_named_styles(workbook)
+        for source_sheet in _data_sheets(source):
+            rows = source_sheet.iter_rows(values_only=True)
+            columns = list(next(rows, ()))
+            sample_rows = list(itertools.islice(rows, WIDTH_SAMPLE_ROWS))
+            worksheet = _start_write_only_sheet(workbook, source_sheet.title, columns,
+                                                _column_widths(columns, sample_rows))
+            row_count = 0
+            for row in itertools.chain(sample_rows, rows):
+                row_count += 1
+                _append_styled_row(worksheet, row[:len(columns)], row_count + 1)
+            _set_auto_filter(worksheet, len(columns), row_count)
+        _write_index_sheet(workbook, parts)
+        workbook.save(temp_path)
+    finally:
+        source.close()
+    os.replace(temp_path, file_path)
+
+
+def _append_excel(file_path, header, all_columns, chunks,
+                  max_rows_per_sheet=DEFAULT_MAX_ROWS_PER_SHEET,
+                  max_bytes_per_file=DEFAULT_MAX_BYTES_PER_FILE):
+    """
+    Añade los bloques a una exportación a Excel existente. Las filas continúan
+    en la última hoja del último archivo (_parteN) mientras no se superen el
+    límite de filas por hoja ni el tamaño estimado del archivo; después se
+    abren hojas y archivos nuevos como en export_excel_parts. Si la exportación
+    queda con más de una parte, la hoja "Índice" del primer archivo se
+    actualiza.
+
+    Los libros write_only no se pueden reabrir, así que el último archivo se
+    copia fila a fila (read_only → write_only) antes de añadir las filas
+    nuevas; los archivos anteriores no se tocan salvo el primero, que se
+    reescribe igual para actualizar el índice. El tamaño de las hojas copiadas
+    se toma de la columna de tamaño del índice o, si no está, de sus filas por
+    el tamaño medio de una muestra, sin medir cada celda.
+    """
+    max_rows_per_sheet = max(1, min(max_rows_per_sheet, DEFAULT_MAX_ROWS_PER_SHEET))
+    part_paths = excel_part_paths(file_path)
+    last_path = part_paths[-1]
+    last_file = os.path.basename(last_path)
+    index_parts = _read_index_parts(file_path)
+
+    base, extension = os.path.splitext(last_path)
+    previous_path = f"{base}.anterior{extension}"
+    os.replace(last_path, previous_path)
+    writer = None
+    try:
+        previous = openpyxl.load_workbook(previous_path, read_only=True)
+        try:
+            sheets = _data_sheets(previous)
+            sample_rows = [row[:len(all_columns)] for row in itertools.islice(
+                sheets[0].iter_rows(min_row=2, values_only=True), WIDTH_SAMPLE_ROWS)]
+            row_bytes = (sum(len(str(value)) for row in sample_rows for value in row if value is not None)
+                         / len(sample_rows) if sample_rows else 0)
+            writer = _ExcelPartWriter(file_path, all_columns, _column_widths(all_columns, sample_rows),
+                                      max_rows_per_sheet, max_bytes_per_file,
+                                      first_file_number=len(part_paths))
+            padding = (None,) * len(all_columns)
+            sheet_bytes = {part["sheet"]: part["bytes"] for part in index_parts or []
+                           if part["file"] == last_file}
+            for worksheet in sheets:
+                rows = ((row + padding)[:len(all_columns)]
+                        for row in worksheet.iter_rows(min_row=2, values_only=True))
+                writer.copy_sheet(rows, sheet_bytes.get(worksheet.title), row_bytes)
+        finally:
+            previous.close()
+
+        added_rows = 0
+        for chunk in chunks:
+            for row in _iter_rows(format_times_as_text(chunk)):
+                writer.write_row(row)
+                added_rows += 1
+        first_workbook = writer.close()
+
+        # Índice: partes de los archivos anteriores (según el índice actual) y
+        # las hojas del último archivo y de los nuevos
+        if index_parts is None:
+            index_parts = [part for part_path in part_paths[:-1] for part in _scan_part_sheets(part_path)]
+        earlier_parts = [part for part in index_parts if part["file"] != last_file]
+        parts = _renumber_parts(earlier_parts + writer.parts)
+        if first_workbook is not None:
+            if len(parts) > 1:
+                _write_index_sheet(first_workbook, parts)
+            first_workbook.save(file_path)
+        elif len(parts) > 1:
+            _rewrite_first_file(file_path, parts)
+    except BaseException:
+        # Dejar la exportación como estaba: el último archivo original y sin
+        # los archivos nuevos
+        if writer is not None:
+            for file_number in range(len(part_paths) + 1, writer.file_number + 1):
+                new_path = _part_file_path(file_path, file_number)
+                if os.path.exists(new_path):
+                    os.remove(new_path)
+        os.replace(previous_path, last_path)
+        raise
+    os.remove(previous_path)
+    return added_rows
+
+
+def _append_csv(file_path, header, all_columns, chunks):
+    """Añade los bloques al final de un archivo CSV existente"""
+    if len(all_columns) > len(header):
+        # El encabezado cambia: reescribir el archivo por bloques
+        temp_path = file_path + ".tmp"
+        first_chunk = True
+        for chunk in pd.read_csv(file_path, dtype=str, encoding='utf-8-sig', chunksize=10000):
+            chunk.reindex(columns=all_columns).to_csv(
+                temp_path, mode='w' if first_chunk else 'a', header=first_chunk,
+                index=False, encoding='utf-8-sig' if first_chunk else 'utf-8')
+            first_chunk = False
+        os.replace(temp_path, file_path)
+
+    added_rows = 0
+    for new_rows in chunks:
+        format_times_as_text(new_rows).to_csv(file_path, mode='a', header=False, index=False,
+                                              encoding='utf-8')
+        added_rows += len(new_rows)
+    return added_rows
+
+
+def _append_parquet(file_path, header, all_columns, chunks):
+    """
+    Añade los bloques a un archivo Parquet existente. Parquet no admite anexar:
+    se copian los grupos de filas existentes a un archivo temporal, se escriben
+    los bloques nuevos y se reemplaza el original una sola vez. Las columnas
+    existentes conservan su tipo; las nuevas toman el del primer bloque.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    chunks = iter(chunks)
+    first_table = dataframe_to_arrow(next(chunks))
+    existing_file = pq.ParquetFile(file_path)
+    existing_schema = existing_file.schema_arrow
+    extra_fields = [first_table.schema.field(column) for column in all_columns[len(header):]]
+    schema = pa.schema([existing_schema.field(column) for column in header] + extra_fields)
+    temp_path = file_path + ".tmp"
+    added_rows = 0
+    try:
+        with pq.ParquetWriter(temp_path, schema) as writer:
+            for batch in existing_file.iter_batches():
+                table = pa.Table.from_batches([batch])
+                for extra_field in extra_fields:
+                    table = table.append_column(extra_field, pa.nulls(table.num_rows, extra_field.type))
+                writer.write_table(table.select(all_columns).cast(schema))
+            writer.write_table(first_table.select(all_columns).cast(schema))
+            added_rows += first_table.num_rows
+            for new_rows in chunks:
+                writer.write_table(dataframe_to_arrow(new_rows, schema))
+                added_rows += len(new_rows)
+    finally:
+        existing_file.close()
+    os.replace(temp_path, file_path)
+    return added_rows
+
+
+def append_chunks_to_export(chunks, file_path, max_rows_per_sheet=DEFAULT_MAX_ROWS_PER_SHEET,
+                            max_bytes_per_file=DEFAULT_MAX_BYTES_PER_FILE):
+    """
+    Añade al final de una exportación existente solo las filas nuevas de una
+    secuencia de bloques (por ejemplo los de iter_parquet_chunks). Las claves
+    existentes se leen una vez y el archivo se escribe una sola vez, sin
+    reunir los bloques en un único DataFrame. Si el archivo no existe se crea
+    uno nuevo. En una base SQLite todas las filas se escriben: los reportes ya
+    guardados se actualizan.
+
+    Args:
+        chunks (iterable): Bloques (pd.DataFrame) con las mismas columnas
+        file_path (str): Ruta del archivo de salida (.xlsx, .csv, .parquet, .sqlite o .db)
+        max_rows_per_sheet (int): Filas de datos por hoja (solo Excel)
+        max_bytes_per_file (int): Tamaño estimado máximo por archivo (solo Excel)
+
+    Returns:
+        int: Número de filas añadidas (o actualizadas en SQLite)
+    """
+    extension = get_export_format(file_path)
+
+    if extension in SQLITE_EXTENSIONS:
+        return export_sqlite_chunks(chunks, file_path)
+
+    if not os.path.exists(file_path):
+        return export_chunks(chunks, file_path, max_rows_per_sheet, max_bytes_per_file)
+
+    header = _read_existing_header(file_path, extension)
+    all_columns, new_chunks = _new_aligned_chunks(chunks, read_existing_keys(file_path), header)
+    if all_columns is None:
+        return 0
+
+    if extension == '.xlsx':
+        return _append_excel(file_path, header, all_columns, new_chunks,
+                             max_rows_per_sheet, max_bytes_per_file)
+    if extension == '.csv':
+        return _append_csv(file_path, header, all_columns, new_chunks)
+    return _append_parquet(file_path, header, all_columns, new_chunks)
+
+
+def append_to_export(dataframe, file_path, max_rows_per_sheet=DEFAULT_MAX_ROWS_PER_SHEET,
+                     max_bytes_per_file=DEFAULT_MAX_BYTES_PER_FILE):
+    """
+    Añade al final de una exportación existente solo las filas nuevas.
+    Si el archivo no existe se crea uno nuevo. En una base SQLite todas las
+    filas se escriben: los reportes ya guardados se actualizan.
+
+    Args:
+        dataframe (pd.DataFrame): Datos extraídos (orden de merge_dataframes)
+        file_path (str): Ruta del archivo de salida (.xlsx, .csv, .parquet, .sqlite o .db)
+        max_rows_per_sheet (int): Filas de datos por hoja (solo Excel)
+        max_bytes_per_file (int): Tamaño estimado máximo por archivo (solo Excel)
+
+    Returns:
+        int: Número de filas añadidas (o actualizadas en SQLite)
+    """
+    return append_chunks_to_export([dataframe], file_path, max_rows_per_sheet, max_bytes_per_file)
@@ -16,223 +16,438 @@ import os
 from constants import (
     TITLES_TO_EXTRACT,
     PATTERNS_TO_EXCLUDE,
+    FORM_MARKER_PATTERNS,
+    FORM_METADATA_MARKERS,
+    FORM_SIGNATURE_TITLES,
+    FORM_MIN_SIGNATURE_TITLES,
+    REPORT_BOUNDARY_TITLES,
+    FILE_PATH_COLUMN,
+    REPORT_INDEX_COLUMN,
 )
 from data_processing import process_terminal_data, merge_dataframes
 
 
-def extract_data_from_pdf(pdf_path):
+def open_pdf_document(pdf_path, pdf_bytes=None):
+    """
+    Abre un documento PDF desde disco o desde un bloque de bytes en memoria.
+
+    Args:
+        pdf_path (str): Ruta al archivo PDF
+        pdf_bytes (bytes, optional): Contenido del archivo ya leído (por ejemplo,
+            por el lector anticipado de pdf_prefetch.py)
+
+    Returns:
+        fitz.Document: Documento abierto
+    """
+    if pdf_bytes is not None:
+        return fitz.open(stream=pdf_bytes, filetype="pdf")
+    return fitz.open(pdf_path)
+
+
+class NotReportFormError(ValueError):
+    """El PDF no corresponde al formulario de reporte F-COM"""
+
+
+def metadata_matches_form(metadata):
+    """
+    Indica si los metadatos del PDF identifican el formulario F-COM.
+
+    Args:
+        metadata (dict): Metadatos del documento (fitz.Document.metadata)
+
+    Returns:
+        bool: True si el título, asunto o palabras clave contienen un marcador
+    """
+    if not metadata:
+        return False
+    text = " ".join(str(metadata.get(key) or "") for key in ("title", "subject", "keywords"))
+    return any(marker in text for marker in FORM_METADATA_MARKERS)
+
+
+def is_report_form(first_page_text, metadata=None):
+    """
+    Decide, solo con la primera página (y los metadatos), si un PDF es un
+    reporte F-COM. Cuesta una fracción del análisis completo.
+
+    Args:
+        first_page_text (str): Texto de la primera página
+        metadata (dict, optional): Metadatos del documento
+
+    Returns:
+        bool: True si el PDF parece un reporte F-COM
+    """
+    if metadata_matches_form(metadata):
+        return True
+
+    signature_count = 0
+    remaining_titles = set(FORM_SIGNATURE_TITLES)
+    for line in first_page_text.split('\n'):
+        line = line.strip()
+        if any(re.match(pattern, line) for pattern in FORM_MARKER_PATTERNS):
+            return True
+        for title in remaining_titles:
+            if line == title or line.startswith(title + ":") or line.startswith(title + " "):
+                remaining_titles.discard(title)
+                signature_count += 1
+                break
+        if signature_count >= FORM_MIN_SIGNATURE_TITLES:
+            return True
+    return False
+
+
+def iter_page_texts(pdf_path, pdf_bytes=None, check_form=False):
+    """
+    Extrae el texto de las páginas de un documento PDF una a una, sin reunir
+    todas en memoria, para poder procesar archivos muy grandes en una sola pasada.
+
+    Args:
+        pdf_path (str): Ruta al archivo PDF
+        pdf_bytes (bytes, optional): Contenido del archivo ya leído
+        check_form (bool): Si es True, comprueba con los metadatos y la primera
+            página que el PDF sea un reporte F-COM antes de leer el resto
+
+    Yields:
+        str: Texto de cada página, en orden
+
+    Raises:
+        NotReportFormError: Si check_form es True y el PDF no es un reporte F-COM
+    """
+    pdf_document = open_pdf_document(pdf_path, pdf_bytes)
     try:
-        pdf_document = fitz.open(pdf_path)
-
-        full_text = ""
+        # Los metadatos se consultan antes de extraer texto; si no bastan, se
+        # decide con la primera página y solo entonces se leen las demás
+        form_checked = not check_form or metadata_matches_form(pdf_document.metadata)
         for page_num in range(len(pdf_document)):
-            page = pdf_document[page_num]
-            full_text += page.get_text()
-
+            page_text = pdf_document[page_num].get_text()
+            if not form_checked:
+                if not is_report_form(page_text):
+                    raise NotReportFormError(f"{os.path.basename(pdf_path)} no es un reporte F-COM")
+                form_checked = True
+            yield page_text
+        if not form_checked:
+            raise NotReportFormError(f"{os.path.basename(pdf_path)} no tiene páginas")
+    finally:
         pdf_document.close()
 
-        lines = full_text.split('\n')
-        data = {}
-
-        data['Nombre del Archivo'] = os.path.basename(pdf_path)
-
-        title_counters = {}
-        i = 0
-
-        # Lista de títulos con tratamiento especial
-        special_extraction_titles = [
-            "Correlativo",
-            "Número Afiliado Gestión Afiliado principal",
-            "Atención por",
-            "Nombre del oficial técnico que brinda servicio",
-            "Validación fecha",
-            "Entrega de Papelería y Cantidad"
-        ]
 
-        # Títulos que requieren extracción multilinea
-        multiline_titles = [
-            "Revisión General en cualquier visita",
-            "Detalle de trabajo realizado para cierre de gestión"  # Añadido a la lista de multilinea
-        ]
-
-        # Primera pasada: buscar títulos exactos incluyendo los especiales
-        while i < len(lines):
-            line = lines[i].strip()
-
-            for title in TITLES_TO_EXTRACT:
-                if line == title or line.startswith(title + ":") or line.startswith(title + " "):
-                    title_counters[title] = title_counters.get(title, 0) + 1
-                    key = f"{title} ({title_counters[title]})" if title_counters[title] > 1 else title
+def read_page_texts(pdf_path, pdf_bytes=None, check_form=False):
+    """
+    Extrae el texto de cada página de un documento PDF.
+
+    Args:
+        pdf_path (str): Ruta al archivo PDF
+        pdf_bytes (bytes, optional): Contenido del archivo ya leído
+        check_form (bool): Si es True, comprueba con los metadatos y la primera
+            página que el PDF sea un reporte F-COM antes de leer el resto
+
+    Returns:
+        list: Texto de cada página, en orden
+
+    Raises:
+        NotReportFormError: Si check_form es True y el PDF no es un reporte F-COM
+    """
+    return list(iter_page_texts(pdf_path, pdf_bytes, check_form))
+
+
+def _line_title(line, titles):
+    """Título de la lista con el que empieza la línea (ya sin espacios), o None"""
+    for title in titles:
+        if line == title or line.startswith(title + ":") or line.startswith(title + " "):
+            return title
+    return None
+
+
+def split_report_pages(page_texts):
+    """
+    Divide las páginas de un PDF que contiene varios reportes seguidos.
+    Un reporte nuevo empieza en la línea donde vuelve a aparecer un título de
+    encabezado (REPORT_BOUNDARY_TITLES) que ya apareció en el reporte actual,
+    aunque sea a mitad de página: las líneas anteriores de esa página quedan en
+    el reporte anterior y las siguientes pasan al nuevo. Si antes de esa línea
+    la página no tiene ningún título de campo (solo encabezados o pies), el
+    reporte nuevo empieza al inicio de la página.
+    Acepta un iterador de páginas y entrega cada reporte en cuanto termina, de
+    modo que solo el reporte en curso se mantiene en memoria.
+
+    Args:
+        page_texts (iterable): Texto de cada página, en orden
+
+    Yields:
+        list: Texto de las páginas de cada reporte; una página dividida aporta
+            su primera parte a un reporte y el resto al siguiente
+    """
+    current_pages = []
+    seen_titles = set()
+    for page_text in page_texts:
+        lines = page_text.split('\n')
+        # Primera línea de la página que todavía no pertenece a ningún reporte
+        start = 0
+        field_seen = False
+        for line_number, line in enumerate(lines):
+            line = line.strip()
+            title = _line_title(line, REPORT_BOUNDARY_TITLES)
+            if title is not None:
+                if title in seen_titles:
+                    split = line_number if field_seen else start
+                    if split > start:
+                        current_pages.append('\n'.join(lines[start:split]) + '\n')
+                    if current_pages:
+                        yield current_pages
+                    current_pages = []
+                    seen_titles = set()
+                    start = split
+                    field_seen = False
+                seen_titles.add(title)
+            if not field_seen and _line_title(line, TITLES_TO_EXTRACT) is not None:
+                field_seen = True
+        current_pages.append('\n'.join(lines[start:]))
+
+    if current_pages:
+        yield current_pages
+
+
+def parse_page_texts(page_texts, file_name):
+    """
+    Analiza el texto de las páginas de un reporte y extrae sus campos.
+    A diferencia de extract_data_from_pdf, propaga las excepciones.
+
+    Args:
+        page_texts (list): Texto de cada página, en orden
+        file_name (str): Nombre del archivo para la columna 'Nombre del Archivo'
+
+    Returns:
+        dict: Datos extraídos con las claves de terminal ya formateadas
+    """
+    full_text = "".join(page_texts)
+
+    lines = full_text.split('\n')
+    data = {}
+
+    data['Nombre del Archivo'] = file_name
+
+    title_counters = {}
+    i = 0
+
+    # Lista de títulos con tratamiento especial
+    special_extraction_titles = [
+        "Correlativo",
+        "Número Afiliado Gestión Afiliado principal",
+        "Atención por",
+        "Nombre del oficial técnico que brinda servicio",
+        "Validación fecha",
+        "Entrega de Papelería y Cantidad"
+    ]
+
+    # Títulos que requieren extracción multilinea
+    multiline_titles = [
+        "Revisión General en cualquier visita",
+        "Detalle de trabajo realizado para cierre de gestión"  # Añadido a la lista de multilinea
+    ]
+
+    # Primera pasada: buscar títulos exactos incluyendo los especiales
+    while i < len(lines):
+        line = lines[i].strip()
+
+        for title in TITLES_TO_EXTRACT:
+            if line == title or line.startswith(title + ":") or line.startswith(title + " "):
+                title_counters[title] = title_counters.get(title, 0) + 1
+                key = f"{title} ({title_counters[title]})" if title_counters[title] > 1 else title
+
+                if ":" in line:
+                    possible_value = line.split(":", 1)[1].strip()
+                    if possible_value:
+                        data[key] = possible_value
+                        i += 1
+                        break
 
-                    if ":" in line:
-                        possible_value = line.split(":", 1)[1].strip()
-                        if possible_value:
-                            data[key] = possible_value
-                            i += 1
+                value = ""
+                j = i + 1
+
+                special_cases = {
+                    "Detalle de trabajo realizado para cierre de gestión": "Ubicación del comercio",
+                    "Evaluaciones a realizar": "¿Comercio tiene Stickers actualizados?",
+                    "Nombre persona que atiende": "Firma:",
+                    "Tipo de gestiones": "Indique si entregó rollos de papel",
+                    "Hora de salida": None,
+                    "Hora de llegada": None
+                }
+                stop_pattern = special_cases.get(title)
+
+                if title in multiline_titles:
+                    multiline_value = []
+                    while j < len(lines):
+                        next_line = lines[j].strip()
+                        if title == "Detalle de trabajo realizado para cierre de gestión" and next_line == stop_pattern:
                             break
+                        if any(next_line.startswith(t) for t in TITLES_TO_EXTRACT) or \
+                                re.match(r'^[A-ZÁÉÍÓÚÑa-záéíóúñ0-9\s#¿?]+:', next_line):
+                            break
+                        if next_line and not any(re.search(pat, next_line) for pat in PATTERNS_TO_EXCLUDE):
+                            multiline_value.append(next_line)
+                        j += 1
+                    if multiline_value:
+                        data[key] = "\n".join(multiline_value)
+                    i = j
+                    break
 
-                    value = ""
-                    j = i + 1
-
-                    special_cases = {
-                        "Detalle de trabajo realizado para cierre de gestión": "Ubicación del comercio",
-                        "Evaluaciones a realizar": "¿Comercio tiene Stickers actualizados?",
-                        "Nombre persona que atiende": "Firma:",
-                        "Tipo de gestiones": "Indique si entregó rollos de papel",
-                        "Hora de salida": None,
-                        "Hora de llegada": None
-                    }
-                    stop_pattern = special_cases.get(title)
-
-                    if title in multiline_titles:
-                        multiline_value = []
-                        while j < len(lines):
-                            next_line = lines[j].strip()
-                            if title == "Detalle de trabajo realizado para cierre de gestión" and next_line == stop_pattern:
-                                break
-                            if any(next_line.startswith(t) for t in TITLES_TO_EXTRACT) or \
-                                    re.match(r'^[A-ZÁÉÍÓÚÑa-záéíóúñ0-9\s#¿?]+:', next_line):
-                                break
-                            if next_line and not any(re.search(pat, next_line) for pat in PATTERNS_TO_EXCLUDE):
-                                multiline_value.append(next_line)
+                while j < len(lines):
+                    next_line = lines[j].strip()
+                    if stop_pattern and next_line.startswith(stop_pattern):
+                        break
+                    if title in ["Hora de salida", "Hora de llegada"]:
+                        time_match = re.search(
+                            r'\d{1,2}:[\d]{2}\s*[APMapm]{2}(?:\s*(?:GMT|UTC)?[+-]?\d{1,2}:\d{2})?',
+                            next_line
+                        )
+                        if time_match:
+                            value = time_match.group(0).strip()
+                        else:
+                            value = next_line.strip()
+                        j += 1
+                        break
+                    if title in special_extraction_titles:
+                        if next_line and not any(next_line.startswith(t) for t in TITLES_TO_EXTRACT):
+                            value = next_line
                             j += 1
-                        if multiline_value:
-                            data[key] = "\n".join(multiline_value)
-                        i = j
+                            break
+                    if title != "Nombre del Afiliado" and (
+                            any(next_line.startswith(t) for t in TITLES_TO_EXTRACT) or
+                            re.match(r'^[A-ZÁÉÍÓÚÑa-záéíóúñ0-9\s#¿?]+:', next_line)
+                    ):
+                        break
+                    if any(re.search(pat, next_line) for pat in PATTERNS_TO_EXCLUDE):
+                        j += 1
+                        continue
+                    if next_line and not any(next_line.startswith(t) for t in TITLES_TO_EXTRACT):
+                        value = next_line
+                        j += 1
                         break
+                    j += 1
+
+                if value:
+                    data[key] = value
+                i = j
+                break
+        else:
+            i += 1
+
+    # Segunda pasada: títulos especiales si faltan
+    for title in special_extraction_titles:
+        if title not in data:
+            i = 0
+            while i < len(lines):
+                line = lines[i].strip()
+                if title.lower() in line.lower():
+                    if ":" in line:
+                        data[title] = line.split(":", 1)[1].strip()
+                    elif i + 1 < len(lines) and lines[i + 1].strip():
+                        data[title] = lines[i + 1].strip()
+                i += 1
+
+    # Búsqueda específica para "Revisión General" y "Detalle de trabajo realizado"
+    for title in multiline_titles:
+        if title not in data:
+            i = 0
+            while i < len(lines):
+                line = lines[i].strip()
+                if line.startswith(title):
+                    j = i + 1
+                    multiline_value = []
+                    stop_pattern = None
+                    if title == "Detalle de trabajo realizado para cierre de gestión":
+                        stop_pattern = "Ubicación del comercio"
 
                     while j < len(lines):
                         next_line = lines[j].strip()
                         if stop_pattern and next_line.startswith(stop_pattern):
                             break
-                        if title in ["Hora de salida", "Hora de llegada"]:
-                            time_match = re.search(
-                                r'\d{1,2}:[\d]{2}\s*[APMapm]{2}(?:\s*(?:GMT|UTC)?[+-]?\d{1,2}:\d{2})?',
-                                next_line
-                            )
-                            if time_match:
-                                value = time_match.group(0).strip()
-                            else:
-                                value = next_line.strip()
-                            j += 1
-                            break
-                        if title in special_extraction_titles:
-                            if next_line and not any(next_line.startswith(t) for t in TITLES_TO_EXTRACT):
-                                value = next_line
-                                j += 1
-                                break
-                        if title != "Nombre del Afiliado" and (
-                                any(next_line.startswith(t) for t in TITLES_TO_EXTRACT) or
-                                re.match(r'^[A-ZÁÉÍÓÚÑa-záéíóúñ0-9\s#¿?]+:', next_line)
-                        ):
-                            break
-                        if any(re.search(pat, next_line) for pat in PATTERNS_TO_EXCLUDE):
-                            j += 1
-                            continue
-                        if next_line and not any(next_line.startswith(t) for t in TITLES_TO_EXTRACT):
-                            value = next_line
-                            j += 1
+                        if any(next_line.startswith(t) for t in TITLES_TO_EXTRACT) or \
+                                re.match(r'^[A-ZÁÉÍÓÚÑa-záéíóúñ0-9\s#¿?]+:', next_line):
                             break
+                        if next_line and not any(re.search(pat, next_line) for pat in PATTERNS_TO_EXCLUDE):
+                            multiline_value.append(next_line)
                         j += 1
+                    if multiline_value:
+                        data[title] = "\n".join(multiline_value)
+                    break
+                i += 1
 
-                    if value:
-                        data[key] = value
-                    i = j
+    # ✅ PROCESAMIENTO ESPECIAL PARA LA TABLA "Entrega de Papelería y Cantidad"
+    if "Entrega de Papelería y Cantidad" in data:
+        material_table_pattern = r"Entrega de Papelería y Cantidad.*?Material\s+Cantidad\s+(.*?)(?:Gestión de Papelería|$)"
+        table_match = re.search(material_table_pattern, full_text, re.DOTALL)
+
+        if table_match:
+            table_content = table_match.group(1).strip()
+            rows = re.findall(r"([^\n]+?)\s+(\d+)(?:\s*$|\n)", table_content)
+
+            if rows:
+                materials_data = []
+                for material, quantity in rows:
+                    materials_data.append(f"{material.strip()}: {quantity.strip()}")
+                data["Entrega de Papelería y Cantidad"] = "\n".join(materials_data)
+
+        elif data.get("Entrega de Papelería y Cantidad") == "":
+            i = 0
+            while i < len(lines):
+                if "Material" in lines[i] and "Cantidad" in lines[i]:
+                    material_line = i + 1
+                    if material_line < len(lines) and lines[material_line].strip():
+                        parts = re.split(r'\s{2,}', lines[material_line].strip())
+                        if len(parts) >= 2:
+                            material = parts[0].strip()
+                            quantity = parts[-1].strip()
+                            data["Entrega de Papelería y Cantidad"] = f"{material}: {quantity}"
                     break
-            else:
                 i += 1
 
-        # Segunda pasada: títulos especiales si faltan
-        for title in special_extraction_titles:
-            if title not in data:
-                i = 0
-                while i < len(lines):
-                    line = lines[i].strip()
-                    if title.lower() in line.lower():
-                        if ":" in line:
-                            data[title] = line.split(":", 1)[1].strip()
-                        elif i + 1 < len(lines) and lines[i + 1].strip():
-                            data[title] = lines[i + 1].strip()
-                    i += 1
-
-        # Búsqueda específica para "Revisión General" y "Detalle de trabajo realizado"
-        for title in multiline_titles:
-            if title not in data:
-                i = 0
-                while i < len(lines):
-                    line = lines[i].strip()
-                    if line.startswith(title):
-                        j = i + 1
-                        multiline_value = []
-                        stop_pattern = None
-                        if title == "Detalle de trabajo realizado para cierre de gestión":
-                            stop_pattern = "Ubicación del comercio"
-
-                        while j < len(lines):
-                            next_line = lines[j].strip()
-                            if stop_pattern and next_line.startswith(stop_pattern):
-                                break
-                            if any(next_line.startswith(t) for t in TITLES_TO_EXTRACT) or \
-                                    re.match(r'^[A-ZÁÉÍÓÚÑa-záéíóúñ0-9\s#¿?]+:', next_line):
-                                break
-                            if next_line and not any(re.search(pat, next_line) for pat in PATTERNS_TO_EXCLUDE):
-                                multiline_value.append(next_line)
-                            j += 1
-                        if multiline_value:
-                            data[title] = "\n".join(multiline_value)
-                        break
-                    i += 1
-
-        # ✅ PROCESAMIENTO ESPECIAL PARA LA TABLA "Entrega de Papelería y Cantidad"
-        if "Entrega de Papelería y Cantidad" in data:
-            material_table_pattern = r"Entrega de Papelería y Cantidad.*?Material\s+Cantidad\s+(.*?)(?:Gestión de Papelería|$)"
-            table_match = re.search(material_table_pattern, full_text, re.DOTALL)
-
-            if table_match:
-                table_content = table_match.group(1).strip()
-                rows = re.findall(r"([^\n]+?)\s+(\d+)(?:\s*$|\n)", table_content)
-
-                if rows:
-                    materials_data = []
-                    for material, quantity in rows:
-                        materials_data.append(f"{material.strip()}: {quantity.strip()}")
-                    data["Entrega de Papelería y Cantidad"] = "\n".join(materials_data)
-
-            elif data.get("Entrega de Papelería y Cantidad") == "":
-                i = 0
-                while i < len(lines):
-                    if "Material" in lines[i] and "Cantidad" in lines[i]:
-                        material_line = i + 1
-                        if material_line < len(lines) and lines[material_line].strip():
-                            parts = re.split(r'\s{2,}', lines[material_line].strip())
-                            if len(parts) >= 2:
-                                material = parts[0].strip()
-                                quantity = parts[-1].strip()
-                                data["Entrega de Papelería y Cantidad"] = f"{material}: {quantity}"
-                        break
-                    i += 1
-
-        # Extracción extra de horas en las últimas páginas
-        try:
-            pdf_document = fitz.open(pdf_path)
-            last_pages_text = ""
-            for page_num in range(max(0, len(pdf_document) - 2), len(pdf_document)):
-                last_pages_text += pdf_document[page_num].get_text()
-            pdf_document.close()
-
-            for label in ["Hora de llegada", "Hora de salida"]:
-                if not any(key.startswith(label) for key in data.keys()):
-                    pattern = rf"{label}[:\s]*([\d]{{1,2}}:[\d]{{2}}\s*[APMapm]{{2}}(?:\s*(?:GMT|UTC)?[+-]?\d{{1,2}}:\d{{2}})?)"
-                    match = re.search(pattern, last_pages_text)
-                    if match:
-                        data[label] = match.group(1).strip()
-        except Exception:
-            pass
-
-        # Búsqueda adicional para "Detalle de trabajo realizado para cierre de gestión"
-        if "Detalle de trabajo realizado para cierre de gestión" not in data:
-            pattern = r"Detalle de trabajo realizado para cierre de gestión:?([\s\S]*?)(?=Ubicación del comercio|" + "|".join(
-                TITLES_TO_EXTRACT) + r"|$)"
+    # Extracción extra de horas en las últimas páginas
+    try:
+        # Reutilizar el texto ya extraído en lugar de volver a abrir el archivo
+        last_pages_text = "".join(page_texts[-2:])
+
+        for label in ["Hora de llegada", "Hora de salida"]:
+            if not any(key.startswith(label) for key in data.keys()):
+                pattern = rf"{label}[:\s]*([\d]{{1,2}}:[\d]{{2}}\s*[APMapm]{{2}}(?:\s*(?:GMT|UTC)?[+-]?\d{{1,2}}:\d{{2}})?)"
+                match = re.search(pattern, last_pages_text)
+                if match:
+                    data[label] = match.group(1).strip()
+    except Exception:
+        pass
+
+    # Búsqueda adicional para "Detalle de trabajo realizado para cierre de gestión"
+    if "Detalle de trabajo realizado para cierre de gestión" not in data:
+        pattern = r"Detalle de trabajo realizado para cierre de gestión:?([\s\S]*?)(?=Ubicación del comercio|" + "|".join(
+            TITLES_TO_EXTRACT) + r"|$)"
+        match = re.search(pattern, full_text, re.IGNORECASE)
+        if match:
+            captured_text = match.group(1).strip()
+            cleaned_lines = [
+                ln.strip() for ln in captured_text.split('\n')
+                if ln.strip() and not any(re.search(pat, ln) for pat in PATTERNS_TO_EXCLUDE)
+            ]
+            if cleaned_lines:
+                data["Detalle de trabajo realizado para cierre de gestión"] = "\n".join(cleaned_lines)
+
+    special_patterns = {
+        "Correlativo": r"Correlativo[:\s]*([^\n]+)",
+        "Número Afiliado Gestión Afiliado principal": r"(?:Número|N[úu]mero)\s*Afiliado\s*Gesti[óo]n\s*Afiliado\s*principal[:\s]*([^\n]+)",
+        "Atención por": r"Atenci[óo]n\s*por[:\s]*([^\n]+)",
+        "Nombre del oficial técnico que brinda servicio": r"Nombre\s*del\s*oficial\s*t[ée]cnico[:\s]*([^\n]+)",
+        "Validación fecha": r"Validaci[óo]n\s*fecha[:\s]*([^\n]+)"
+    }
+    for field, pattern in special_patterns.items():
+        if field not in data:
+            match = re.search(pattern, full_text, re.IGNORECASE)
+            if match:
+                data[field] = match.group(1).strip()
+
+    special_multiline_pattern = {
+        "Revisión General en cualquier visita": r"Revisi[óo]n\s*General\s*en\s*cualquier\s*visita:?([\s\S]*?)(?=(?:" +
+                                                "|".join(TITLES_TO_EXTRACT) + r"|$))"
+    }
+    for field, pattern in special_multiline_pattern.items():
+        if field not in data:
             match = re.search(pattern, full_text, re.IGNORECASE)
             if match:
                 captured_text = match.group(1).strip()
@@ -241,41 +456,60 @@ def extract_data_from_pdf(pdf_path):
                     if ln.strip() and not any(re.search(pat, ln) for pat in PATTERNS_TO_EXCLUDE)
                 ]
                 if cleaned_lines:
-                    data["Detalle de trabajo realizado para cierre de gestión"] = "\n".join(cleaned_lines)
-
-        special_patterns = {
-            "Correlativo": r"Correlativo[:\s]*([^\n]+)",
-            "Número Afiliado Gestión Afiliado principal": r"(?:Número|N[úu]mero)\s*Afiliado\s*Gesti[óo]n\s*Afiliado\s*principal[:\s]*([^\n]+)",
-            "Atención por": r"Atenci[óo]n\s*por[:\s]*([^\n]+)",
-            "Nombre del oficial técnico que brinda servicio": r"Nombre\s*del\s*oficial\s*t[ée]cnico[:\s]*([^\n]+)",
-            "Validación fecha": r"Validaci[óo]n\s*fecha[:\s]*([^\n]+)"
-        }
-        for field, pattern in special_patterns.items():
-            if field not in data:
-                match = re.search(pattern, full_text, re.IGNORECASE)
-                if match:
-                    data[field] = match.group(1).strip()
-
-        special_multiline_pattern = {
-            "Revisión General en cualquier visita": r"Revisi[óo]n\s*General\s*en\s*cualquier\s*visita:?([\s\S]*?)(?=(?:" +
-                                                    "|".join(TITLES_TO_EXTRACT) + r"|$))"
-        }
-        for field, pattern in special_multiline_pattern.items():
-            if field not in data:
-                match = re.search(pattern, full_text, re.IGNORECASE)
-                if match:
-                    captured_text = match.group(1).strip()
-                    cleaned_lines = [
-                        ln.strip() for ln in captured_text.split('\n')
-                        if ln.strip() and not any(re.search(pat, ln) for pat in PATTERNS_TO_EXCLUDE)
-                    ]
-                    if cleaned_lines:
-                        data[field] = "\n".join(cleaned_lines)
+                    data[field] = "\n".join(cleaned_lines)
+
+    process_terminal_data(data)
+
+    return data
+
+
+def add_report_source(data, pdf_path, report_index=1):
+    """
+    Añade a los datos de un reporte la ruta completa del PDF y la posición del
+    reporte dentro del archivo, que junto con el correlativo lo identifican
+    aunque otro PDF de otra carpeta tenga el mismo nombre.
+
+    Args:
+        data (dict): Datos extraídos por parse_page_texts
+        pdf_path (str): Ruta al archivo PDF
+        report_index (int): Posición del reporte dentro del PDF (desde 1)
+
+    Returns:
+        dict: Los mismos datos, con FILE_PATH_COLUMN y REPORT_INDEX_COLUMN
+    """
+    data[FILE_PATH_COLUMN] = os.path.abspath(pdf_path)
+    data[REPORT_INDEX_COLUMN] = report_index
+    return data
+
 
-        process_terminal_data(data)
+def extract_data_from_pdf(pdf_path, pdf_bytes=None):
+    try:
+        page_texts = read_page_texts(pdf_path, pdf_bytes)
+        return add_report_source(parse_page_texts(page_texts, os.path.basename(pdf_path)), pdf_path)
+
+    except Exception as e:
+        print(f"Error al procesar el PDF {pdf_path}: {str(e)}")
+        return None
 
-        return data
+
+def extract_reports_from_pdf(pdf_path, pdf_bytes=None):
+    """
+    Extrae todos los reportes de un PDF, que puede contener varios reportes
+    seguidos (ver split_report_pages). Las páginas se leen en una sola pasada.
+
+    Args:
+        pdf_path (str): Ruta al archivo PDF
+        pdf_bytes (bytes, optional): Contenido del archivo ya leído
+
+    Returns:
+        list: Datos extraídos de cada reporte; vacía si el PDF no pudo procesarse
+    """
+    try:
+        file_name = os.path.basename(pdf_path)
+        return [add_report_source(parse_page_texts(report_pages, file_name), pdf_path, report_index)
+                for report_index, report_pages
+                in enumerate(split_report_pages(iter_page_texts(pdf_path, pdf_bytes)), start=1)]
 
     except Exception as e:
         print(f"Error al procesar el PDF {pdf_path}: {str(e)}")
-        return None
\ No newline at end of file
+        return []
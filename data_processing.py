@@ -10,15 +10,54 @@ Módulos relacionados:
 - data_extraction.py: Utiliza estas funciones para procesar los datos extraídos
 """
 
+import importlib.util
+import re
 import pandas as pd
 from constants import (
     REPEATING_TITLES,
     MAX_REPETITIONS,
     BASE_TITLES,
     TERMINAL_FORMATTED_TITLES,
-    ALL_POSSIBLE_TITLES
+    ALL_POSSIBLE_TITLES,
+    DATE_COLUMNS,
+    TIME_COLUMNS,
+    INTEGER_COLUMNS,
+    PAPELERIA_TOTAL_COLUMN,
+    VISIT_DURATION_COLUMN,
+    UNPARSED_SUFFIX,
+    TIME_OFFSET_SUFFIX,
+    CATEGORY_FIELDS,
+    FILE_PATH_COLUMN,
+    REPORT_INDEX_COLUMN
 )
 
+# Hora en formato de 12 horas con desplazamiento opcional: "9:15 AM GMT-06:00"
+TIME_PATTERN = (r'(\d{1,2}):(\d{2})\s*([APap])\.?\s*[Mm]\.?'
+                r'(?:\s*(?:GMT|UTC)?\s*([+-])(\d{1,2}):(\d{2}))?')
+
+# Cantidades de la tabla de papelería: "Material: 5" en cada línea
+PAPELERIA_QUANTITY_PATTERN = r':\s*(\d+)\s*(?:\n|$)'
+
+# Tipo de las columnas de texto del resultado: cada columna es un único arreglo
+# de Arrow en lugar de un objeto str de Python por celda
+ARROW_STRING_DTYPE = "string[pyarrow]"
+
+
+def result_string_dtype():
+    """
+    Tipo de texto de las columnas del resultado.
+
+    Returns:
+        str: ARROW_STRING_DTYPE, o "string" si pyarrow no está instalado
+    """
+    return ARROW_STRING_DTYPE if importlib.util.find_spec("pyarrow") else "string"
+
+
+def _is_text_column(series):
+    """Indica si una columna contiene texto (objetos o cadenas, no categorías)"""
+    return series.dtype == object or (pd.api.types.is_string_dtype(series)
+                                      and not isinstance(series.dtype, pd.CategoricalDtype))
+
 
 def process_terminal_data(data):
     """
@@ -48,13 +87,18 @@ def process_terminal_data(data):
                 data[formatted_key] = grouped[i][field]
 
 
-def merge_dataframes(df_list):
+def merge_dataframes(df_list, arrow_strings=True):
     """
     Combina múltiples DataFrames en uno solo, asegurando que todas las columnas
-    estén presentes y ordenadas correctamente.
+    estén presentes y ordenadas correctamente. Las columnas de texto (también
+    las que faltan en un bloque, que quedan nulas) usan el tipo de
+    result_string_dtype, de modo que los bloques se concatenan sin volver a
+    columnas de objetos.
 
     Args:
         df_list (list): Lista de DataFrames a combinar
+        arrow_strings (bool): Si es False, conserva las columnas de objetos de
+            Python (solo para comparar memoria y tiempo)
 
     Returns:
         pd.DataFrame: DataFrame combinado con todas las columnas ordenadas
@@ -75,6 +119,8 @@ def merge_dataframes(df_list):
     # Definir orden deseado
     non_repeating_columns = [
         'Nombre del Archivo',
+        FILE_PATH_COLUMN,
+        REPORT_INDEX_COLUMN,
         'Fecha de Reporte',
         'Correlativo',
         'Número Afiliado Gestión Afiliado principal',
@@ -134,6 +180,8 @@ def merge_dataframes(df_list):
 
     all_columns_ordered = ordered_columns + remaining_columns
 
+    string_dtype = result_string_dtype() if arrow_strings else None
+
     complete_dfs = []
     for df in df_list:
         # Primero eliminar las columnas no deseadas de cada DataFrame
@@ -145,16 +193,300 @@ def merge_dataframes(df_list):
 
         # Crear un nuevo DataFrame con todas las columnas requeridas
         # Esto evita la fragmentación al añadir columnas una por una
+        # Las columnas que faltan comparten un mismo arreglo de nulos
+        missing_values = pd.array([None] * len(df), dtype=string_dtype) if string_dtype else None
         new_data = {}
         for col in all_columns_ordered:
-            if col in df.columns:
-                new_data[col] = df[col]
+            if col not in df.columns:
+                new_data[col] = missing_values if string_dtype else [None] * len(df)
+            elif string_dtype and _is_text_column(df[col]):
+                new_data[col] = df[col].astype(string_dtype)
             else:
-                new_data[col] = [None] * len(df)
+                new_data[col] = df[col]
 
         # Crear un nuevo DataFrame sin fragmentación
         new_df = pd.DataFrame(new_data, columns=all_columns_ordered)
         complete_dfs.append(new_df)
 
     result_df = pd.concat(complete_dfs, ignore_index=True)
-    return result_df
\ No newline at end of file
+    return result_df
+
+
+def categorize_result_columns(dataframe):
+    """
+    Convierte a categorías las columnas de terminal de CATEGORY_FIELDS ("Modelo
+    de Terminal", "Esta serie fue", ...) de todas las terminales. Se aplica al
+    resultado final: los bloques con categorías distintas no se concatenan
+    como categorías.
+
+    Args:
+        dataframe (pd.DataFrame): Resultado combinado
+
+    Returns:
+        pd.DataFrame: Resultado con las columnas convertidas; el resto de las
+            columnas no se copia
+    """
+    columns = [column for column in dataframe.columns
+               if column.startswith("Terminal") and " - " in column
+               and column.split(" - ", 1)[1] in CATEGORY_FIELDS
+               and _is_text_column(dataframe[column])]
+    if not columns:
+        return dataframe
+    return dataframe.astype({column: "category" for column in columns})
+
+
+def get_terminal_sort_key(column_name):
+    """
+    Crea una clave de ordenación segura para nombres de columna de terminal.
+
+    Args:
+        column_name (str): Nombre de la columna
+
+    Returns:
+        tuple: Clave de ordenación (número de terminal, parte del campo)
+    """
+    # Intentar extraer un número después de "Terminal"
+    match = re.search(r"Terminal\s*(\d+)", column_name)
+    terminal_num = int(match.group(1)) if match else 1
+
+    # Obtener la parte después del guión si existe
+    field_part = column_name.split(" - ")[1] if " - " in column_name else column_name
+
+    return (terminal_num, field_part)
+
+
+def order_result_columns(columns):
+    """
+    Define el orden de las columnas del resultado que se muestra y exporta.
+
+    Args:
+        columns (iterable): Columnas del DataFrame combinado por merge_dataframes
+
+    Returns:
+        list: Columnas en el orden de presentación
+    """
+    columns = list(columns)
+
+    # 1. Primero las columnas importantes
+    important_cols = ['Nombre del Archivo', FILE_PATH_COLUMN, REPORT_INDEX_COLUMN,
+                      'Fecha de Reporte', 'Correlativo',
+                      'Número Afiliado Gestión', 'Nombre del Afiliado']
+
+    # 2. Luego los títulos base (una sola vez)
+    ordered_cols = [col for col in important_cols if col in columns]
+
+    # 3. Añadir el resto de títulos base en orden alfabético
+    other_base_cols = [col for col in BASE_TITLES
+                       if col in columns and col not in ordered_cols]
+    other_base_cols.sort()
+    ordered_cols.extend(other_base_cols)
+
+    # 4. Añadir las columnas de terminal formateadas
+    terminal_cols = [col for col in columns
+                     if "Terminal" in col and " - " in col]
+
+    # Ordenar columnas de terminal usando la función segura de extracción de número
+    terminal_cols.sort(key=get_terminal_sort_key)
+    ordered_cols.extend(terminal_cols)
+
+    # 5. Finalmente, añadir cualquier columna restante
+    remaining_cols = [col for col in columns
+                      if col not in ordered_cols]
+    remaining_cols.sort()
+    ordered_cols.extend(remaining_cols)
+
+    return ordered_cols
+
+
+def report_keys(dataframe, by_path=True):
+    """
+    Calcula la clave de texto que identifica cada reporte del resultado.
+    Las filas con ruta usan "ruta | posición del reporte | correlativo"; las que
+    no la tienen (exportadas antes de existir FILE_PATH_COLUMN), o todas si
+    by_path es False, usan "archivo.pdf | correlativo".
+
+    Args:
+        dataframe (pd.DataFrame): Datos con las columnas de origen del reporte
+        by_path (bool): Usar la ruta cuando la fila la tiene
+
+    Returns:
+        pd.Series: Claves de texto
+    """
+    def text(column):
+        if column not in dataframe.columns:
+            return pd.Series("", index=dataframe.index, dtype="string")
+        return dataframe[column].astype("string").fillna("")
+
+    name_keys = text('Nombre del Archivo') + " | " + text('Correlativo')
+    if not by_path:
+        return name_keys.astype(object)
+
+    paths = text(FILE_PATH_COLUMN)
+    # La posición puede leerse como texto, entero o decimal según el formato
+    if REPORT_INDEX_COLUMN in dataframe.columns:
+        positions = pd.to_numeric(dataframe[REPORT_INDEX_COLUMN], errors="coerce").astype("Int64")
+        positions = positions.astype("string").fillna("")
+    else:
+        positions = text(REPORT_INDEX_COLUMN)
+    path_keys = paths + " | " + positions + " | " + text('Correlativo')
+    return path_keys.where(paths != "", name_keys).astype(object)
+
+
+def _text_values(series):
+    """
+    Convierte una columna a texto sin espacios sobrantes; vacíos pasan a nulos.
+
+    Args:
+        series (pd.Series): Columna original
+
+    Returns:
+        pd.Series: Columna de tipo string
+    """
+    text = series.astype("string").str.strip()
+    return text.mask(text == "")
+
+
+def _unparsed_values(text, converted):
+    """
+    Obtiene los valores con texto que no se pudieron convertir.
+
+    Args:
+        text (pd.Series): Valores originales como texto
+        converted (pd.Series): Valores convertidos (nulos si falló)
+
+    Returns:
+        pd.Series: Texto original donde la conversión falló, nulo en el resto
+    """
+    return text.where(text.notna() & converted.isna())
+
+
+def parse_dates(series):
+    """
+    Convierte fechas a datetime. Primero se interpretan las fechas ISO
+    (2024-03-05) y el resto con el día primero (05/03/2024).
+
+    Args:
+        series (pd.Series): Fechas como texto
+
+    Returns:
+        pd.Series: Fechas de tipo datetime64 (NaT si no se pudo convertir)
+    """
+    text = _text_values(series)
+    iso_dates = pd.to_datetime(text, errors="coerce", format="ISO8601")
+    other_dates = pd.to_datetime(text.where(iso_dates.isna()), errors="coerce",
+                                 format="mixed", dayfirst=True)
+    return iso_dates.fillna(other_dates).astype("datetime64[ns]")
+
+
+def parse_times(series):
+    """
+    Convierte horas de 12 horas con desplazamiento GMT opcional.
+
+    Args:
+        series (pd.Series): Horas como texto ("9:15 AM GMT-06:00")
+
+    Returns:
+        tuple: (hora local como timedelta desde medianoche,
+                desplazamiento respecto a GMT en minutos, nulo si no se indica)
+    """
+    parts = _text_values(series).str.extract(TIME_PATTERN)
+    hours = pd.to_numeric(parts[0], errors="coerce")
+    minutes = pd.to_numeric(parts[1], errors="coerce")
+    is_pm = parts[2].str.upper() == "P"
+    valid = (hours >= 1) & (hours <= 12) & (minutes < 60)
+
+    local_minutes = (hours % 12 + is_pm.fillna(False).astype(int) * 12) * 60 + minutes
+    local_minutes = local_minutes.where(valid)
+
+    offset_sign = parts[3].map({"+": 1, "-": -1})
+    offset_minutes = offset_sign * (pd.to_numeric(parts[4], errors="coerce") * 60 +
+                                    pd.to_numeric(parts[5], errors="coerce"))
+
+    return pd.to_timedelta(local_minutes, unit="m").astype("timedelta64[ns]"), offset_minutes
+
+
+def normalize_result_types(dataframe):
+    """
+    Convierte columnas de texto a tipos adecuados usando operaciones vectorizadas:
+    fechas a datetime, horas a timedelta (hora local desde medianoche) y
+    cantidades a enteros. El desplazamiento GMT de cada hora se conserva en una
+    columna "<columna> (desplazamiento GMT, min)". Añade la duración de la
+    visita en minutos y el total de papelería entregada. Los valores que no se
+    pueden convertir se conservan en una columna "<columna> (sin normalizar)".
+
+    Args:
+        dataframe (pd.DataFrame): Resultado de merge_dataframes
+
+    Returns:
+        pd.DataFrame: Copia con las columnas convertidas y las derivadas al final;
+            las columnas que no cambian comparten los datos con el original
+    """
+    result_df = dataframe.copy(deep=False)
+    unparsed_columns = {}
+
+    for column in DATE_COLUMNS:
+        if column in result_df.columns:
+            text = _text_values(result_df[column])
+            result_df[column] = parse_dates(text)
+            unparsed_columns[column + UNPARSED_SUFFIX] = _unparsed_values(text, result_df[column])
+
+    utc_minutes = {}
+    offset_columns = {}
+    for column in TIME_COLUMNS:
+        if column in result_df.columns:
+            text = _text_values(result_df[column])
+            local_time, offset_minutes = parse_times(text)
+            result_df[column] = local_time
+            offset_columns[column + TIME_OFFSET_SUFFIX] = (
+                offset_minutes.where(local_time.notna()).astype("Int64"))
+            unparsed_columns[column + UNPARSED_SUFFIX] = _unparsed_values(text, local_time)
+            # Sin desplazamiento indicado, la hora se toma como GMT
+            utc_minutes[column] = local_time.dt.total_seconds() / 60 - offset_minutes.fillna(0)
+
+    for column in INTEGER_COLUMNS:
+        if column in result_df.columns:
+            text = _text_values(result_df[column])
+            numbers = pd.to_numeric(text.str.extract(r'^(\d+)$')[0], errors="coerce")
+            result_df[column] = numbers.astype("Int64")
+            unparsed_columns[column + UNPARSED_SUFFIX] = _unparsed_values(text, result_df[column])
+
+    derived_columns = {}
+
+    # Duración de la visita; si la salida es anterior a la llegada se asume que cruzó la medianoche
+    if len(utc_minutes) == 2:
+        duration = (utc_minutes["Hora de salida"] - utc_minutes["Hora de llegada"]) % (24 * 60)
+        derived_columns[VISIT_DURATION_COLUMN] = duration.round().astype("Int64")
+
+    papeleria_column = "Entrega de Papelería y Cantidad"
+    if papeleria_column in result_df.columns:
+        quantities = _text_values(result_df[papeleria_column]).str.extractall(PAPELERIA_QUANTITY_PATTERN)[0]
+        totals = pd.to_numeric(quantities).groupby(level=0).sum()
+        derived_columns[PAPELERIA_TOTAL_COLUMN] = totals.reindex(result_df.index).astype("Int64")
+
+    new_columns = pd.DataFrame({**derived_columns, **offset_columns, **unparsed_columns},
+                               index=result_df.index)
+    return pd.concat([result_df, new_columns], axis=1)
+
+
+def dataframe_to_arrow(dataframe, schema=None):
+    """
+    Convierte un DataFrame de resultados a una tabla Arrow conservando los tipos
+    normalizados; las columnas de objetos (texto o nulos) se guardan como texto
+    y las categorías como diccionarios.
+
+    Args:
+        dataframe (pd.DataFrame): Datos a convertir
+        schema (pyarrow.Schema, optional): Esquema al que se ajusta la tabla
+
+    Returns:
+        pyarrow.Table: Tabla sin índice
+    """
+    import pyarrow as pa
+
+    text_columns = [column for column in dataframe.columns if _is_text_column(dataframe[column])]
+    if text_columns:
+        dataframe = dataframe.astype({column: "string" for column in text_columns})
+    table = pa.Table.from_pandas(dataframe, preserve_index=False)
+    if schema is not None:
+        table = table.select(schema.names).cast(schema)
+    return table
@@ -0,0 +1,358 @@
+# extraction_api.py
+
+"""
+API de biblioteca para extraer lotes de PDFs sin interfaz gráfica.
+extract_many() procesa las rutas de forma perezosa y devuelve un registro
+tipado y compacto por reporte, con su estado, el error si lo hubo y los
+tiempos de lectura y análisis, sin construir DataFrames. Un PDF con varios
+reportes seguidos produce un registro por reporte (ver extract_reports).
+
+Ejemplo:
+    for record in extract_many(rutas):
+        if record.ok:
+            print(record.correlativo, [t.numero_de_serie for t in record.terminals])
+
+Módulos relacionados:
+- data_extraction.py: Lee y analiza el texto de cada PDF
+- pdf_prefetch.py: Lee por adelantado los archivos del lote
+- page_text_cache.py: Caché del texto de las páginas para re-analizar sin abrir los PDFs
+"""
+
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from constants import MAX_REPETITIONS, FILE_PATH_COLUMN, REPORT_INDEX_COLUMN
+from data_extraction import (read_page_texts, iter_page_texts, parse_page_texts,
+                             split_report_pages, NotReportFormError)
+from pdf_prefetch import PDFPrefetcher
+
+# Estados posibles de un registro
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+STATUS_SKIPPED = "skipped"  # No es un reporte F-COM (detección previa)
+
+# Atributo de ReportRecord para cada título base
+BASE_FIELDS = {
+    "Fecha de Reporte": "fecha_de_reporte",
+    "Correlativo": "correlativo",
+    "Indique número de SS": "numero_de_ss",
+    "#Oportunidad": "oportunidad",
+    "Número Afiliado Gestión Afiliado principal": "numero_afiliado",
+    "Nombre del Afiliado": "nombre_del_afiliado",
+    "Nombre del oficial técnico que brinda servicio": "oficial_tecnico",
+    "Evaluaciones a realizar": "evaluaciones_a_realizar",
+    "Entrega de Papelería y Cantidad": "entrega_de_papeleria",
+    "Cierre de gestión": "cierre_de_gestion",
+    "Nombre persona que atiende": "persona_que_atiende",
+    "Detalle de trabajo realizado para cierre de gestión": "detalle_de_trabajo",
+    "¿Es posible capturar el correo electrónico del comercio?": "captura_correo",
+    "Fecha resolución": "fecha_resolucion",
+    "Validación fecha": "validacion_fecha",
+    "Hora de llegada": "hora_de_llegada",
+    "Hora de salida": "hora_de_salida",
+    "Tipo de terminal instalada, reprogramada o retirada": "tipo_de_terminal",
+    "¿POS GSM Prestada?": "pos_gsm_prestada",
+    "Cantidad GSM": "cantidad_gsm",
+    "Datos de terminal": "datos_de_terminal",
+    "¿Instalar SIM adicional?": "instalar_sim_adicional",
+    "¿El datáfono instalado lleva código QR?": "lleva_codigo_qr",
+    "Tipo de gestiones": "tipo_de_gestiones",
+    "Atención por": "atencion_por",
+    "Técnico que atiende": "tecnico_que_atiende",
+    "Revisión General en cualquier visita": "revision_general",
+}
+
+# Atributo de TerminalRecord para cada título repetido
+TERMINAL_FIELDS = {
+    "Actualización en Sistema Adquirente": "actualizacion_sistema_adquirente",
+    "Esta serie fue": "esta_serie_fue",
+    "Esta serie lleva SIM": "esta_serie_lleva_sim",
+    "Modelo de Terminal": "modelo_de_terminal",
+    "Número de SIM": "numero_de_sim",
+    "Número de Serie": "numero_de_serie",
+    "Número de Terminal": "numero_de_terminal",
+    "Comentario": "comentario",
+}
+
+
+@dataclass(slots=True)
+class TerminalRecord:
+    """Datos de una terminal (bloque 'Terminal N - Campo')"""
+    index: int
+    actualizacion_sistema_adquirente: Optional[str] = None
+    esta_serie_fue: Optional[str] = None
+    esta_serie_lleva_sim: Optional[str] = None
+    modelo_de_terminal: Optional[str] = None
+    numero_de_sim: Optional[str] = None
+    numero_de_serie: Optional[str] = None
+    numero_de_terminal: Optional[str] = None
+    comentario: Optional[str] = None
+
+
+@dataclass(slots=True)
+class ReportRecord:
+    """Resultado de la extracción de un PDF"""
+    path: str
+    file_name: str
+    status: str = STATUS_OK
+    error: Optional[str] = None
+    pages: int = 0
+    read_seconds: float = 0.0
+    parse_seconds: float = 0.0
+    report_index: int = 1
+    fecha_de_reporte: Optional[str] = None
+    correlativo: Optional[str] = None
+    numero_de_ss: Optional[str] = None
+    oportunidad: Optional[str] = None
+    numero_afiliado: Optional[str] = None
+    nombre_del_afiliado: Optional[str] = None
+    oficial_tecnico: Optional[str] = None
+    evaluaciones_a_realizar: Optional[str] = None
+    entrega_de_papeleria: Optional[str] = None
+    cierre_de_gestion: Optional[str] = None
+    persona_que_atiende: Optional[str] = None
+    detalle_de_trabajo: Optional[str] = None
+    captura_correo: Optional[str] = None
+    fecha_resolucion: Optional[str] = None
+    validacion_fecha: Optional[str] = None
+    hora_de_llegada: Optional[str] = None
+    hora_de_salida: Optional[str] = None
+    tipo_de_terminal: Optional[str] = None
+    pos_gsm_prestada: Optional[str] = None
+    cantidad_gsm: Optional[str] = None
+    datos_de_terminal: Optional[str] = None
+    instalar_sim_adicional: Optional[str] = None
+    lleva_codigo_qr: Optional[str] = None
+    tipo_de_gestiones: Optional[str] = None
+    atencion_por: Optional[str] = None
+    tecnico_que_atiende: Optional[str] = None
+    revision_general: Optional[str] = None
+    terminals: List[TerminalRecord] = field(default_factory=list)
+    # Claves que no son títulos base ni de terminal ("Cierre de gestión (2)", ...)
+    extra: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def ok(self):
+        """Indica si la extracción terminó sin errores"""
+        return self.status == STATUS_OK
+
+    @property
+    def elapsed_seconds(self):
+        """Tiempo total de lectura y análisis"""
+        return self.read_seconds + self.parse_seconds
+
+    def to_row(self):
+        """
+        Convierte el registro al diccionario plano con las claves de columna
+        usadas por merge_dataframes ('Correlativo', 'Terminal 2 - Número de Serie', ...).
+
+        Returns:
+            dict: Campos con valor, más 'Nombre del Archivo', la ruta y la posición
+                del reporte; las mismas claves que devuelve extract_data_from_pdf
+        """
+        row = {'Nombre del Archivo': self.file_name,
+               FILE_PATH_COLUMN: os.path.abspath(self.path),
+               REPORT_INDEX_COLUMN: self.report_index}
+        for title, attribute in BASE_FIELDS.items():
+            value = getattr(self, attribute)
+            if value is not None:
+                row[title] = value
+        row.update(self.extra)
+        for terminal in self.terminals:
+            prefix = "" if terminal.index == 1 else f" {terminal.index}"
+            for title, attribute in TERMINAL_FIELDS.items():
+                value = getattr(terminal, attribute)
+                if value is not None:
+                    row[f"Terminal{prefix} - {title}"] = value
+        return row
+
+
+def record_from_data(data, path, pages=0, read_seconds=0.0, parse_seconds=0.0, report_index=1):
+    """
+    Construye un ReportRecord a partir del diccionario de extract_data_from_pdf.
+    Las claves que no corresponden a ningún atributo se guardan en extra.
+
+    Args:
+        data (dict): Datos extraídos con claves de terminal formateadas
+        path (str): Ruta al archivo PDF
+        pages (int): Número de páginas del documento
+        read_seconds (float): Tiempo de lectura del texto
+        parse_seconds (float): Tiempo de análisis del texto
+        report_index (int): Posición del reporte dentro del PDF (desde 1)
+
+    Returns:
+        ReportRecord: Registro con los campos del reporte
+    """
+    record = ReportRecord(path=path, file_name=data.get('Nombre del Archivo', os.path.basename(path)),
+                          pages=pages, read_seconds=read_seconds, parse_seconds=parse_seconds,
+                          report_index=report_index)
+    used_keys = {'Nombre del Archivo', FILE_PATH_COLUMN, REPORT_INDEX_COLUMN}
+    for title, attribute in BASE_FIELDS.items():
+        if title in data:
+            setattr(record, attribute, data[title])
+            used_keys.add(title)
+
+    for i in range(1, MAX_REPETITIONS + 1):
+        prefix = "" if i == 1 else f" {i}"
+        values = {}
+        for title, attribute in TERMINAL_FIELDS.items():
+            key = f"Terminal{prefix} - {title}"
+            if key in data:
+                values[attribute] = data[key]
+                used_keys.add(key)
+        if values:
+            record.terminals.append(TerminalRecord(index=i, **values))
+
+    record.extra = {key: value for key, value in data.items() if key not in used_keys}
+    return record
+
+
+def _parse_record(pdf_path, page_texts, read_seconds, file_name=None, report_index=1):
+    """
+    Analiza el texto de las páginas y construye el registro del reporte.
+
+    Args:
+        pdf_path (str): Ruta al archivo PDF
+        page_texts (list): Texto de cada página del reporte
+        read_seconds (float): Tiempo de lectura del texto
+        file_name (str, optional): Nombre del archivo; por defecto el de pdf_path
+        report_index (int): Posición del reporte dentro del PDF (desde 1)
+
+    Returns:
+        ReportRecord: Registro con estado STATUS_OK o STATUS_ERROR
+    """
+    file_name = file_name or os.path.basename(pdf_path)
+    start = time.perf_counter()
+    try:
+        data = parse_page_texts(page_texts, file_name)
+    except Exception as e:
+        return ReportRecord(path=pdf_path, file_name=file_name,
+                            status=STATUS_ERROR, error=str(e), pages=len(page_texts),
+                            read_seconds=read_seconds, report_index=report_index,
+                            parse_seconds=time.perf_counter() - start)
+
+    return record_from_data(data, pdf_path, pages=len(page_texts), read_seconds=read_seconds,
+                            parse_seconds=time.perf_counter() - start, report_index=report_index)
+
+
+def extract_one(pdf_path, pdf_bytes=None, cache=None, check_form=False):
+    """
+    Extrae un PDF como un único reporte y devuelve su registro; los errores
+    quedan en el registro. Para PDFs que pueden contener varios reportes
+    seguidos, use extract_reports.
+
+    Args:
+        pdf_path (str): Ruta al archivo PDF
+        pdf_bytes (bytes, optional): Contenido del archivo ya leído
+        cache (PageTextCache, optional): Caché del texto de las páginas; si se
+            indica, el texto se toma del caché cuando el archivo ya está en él
+        check_form (bool): Si es True, los PDFs que según su primera página no
+            son reportes F-COM se omiten sin analizarlos (estado STATUS_SKIPPED)
+
+    Returns:
+        ReportRecord: Registro con estado STATUS_OK, STATUS_ERROR o STATUS_SKIPPED
+    """
+    start = time.perf_counter()
+    try:
+        if cache is not None:
+            page_texts = cache.read_page_texts(pdf_path, pdf_bytes, check_form=check_form)
+        else:
+            page_texts = read_page_texts(pdf_path, pdf_bytes, check_form=check_form)
+    except NotReportFormError as e:
+        return ReportRecord(path=pdf_path, file_name=os.path.basename(pdf_path),
+                            status=STATUS_SKIPPED, error=str(e),
+                            read_seconds=time.perf_counter() - start)
+    except Exception as e:
+        return ReportRecord(path=pdf_path, file_name=os.path.basename(pdf_path),
+                            status=STATUS_ERROR, error=str(e),
+                            read_seconds=time.perf_counter() - start)
+
+    return _parse_record(pdf_path, page_texts, time.perf_counter() - start)
+
+
+def extract_reports(pdf_path, pdf_bytes=None, cache=None, check_form=False):
+    """
+    Extrae todos los reportes de un PDF, que puede contener varios reportes
+    seguidos (ver data_extraction.split_report_pages). Las páginas se leen en
+    una sola pasada y cada reporte se entrega en cuanto termina, de modo que
+    un archivo muy grande no se mantiene completo en memoria.
+
+    Args:
+        pdf_path (str): Ruta al archivo PDF
+        pdf_bytes (bytes, optional): Contenido del archivo ya leído
+        cache (PageTextCache, optional): Caché del texto de las páginas (con
+            caché, el texto del archivo se obtiene completo antes de dividirlo)
+        check_form (bool): Omitir el PDF si no es un reporte F-COM
+
+    Yields:
+        ReportRecord: Registro de cada reporte (report_index 1, 2, ...), o un
+            único registro con estado STATUS_ERROR o STATUS_SKIPPED
+    """
+    start = time.perf_counter()
+    report_index = 0
+    try:
+        if cache is not None:
+            page_texts = cache.read_page_texts(pdf_path, pdf_bytes, check_form=check_form)
+        else:
+            page_texts = iter_page_texts(pdf_path, pdf_bytes, check_form=check_form)
+        for report_pages in split_report_pages(page_texts):
+            report_index += 1
+            yield _parse_record(pdf_path, report_pages, time.perf_counter() - start,
+                                report_index=report_index)
+            start = time.perf_counter()
+    except NotReportFormError as e:
+        yield ReportRecord(path=pdf_path, file_name=os.path.basename(pdf_path),
+                           status=STATUS_SKIPPED, error=str(e),
+                           read_seconds=time.perf_counter() - start)
+    except Exception as e:
+        yield ReportRecord(path=pdf_path, file_name=os.path.basename(pdf_path),
+                           status=STATUS_ERROR, error=str(e), report_index=report_index + 1,
+                           read_seconds=time.perf_counter() - start)
+
+
+def extract_many(paths, prefetch=True, cache=None, check_form=False, **prefetch_options):
+    """
+    Extrae un lote de PDFs de forma perezosa, un registro por reporte y en el
+    mismo orden que las rutas recibidas.
+
+    Args:
+        paths (iterable): Rutas a archivos PDF
+        prefetch (bool): Si es True, lee por adelantado los siguientes archivos
+            en segundo plano (ver pdf_prefetch.PDFPrefetcher)
+        cache (PageTextCache, optional): Caché del texto de las páginas
+        check_form (bool): Omitir los PDFs que no son reportes F-COM
+        **prefetch_options: Opciones para PDFPrefetcher (max_workers,
+            max_ahead, max_bytes)
+
+    Yields:
+        ReportRecord: Registro de cada reporte
+    """
+    if not prefetch:
+        for pdf_path in paths:
+            yield from extract_reports(pdf_path, cache=cache, check_form=check_form)
+        return
+
+    with PDFPrefetcher(paths, **prefetch_options) as prefetcher:
+        for pdf_path, pdf_bytes in prefetcher:
+            yield from extract_reports(pdf_path, pdf_bytes, cache=cache, check_form=check_form)
+
+
+def reparse_cache(cache_dir):
+    """
+    Vuelve a analizar, con las reglas actuales, el texto guardado en el caché
+    de páginas, sin abrir ningún PDF.
+
+    Args:
+        cache_dir (str): Carpeta del caché (ver page_text_cache.PageTextCache)
+
+    Yields:
+        ReportRecord: Registro de cada reporte de las entradas del caché
+    """
+    from page_text_cache import PageTextCache
+
+    for entry in PageTextCache(cache_dir).iter_entries():
+        for report_index, report_pages in enumerate(split_report_pages(entry["pages"]), start=1):
+            yield _parse_record(entry["path"], report_pages, 0.0, file_name=entry["file_name"],
+                                report_index=report_index)
@@ -0,0 +1,467 @@
+# extraction_service.py
+
+"""
+Servicio HTTP local de extracción para otras herramientas internas.
+Mantiene un grupo de procesos trabajadores ya iniciados (con PyMuPDF y pandas
+cargados) que ejecutan extraction_api.extract_reports, de modo que cada petición
+no paga el arranque de Python ni la importación de las bibliotecas. Si un
+trabajador termina inesperadamente, el grupo se vuelve a crear y los PDFs que
+estaban en curso se reintentan una vez. Los procesos se crean con el método
+spawn: el servidor atiende cada petición en un hilo y hacer fork de un proceso
+con varios hilos puede heredar bloqueos tomados. Solo escucha en direcciones
+locales (127.0.0.1, ::1 o localhost).
+
+Rutas:
+    POST /extract          Un PDF en el cuerpo (Content-Type: application/pdf);
+                           el nombre del archivo en ?name=reporte.pdf o en la
+                           cabecera X-File-Name
+    POST /extract/batch    Varios PDFs como multipart/form-data
+    GET  /metrics          Latencia y rendimiento del servicio
+    GET  /health           Estado del servicio
+
+Respuesta de /extract y /extract/batch:
+    {"columns": [...], "rows": [{...}, ...], "errors": [{"file": ..., "error": ...}]}
+Las columnas siguen el esquema de merge_dataframes (todas sus columnas, aunque
+ningún PDF se haya podido procesar) en el orden de order_result_columns, el
+mismo de la interfaz y de las exportaciones; las celdas sin valor se devuelven
+como null. Un PDF con varios reportes seguidos produce una fila por reporte.
+Cada error indica el archivo y el motivo real del fallo.
+
+Uso:
+    python extraction_service.py [--port 8765] [--workers 4]
+    curl --data-binary @reporte.pdf -H "Content-Type: application/pdf" \\
+        "http://127.0.0.1:8765/extract?name=reporte.pdf"
+    curl -F "files=@a.pdf" -F "files=@b.pdf" http://127.0.0.1:8765/extract/batch
+
+Módulos relacionados:
+- extraction_api.py: Extrae los reportes de cada PDF en los trabajadores
+- data_processing.py: Combina las filas con merge_dataframes
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# Puerto por defecto del servicio
+DEFAULT_PORT = 8765
+
+# Direcciones en las que se permite escuchar
+LOCAL_HOSTS = ("127.0.0.1", "::1", "localhost")
+
+# Tamaño máximo del cuerpo de una petición (200 MB)
+DEFAULT_MAX_UPLOAD_BYTES = 200 * 1024 * 1024
+
+# Latencias recientes que se conservan para los percentiles
+LATENCY_WINDOW = 1000
+
+# Error de los PDFs en curso cuando un proceso trabajador termina inesperadamente
+WORKER_CRASH_ERROR = "El proceso trabajador terminó inesperadamente al procesar el PDF"
+
+
+def _warm_worker():
+    """Carga las bibliotecas de extracción al iniciar cada proceso trabajador"""
+    import extraction_api  # noqa: F401
+
+
+def _ping():
+    """Tarea vacía para iniciar los procesos del grupo antes de la primera petición"""
+    return os.getpid()
+
+
+def _extract_bytes(file_name, pdf_bytes):
+    """
+    Extrae los datos de un PDF recibido en memoria (se ejecuta en un trabajador).
+
+    Args:
+        file_name (str): Nombre del archivo subido
+        pdf_bytes (bytes): Contenido del PDF
+
+    Returns:
+        tuple: (datos extraídos de cada reporte, mensajes de error)
+    """
+    from constants import FILE_PATH_COLUMN
+    from extraction_api import extract_reports
+
+    rows = []
+    errors = []
+    for record in extract_reports(file_name, pdf_bytes):
+        if record.ok:
+            row = record.to_row()
+            # Un archivo subido no tiene ruta en el equipo del servicio
+            row.pop(FILE_PATH_COLUMN, None)
+            rows.append(row)
+        else:
+            errors.append(record.error or "No se pudo procesar el PDF")
+    return rows, errors
+
+
+class ServiceMetrics:
+    """Contadores de peticiones, documentos y latencias, seguros entre hilos"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.start_time = time.monotonic()
+        self.requests = 0
+        self.documents = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def request_started(self):
+        """Registra el inicio de una petición de extracción"""
+        with self.lock:
+            self.in_flight += 1
+
+    def request_finished(self, seconds, documents, errors):
+        """
+        Registra el fin de una petición de extracción.
+
+        Args:
+            seconds (float): Duración de la petición
+            documents (int): PDFs recibidos
+            errors (int): PDFs que no pudieron procesarse
+        """
+        with self.lock:
+            self.in_flight -= 1
+            self.requests += 1
+            self.documents += documents
+            self.errors += errors
+            self.latencies.append(seconds)
+
+    def snapshot(self):
+        """
+        Obtiene una copia de las métricas actuales.
+
+        Returns:
+            dict: Contadores, rendimiento y percentiles de latencia en milisegundos
+        """
+        with self.lock:
+            uptime = time.monotonic() - self.start_time
+            latencies = sorted(self.latencies)
+            documents = self.documents
+
+            def percentile(fraction):
+                if not latencies:
+                    return None
+                index = min(len(latencies) - 1, int(round(fraction * (len(latencies) - 1))))
+                return round(latencies[index] * 1000, 1)
+
+            return {
+                "uptime_seconds": round(uptime, 1),
+                "requests": self.requests,
+                "documents": documents,
+                "errors": self.errors,
+                "in_flight": self.in_flight,
+                "documents_per_second": round(documents / uptime, 3) if uptime > 0 else 0.0,
+                "latency_ms": {
+                    "mean": round(sum(latencies) / len(latencies) * 1000, 1) if latencies else None,
+                    "p50": percentile(0.50),
+                    "p95": percentile(0.95),
+                    "max": round(latencies[-1] * 1000, 1) if latencies else None,
+                    "window": len(latencies),
+                },
+            }
+
+
+def rows_to_response(results):
+    """
+    Combina los resultados de una petición en el esquema de merge_dataframes.
+
+    Args:
+        results (list): Tuplas (nombre de archivo, reportes extraídos, mensajes de error)
+
+    Returns:
+        dict: columns, rows y errors, listo para serializar a JSON
+    """
+    import pandas as pd
+    from constants import FILE_PATH_COLUMN, REPORT_INDEX_COLUMN
+    from data_processing import merge_dataframes, order_result_columns
+
+    rows = [data for _, reports, _ in results for data in reports]
+    errors = [{"file": file_name, "error": error}
+              for file_name, _, file_errors in results for error in file_errors]
+
+    # Con un DataFrame vacío, merge_dataframes devuelve igualmente los títulos;
+    # la ruta (que un archivo subido no tiene) y la posición del reporte se
+    # añaden para que el esquema no dependa de que haya filas
+    result_df = merge_dataframes([pd.DataFrame(rows)])
+    for column in (FILE_PATH_COLUMN, REPORT_INDEX_COLUMN):
+        if column not in result_df.columns:
+            result_df[column] = None
+    result_df = result_df[order_result_columns(result_df.columns)]
+    result_df = result_df.astype(object).where(result_df.notna(), None)
+    return {
+        "columns": list(result_df.columns),
+        "rows": result_df.to_dict(orient="records"),
+        "errors": errors,
+    }
+
+
+class ExtractionService:
+    """Grupo de trabajadores y métricas compartidos por el servidor HTTP"""
+
+    def __init__(self, workers=None, max_upload_bytes=DEFAULT_MAX_UPLOAD_BYTES):
+        """
+        Args:
+            workers (int, optional): Procesos trabajadores; por defecto os.cpu_count()
+            max_upload_bytes (int): Tamaño máximo del cuerpo de una petición
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_upload_bytes = max_upload_bytes
+        self.metrics = ServiceMetrics()
+        # Reentrante: _submit reinicia el grupo sin soltar el bloqueo
+        self.pool_lock = threading.RLock()
+        self.pool = self._start_pool()
+        # El proceso principal combina las filas con pandas: cargarlo también ahora
+        import data_processing  # noqa: F401
+
+    def _start_pool(self):
+        """
+        Crea el grupo de trabajadores e inicia todos sus procesos, para que la
+        primera petición no espere.
+
+        Returns:
+            ProcessPoolExecutor: Grupo ya iniciado
+        """
+        pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker,
+                                   mp_context=multiprocessing.get_context("spawn"))
+        for future in [pool.submit(_ping) for _ in range(self.workers)]:
+            future.result()
+        return pool
+
+    def _restart_pool(self, broken_pool):
+        """
+        Sustituye un grupo de trabajadores roto (un proceso terminó de forma
+        inesperada). Si otra petición ya lo sustituyó, no hace nada. El grupo
+        nuevo se crea con el bloqueo tomado, de modo que las peticiones que
+        esperan envían sus reintentos al grupo nuevo.
+
+        Args:
+            broken_pool (ProcessPoolExecutor): Grupo que falló
+        """
+        with self.pool_lock:
+            if self.pool is broken_pool:
+                print("Un proceso trabajador terminó inesperadamente; se reinicia el grupo")
+                broken_pool.shutdown(wait=False, cancel_futures=True)
+                self.pool = self._start_pool()
+
+    def _submit(self, file_name, pdf_bytes):
+        """Envía un PDF al grupo de trabajadores, recreándolo si está roto"""
+        with self.pool_lock:
+            pool = self.pool
+            try:
+                return pool, pool.submit(_extract_bytes, file_name, pdf_bytes)
+            except BrokenProcessPool:
+                self._restart_pool(pool)
+                pool = self.pool
+                return pool, pool.submit(_extract_bytes, file_name, pdf_bytes)
+
+    def _result(self, file_name, pdf_bytes, pool, future):
+        """
+        Espera el resultado de un PDF. Si el grupo se rompió mientras tanto, lo
+        reinicia (una sola vez para todas las peticiones afectadas) y reintenta
+        el PDF una vez en el grupo nuevo.
+
+        Returns:
+            tuple: (datos extraídos de cada reporte, mensajes de error)
+        """
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            self._restart_pool(pool)
+        pool, future = self._submit(file_name, pdf_bytes)
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            # El mismo PDF rompió también el grupo nuevo
+            self._restart_pool(pool)
+            return [], [WORKER_CRASH_ERROR]
+
+    def extract(self, files):
+        """
+        Extrae un conjunto de PDFs en paralelo con el grupo de trabajadores.
+
+        Args:
+            files (list): Pares (nombre de archivo, bytes del PDF)
+
+        Returns:
+            dict: Respuesta de rows_to_response
+        """
+        start = time.perf_counter()
+        self.metrics.request_started()
+        results = []
+        try:
+            futures = [(file_name, pdf_bytes) + self._submit(file_name, pdf_bytes)
+                       for file_name, pdf_bytes in files]
+            for file_name, pdf_bytes, pool, future in futures:
+                try:
+                    rows, errors = self._result(file_name, pdf_bytes, pool, future)
+                except Exception as e:
+                    rows, errors = [], [str(e)]
+                for error in errors:
+                    print(f"Error al procesar el PDF {file_name}: {error}")
+                results.append((file_name, rows, errors))
+            return rows_to_response(results)
+        finally:
+            errors = sum(1 for _, _, file_errors in results if file_errors) + len(files) - len(results)
+            self.metrics.request_finished(time.perf_counter() - start, len(files), errors)
+
+    def close(self):
+        """Detiene los procesos trabajadores"""
+        with self.pool_lock:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+
+
+def parse_multipart(content_type, body):
+    """
+    Obtiene los archivos de un cuerpo multipart/form-data.
+
+    Args:
+        content_type (str): Cabecera Content-Type con el separador (boundary)
+        body (bytes): Cuerpo de la petición
+
+    Returns:
+        list: Pares (nombre de archivo, bytes) en el orden recibido
+    """
+    message = BytesParser(policy=HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode("latin-1") + body)
+    files = []
+    for part in message.iter_parts():
+        file_name = part.get_filename()
+        if file_name:
+            files.append((os.path.basename(file_name), part.get_payload(decode=True)))
+    return files
+
+
+class ExtractionRequestHandler(BaseHTTPRequestHandler):
+    """Atiende las rutas del servicio; self.server.service es el ExtractionService"""
+
+    server_version = "PDFExtractionService/1.0"
+
+    def _send_json(self, status, payload):
+        """Envía una respuesta JSON"""
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        """Lee el cuerpo de la petición; devuelve None si ya se respondió un error"""
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0:
+            self._send_json(400, {"error": "La petición no contiene ningún archivo"})
+            return None
+        if length > self.server.service.max_upload_bytes:
+            self._send_json(413, {"error": "El archivo supera el tamaño máximo permitido"})
+            return None
+        return self.rfile.read(length)
+
+    def do_GET(self):
+        """Métricas y estado del servicio"""
+        path = urlparse(self.path).path
+        if path == "/metrics":
+            self._send_json(200, self.server.service.metrics.snapshot())
+        elif path == "/health":
+            self._send_json(200, {"status": "ok", "workers": self.server.service.workers})
+        else:
+            self._send_json(404, {"error": "Ruta no encontrada"})
+
+    def do_POST(self):
+        """Extracción de uno o varios PDFs"""
+        url = urlparse(self.path)
+        if url.path not in ("/extract", "/extract/batch"):
+            self._send_json(404, {"error": "Ruta no encontrada"})
+            return
+
+        body = self._read_body()
+        if body is None:
+            return
+
+        content_type = self.headers.get("Content-Type", "")
+        if content_type.startswith("multipart/form-data"):
+            files = parse_multipart(content_type, body)
+        elif url.path == "/extract":
+            file_name = (parse_qs(url.query).get("name", [None])[0]
+                         or self.headers.get("X-File-Name") or "documento.pdf")
+            files = [(os.path.basename(file_name), body)]
+        else:
+            self._send_json(415, {"error": "Use multipart/form-data para enviar varios archivos"})
+            return
+
+        if not files:
+            self._send_json(400, {"error": "La petición no contiene ningún archivo"})
+            return
+
+        try:
+            self._send_json(200, self.server.service.extract(files))
+        except Exception as e:
+            self._send_json(500, {"error": f"Error durante la extracción: {str(e)}"})
+
+    def log_message(self, format, *args):
+        """Las peticiones se resumen en /metrics en lugar de escribirse en la consola"""
+
+
+class _IPv6HTTPServer(ThreadingHTTPServer):
+    """Servidor para la dirección local IPv6 (::1)"""
+    address_family = socket.AF_INET6
+
+
+def create_server(host="127.0.0.1", port=DEFAULT_PORT, workers=None,
+                  max_upload_bytes=DEFAULT_MAX_UPLOAD_BYTES):
+    """
+    Crea el servidor HTTP con su grupo de trabajadores ya iniciado.
+
+    Args:
+        host (str): Dirección local donde escuchar
+        port (int): Puerto (0 elige uno libre)
+        workers (int, optional): Procesos trabajadores
+        max_upload_bytes (int): Tamaño máximo del cuerpo de una petición
+
+    Returns:
+        ThreadingHTTPServer: Servidor con el atributo service (ExtractionService)
+    """
+    if host not in LOCAL_HOSTS:
+        raise ValueError(f"El servicio solo puede escuchar en direcciones locales: {host}")
+
+    service = ExtractionService(workers, max_upload_bytes)
+    try:
+        server_class = _IPv6HTTPServer if ":" in host else ThreadingHTTPServer
+        server = server_class((host, port), ExtractionRequestHandler)
+    except Exception:
+        service.close()
+        raise
+    server.service = service
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servicio HTTP local de extracción de PDFs")
+    parser.add_argument("--host", default="127.0.0.1", choices=LOCAL_HOSTS)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-upload-mb", type=int, default=DEFAULT_MAX_UPLOAD_BYTES // (1024 * 1024))
+
+    args = parser.parse_args()
+    server = create_server(args.host, args.port, args.workers, args.max_upload_mb * 1024 * 1024)
+    print(f"Servicio de extracción en http://{args.host}:{server.server_address[1]} "
+          f"con {server.service.workers} trabajadores")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.service.close()
@@ -0,0 +1,386 @@
+# folder_scan.py
+
+"""
+Procesamiento de carpetas completas de reportes.
+Recorre recursivamente un árbol de carpetas con os.scandir, aplicando patrones
+de inclusión y exclusión, y entrega cada PDF encontrado a la extracción en
+cuanto se descubre, sin esperar a listar todo el árbol. Un manifiesto CSV
+(ruta, tamaño, fecha de modificación, estado) registra cada archivo procesado
+para poder reanudar una ejecución interrumpida: los archivos que ya figuran como
+procesados, con el mismo tamaño y fecha, se omiten.
+
+Los patrones se comparan, sin distinguir mayúsculas, con el nombre del archivo y
+con su ruta relativa a la carpeta raíz (separada por '/'). Una carpeta que
+coincide con un patrón de exclusión no se recorre.
+
+Uso:
+    python folder_scan.py CARPETA salida.csv [--include "*.pdf"] [--exclude "anulados"]
+
+Módulos relacionados:
+- extraction_api.py: Extrae los PDFs encontrados
+- data_export.py: Añade los resultados a la exportación por bloques
+- pdf_processor.py: Procesa una carpeta desde la interfaz
+"""
+
+import argparse
+import csv
+import fnmatch
+import hashlib
+import os
+from constants import EXCEL_MAX_ROWS_PER_SHEET, EXCEL_DEFAULT_MAX_MB_PER_FILE
+
+# Patrones de inclusión por defecto
+DEFAULT_INCLUDE = ("*.pdf",)
+
+# Columnas del manifiesto
+MANIFEST_FIELDS = ["path", "size", "mtime", "status"]
+
+# Estados del manifiesto que no se vuelven a procesar al reanudar ('skipped': no
+# es un reporte F-COM según la detección previa)
+DONE_STATUSES = ("ok", "skipped")
+
+# Carpeta por defecto de los manifiestos de la interfaz
+DEFAULT_MANIFEST_DIR = os.path.join(os.path.expanduser("~"), ".cache", "pdf_extractor", "manifests")
+
+# Archivos que se extraen antes de añadir los resultados a la exportación
+DEFAULT_CHECKPOINT_FILES = 200
+
+
+def default_manifest_path(root, target=None):
+    """
+    Ruta del manifiesto de una carpeta dentro de DEFAULT_MANIFEST_DIR, para no
+    escribir en carpetas compartidas o de solo lectura. El manifiesto depende
+    también de la exportación a la que se añaden los resultados: un archivo
+    marcado como procesado solo puede omitirse al volver a añadir a esa misma
+    exportación.
+
+    Args:
+        root (str): Carpeta raíz del recorrido
+        target (str, optional): Exportación a la que se añaden los resultados
+
+    Returns:
+        str: Ruta del archivo CSV del manifiesto
+    """
+    key = os.path.abspath(root)
+    if target:
+        key += "\n" + os.path.abspath(target)
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    name = os.path.basename(os.path.abspath(root)) or "raiz"
+    return os.path.join(DEFAULT_MANIFEST_DIR, f"{name}_{digest}.csv")
+
+
+def _matches(name, relative_path, patterns):
+    """Indica si el nombre o la ruta relativa coinciden con alguno de los patrones"""
+    name = name.lower()
+    relative_path = relative_path.lower()
+    return any(fnmatch.fnmatchcase(name, pattern) or fnmatch.fnmatchcase(relative_path, pattern)
+               for pattern in patterns)
+
+
+def scan_files(root, include=DEFAULT_INCLUDE, exclude=()):
+    """
+    Recorre recursivamente una carpeta y devuelve los archivos que coinciden con
+    los patrones, a medida que se encuentran. Las entradas de cada carpeta se
+    visitan en orden alfabético para que el recorrido sea reproducible.
+
+    Args:
+        root (str): Carpeta raíz
+        include (iterable): Patrones que deben coincidir (por ejemplo, "*.pdf")
+        exclude (iterable): Patrones de archivos o carpetas a omitir
+
+    Yields:
+        tuple: (ruta, tamaño en bytes, fecha de modificación)
+    """
+    include = [pattern.lower() for pattern in include]
+    exclude = [pattern.lower() for pattern in exclude]
+    pending_dirs = [root]
+    while pending_dirs:
+        directory = pending_dirs.pop()
+        try:
+            with os.scandir(directory) as iterator:
+                entries = sorted(iterator, key=lambda entry: entry.name)
+        except OSError as e:
+            print(f"No se pudo leer la carpeta {directory}: {str(e)}")
+            continue
+
+        subdirs = []
+        for entry in entries:
+            relative_path = os.path.relpath(entry.path, root).replace(os.sep, "/")
+            if exclude and _matches(entry.name, relative_path, exclude):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.is_file() and _matches(entry.name, relative_path, include):
+                    stat = entry.stat()
+                    yield entry.path, stat.st_size, stat.st_mtime
+            except OSError as e:
+                print(f"No se pudo leer {entry.path}: {str(e)}")
+
+        # Recorrer las subcarpetas en orden alfabético
+        pending_dirs.extend(reversed(subdirs))
+
+
+class ScanManifest:
+    """Manifiesto CSV de los archivos procesados; la última línea de cada ruta manda"""
+
+    def __init__(self, manifest_path):
+        """
+        Carga el manifiesto existente, si lo hay, y lo abre para añadir líneas.
+
+        Args:
+            manifest_path (str): Ruta del archivo CSV
+        """
+        self.manifest_path = manifest_path
+        self.entries = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path, newline="", encoding="utf-8") as manifest_file:
+                for row in csv.DictReader(manifest_file):
+                    self.entries[row["path"]] = (int(row["size"]), float(row["mtime"]), row["status"])
+
+        directory = os.path.dirname(manifest_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        write_header = not os.path.exists(manifest_path) or os.path.getsize(manifest_path) == 0
+        self.manifest_file = open(manifest_path, "a", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.manifest_file)
+        if write_header:
+            self.writer.writerow(MANIFEST_FIELDS)
+            self.manifest_file.flush()
+
+    def is_done(self, path, size, mtime):
+        """
+        Indica si el archivo ya se procesó y no cambió desde entonces.
+
+        Args:
+            path (str): Ruta del archivo
+            size (int): Tamaño actual
+            mtime (float): Fecha de modificación actual
+
+        Returns:
+            bool: True si puede omitirse
+        """
+        entry = self.entries.get(path)
+        return entry is not None and entry[2] in DONE_STATUSES and entry[0] == size and entry[1] == mtime
+
+    def done_count(self):
+        """Número de archivos registrados como procesados"""
+        return sum(1 for entry in self.entries.values() if entry[2] in DONE_STATUSES)
+
+    def record(self, path, size, mtime, status):
+        """
+        Registra el estado de un archivo y lo escribe en disco de inmediato.
+
+        Args:
+            path (str): Ruta del archivo
+            size (int): Tamaño del archivo
+            mtime (float): Fecha de modificación
+            status (str): Estado ('ok', 'error' o 'skipped')
+        """
+        self.entries[path] = (size, mtime, status)
+        self.writer.writerow([path, size, repr(mtime), status])
+        self.manifest_file.flush()
+
+    def close(self):
+        """Cierra el archivo del manifiesto"""
+        self.manifest_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+
+class FolderScan:
+    """
+    Iterable de rutas de PDFs de una carpeta que omite los ya procesados según
+    el manifiesto. Puede recorrerse una sola vez.
+    """
+
+    def __init__(self, root, include=DEFAULT_INCLUDE, exclude=(), manifest=None,
+                 skip_files=None, on_discovered=None, defer_ok=False):
+        """
+        Args:
+            root (str): Carpeta raíz
+            include (iterable): Patrones de inclusión
+            exclude (iterable): Patrones de exclusión
+            manifest (ScanManifest, optional): Manifiesto para reanudar y registrar estados
+            skip_files (set, optional): Rutas completas de archivos a omitir, por
+                ejemplo las de data_export.read_existing_keys; de las exportaciones
+                anteriores a la columna de ruta contiene nombres de archivo
+            on_discovered (callable, optional): Se llama con cada ruta que se entrega
+            defer_ok (bool): Si es True, los archivos marcados 'ok' se registran
+                en el manifiesto solo al llamar a commit_ok(), una vez que sus
+                filas se escribieron en la exportación
+        """
+        self.root = root
+        self.include = tuple(include)
+        self.exclude = tuple(exclude)
+        self.manifest = manifest
+        self.skip_files = skip_files or set()
+        self.on_discovered = on_discovered
+        self.defer_ok = defer_ok
+        self.pending_ok = {}
+        self.discovered = 0
+        self.skipped = 0
+        self.finished = False
+        self.file_stats = {}
+
+    def __iter__(self):
+        for path, size, mtime in scan_files(self.root, self.include, self.exclude):
+            if (os.path.abspath(path) in self.skip_files or os.path.basename(path) in self.skip_files
+                    or self.manifest is not None and self.manifest.is_done(path, size, mtime)):
+                self.skipped += 1
+                continue
+            self.discovered += 1
+            self.file_stats[path] = (size, mtime)
+            if self.on_discovered is not None:
+                self.on_discovered(path)
+            yield path
+        self.finished = True
+
+    def mark(self, path, status):
+        """
+        Registra en el manifiesto el estado de un archivo entregado.
+
+        Args:
+            path (str): Ruta del archivo
+            status (str): Estado ('ok', 'error' o 'skipped')
+        """
+        stats = self.file_stats.pop(path, None)
+        if stats is None and self.manifest is not None and path in self.manifest.entries:
+            stats = self.manifest.entries[path][:2]
+        size, mtime = stats or (0, 0.0)
+        if status == "ok" and self.defer_ok:
+            self.pending_ok[path] = (size, mtime)
+        elif self.manifest is not None:
+            self.manifest.record(path, size, mtime, status)
+
+    def commit_ok(self):
+        """
+        Registra como 'ok' los archivos retenidos por defer_ok, una vez escritas
+        sus filas en la exportación. Si el manifiesto ya se cerró al terminar la
+        extracción, se vuelve a abrir para añadir las líneas.
+        """
+        if self.manifest is None or not self.pending_ok:
+            return
+        manifest = self.manifest
+        if manifest.manifest_file.closed:
+            manifest = ScanManifest(manifest.manifest_path)
+        try:
+            for path, (size, mtime) in self.pending_ok.items():
+                manifest.record(path, size, mtime, "ok")
+        finally:
+            if manifest is not self.manifest:
+                manifest.close()
+        self.pending_ok.clear()
+
+
+def process_folder(root, output_path, include=DEFAULT_INCLUDE, exclude=(), manifest_path=None,
+                   checkpoint_files=DEFAULT_CHECKPOINT_FILES, cache_dir=None, check_form=True,
+                   max_rows_per_sheet=EXCEL_MAX_ROWS_PER_SHEET,
+                   max_mb_per_file=EXCEL_DEFAULT_MAX_MB_PER_FILE):
+    """
+    Procesa una carpeta sin interfaz y añade los resultados a la exportación.
+    Cada checkpoint_files archivos los resultados se añaden a output_path (ver
+    data_export.append_to_export) y solo entonces se marcan en el manifiesto,
+    de modo que al reanudar no se pierde ningún archivo ya marcado.
+
+    Args:
+        root (str): Carpeta raíz
+        output_path (str): Exportación de salida (.xlsx, .csv, .parquet o .sqlite)
+        include (iterable): Patrones de inclusión
+        exclude (iterable): Patrones de exclusión
+        manifest_path (str, optional): Manifiesto; por defecto
+            default_manifest_path(root, output_path)
+        checkpoint_files (int): Archivos entre escrituras de la exportación (al menos 1)
+        cache_dir (str, optional): Carpeta del caché de texto de páginas
+        check_form (bool): Omitir los PDFs que no son reportes F-COM
+        max_rows_per_sheet (int): Filas de datos por hoja (solo Excel)
+        max_mb_per_file (int): Tamaño estimado máximo por archivo en MB (solo Excel)
+
+    Returns:
+        dict: processed (registros de reporte), skipped, errors, rows (filas añadidas) y not_reports
+            (rutas de los PDFs omitidos por no ser reportes F-COM)
+    """
+    import pandas as pd
+    from extraction_api import extract_many, STATUS_OK, STATUS_SKIPPED
+    from data_export import append_to_export
+    from data_processing import merge_dataframes, order_result_columns, normalize_result_types
+
+    cache = None
+    if cache_dir:
+        from page_text_cache import PageTextCache
+        cache = PageTextCache(cache_dir)
+
+    summary = {"processed": 0, "skipped": 0, "errors": 0, "rows": 0, "not_reports": []}
+    with ScanManifest(manifest_path or default_manifest_path(root, output_path)) as manifest:
+        scan = FolderScan(root, include, exclude, manifest)
+        pending = []
+
+        def checkpoint():
+            rows = [record.to_row() for record in pending if record.ok]
+            if rows:
+                chunk = merge_dataframes([pd.DataFrame(rows)])
+                chunk = normalize_result_types(chunk[order_result_columns(chunk.columns)])
+                summary["rows"] += append_to_export(chunk, output_path, max_rows_per_sheet,
+                                                    max_mb_per_file * 1024 * 1024)
+            # Un PDF con varios reportes se marca una vez; basta un reporte correcto
+            file_statuses = {}
+            for record in pending:
+                if file_statuses.get(record.path) != STATUS_OK:
+                    file_statuses[record.path] = record.status
+            for path, status in file_statuses.items():
+                scan.mark(path, status)
+            pending.clear()
+
+        for record in extract_many(scan, cache=cache, check_form=check_form):
+            summary["processed"] += 1
+            if record.status == STATUS_SKIPPED:
+                summary["not_reports"].append(record.path)
+            elif not record.ok:
+                summary["errors"] += 1
+                print(f"Error al procesar el PDF {record.path}: {record.error}")
+            # Escribir solo entre archivos, para no dividir los reportes de un PDF
+            if pending and len(pending) >= checkpoint_files and record.path != pending[-1].path:
+                checkpoint()
+            pending.append(record)
+        checkpoint()
+        summary["skipped"] = scan.skipped
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Procesar recursivamente una carpeta de PDFs")
+    parser.add_argument("root")
+    parser.add_argument("output_path")
+    parser.add_argument("--include", action="append", help="Patrón de inclusión (repetible)")
+    parser.add_argument("--exclude", action="append", default=[], help="Patrón de exclusión (repetible)")
+    parser.add_argument("--manifest", help="Ruta del manifiesto (por defecto en ~/.cache)")
+    parser.add_argument("--checkpoint-files", type=int, default=DEFAULT_CHECKPOINT_FILES,
+                        help="Archivos entre escrituras de la exportación (al menos 1)")
+    parser.add_argument("--cache-dir", help="Carpeta del caché de texto de páginas")
+    parser.add_argument("--all-files", action="store_true",
+                        help="Analizar también los PDFs que no parecen reportes F-COM")
+    parser.add_argument("--max-rows-per-sheet", type=int, default=EXCEL_MAX_ROWS_PER_SHEET,
+                        help="Filas de datos por hoja en las exportaciones a Excel")
+    parser.add_argument("--max-mb-per-file", type=int, default=EXCEL_DEFAULT_MAX_MB_PER_FILE,
+                        help="Tamaño estimado máximo (MB) de cada archivo Excel")
+
+    args = parser.parse_args()
+    if args.checkpoint_files < 1:
+        parser.error("--checkpoint-files debe ser al menos 1")
+    result = process_folder(args.root, args.output_path, include=args.include or DEFAULT_INCLUDE,
+                            exclude=args.exclude, manifest_path=args.manifest,
+                            checkpoint_files=args.checkpoint_files, cache_dir=args.cache_dir,
+                            check_form=not args.all_files,
+                            max_rows_per_sheet=args.max_rows_per_sheet,
+                            max_mb_per_file=args.max_mb_per_file)
+    print(f"Procesados {result['processed']} reportes ({result['errors']} con error), "
+          f"omitidos {result['skipped']} ya procesados, {result['rows']} filas añadidas a {args.output_path}")
+    if result["not_reports"]:
+        print(f"PDFs omitidos por no ser reportes F-COM ({len(result['not_reports'])}):")
+        for path in result["not_reports"]:
+            print(f"  {path}")
@@ -0,0 +1,626 @@
+# memory_benchmark.py
+
+"""
+Prueba de escalabilidad de memoria del procesamiento completo sin interfaz.
+Ejecuta las mismas etapas que PDFExtractorThread sobre lotes de tamaño creciente
+(cada lote en un proceso nuevo, para que no se mezclen las mediciones): los
+registros de extract_many pasan directamente a SinkStage/ResultSink, sin reunir
+todas las filas en una lista, y después el resultado se exporta a Excel. Un
+único muestreo de RSS y tracemalloc recorre todo el procesamiento y las marcas
+de inicio de cada etapa reparten las mediciones:
+- extraction: extracción, con la combinación en ResultSink en paralelo (como en
+  la interfaz); la etapa merge informa además el tiempo ocupado del destino
+- merge: cierre del destino (SinkStage.finish), que combina los últimos bloques
+  o termina el volcado a disco
+- excel_export: exportación del resultado a Excel
+Para cada etapa se registra el tiempo, el pico de memoria residente (RSS) del
+proceso, el pico de memoria de Python según tracemalloc y las líneas que más
+memoria asignan.
+
+La memoria por documento se calcula como el crecimiento del pico de RSS sobre el
+RSS inicial (con las bibliotecas ya cargadas) dividido entre el número de PDFs.
+Con --baseline se compara contra un archivo guardado con --save-baseline y la
+prueba falla si alguna etapa supera la memoria por documento de referencia más
+la tolerancia.
+
+Si el corpus tiene menos PDFs que el tamaño pedido, los archivos se repiten.
+
+Con --synthetic N no se leen PDFs: se generan N filas sintéticas y se compara
+la etapa de combinación (ResultSink, como en PDFExtractorThread) con columnas
+de objetos de Python y con columnas de Arrow y categorías, midiendo tiempo,
+pico de RSS, pico de tracemalloc y memoria del DataFrame resultante, además
+del tiempo de recorrer el resultado fila por fila como lo hace la exportación.
+
+Uso:
+    python memory_benchmark.py CARPETA_PDFS --sizes 100 500 2000 [--top 5]
+    python memory_benchmark.py CARPETA_PDFS --sizes 2000 --save-baseline memoria.json
+    python memory_benchmark.py CARPETA_PDFS --sizes 2000 --baseline memoria.json [--tolerance 0.15]
+    python memory_benchmark.py --synthetic 50000
+
+Módulos relacionados:
+- extraction_api.py: Extrae cada PDF
+- pdf_pipeline.py: ResultSink combina los resultados con memoria acotada
+- data_processing.py: Combina y normaliza los resultados
+- data_export.py: Exporta el resultado a Excel
+"""
+
+import argparse
+import gc
+import glob
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+# Etapas medidas, en orden
+STAGES = ("extraction", "merge", "excel_export")
+
+# Intervalo de muestreo del RSS (segundos)
+RSS_SAMPLE_INTERVAL = 0.01
+
+# Tolerancia por defecto sobre la memoria por documento de referencia (10 %)
+DEFAULT_TOLERANCE = 0.10
+
+# Líneas con más memoria asignada que se informan por etapa
+DEFAULT_TOP_ALLOCATORS = 5
+
+# Valores de los campos de terminal en las filas sintéticas
+SYNTHETIC_MODELS = ("VX520", "VX680", "Move5000", "Desk3500", "A920")
+SYNTHETIC_SERIES_STATES = ("Instalada", "Retirada", "Reprogramada")
+
+
+def current_rss():
+    """
+    Memoria residente actual del proceso.
+
+    Returns:
+        int or None: Bytes en memoria, o None si no puede medirse en esta plataforma
+    """
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class RSSSampler(threading.Thread):
+    """
+    Registra en segundo plano el pico de RSS mientras dura una etapa. Con
+    mark() se indica el inicio de cada etapa de un procesamiento continuo y las
+    muestras siguientes se atribuyen a esa etapa (ver peaks).
+    """
+
+    def __init__(self, interval=RSS_SAMPLE_INTERVAL):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = current_rss()
+        self.stage = None
+        self.peaks = {}
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+
+    def _sample(self):
+        rss = current_rss()
+        if rss is None:
+            return
+        with self.lock:
+            if self.peak is None or rss > self.peak:
+                self.peak = rss
+            if self.stage is not None and rss > self.peaks.get(self.stage, 0):
+                self.peaks[self.stage] = rss
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            self._sample()
+
+    def mark(self, stage):
+        """
+        Cierra la etapa actual con una última muestra y empieza la siguiente.
+
+        Args:
+            stage (str or None): Etapa que empieza, o None al terminar
+        """
+        self._sample()
+        with self.lock:
+            self.stage = stage
+        self._sample()
+
+    def stop(self):
+        """
+        Detiene el muestreo.
+
+        Returns:
+            int or None: Pico de RSS en bytes durante la etapa
+        """
+        self.stop_event.set()
+        self.join()
+        self._sample()
+        return self.peak
+
+
+class StageRecorder:
+    """
+    Mide las etapas de un procesamiento continuo: mark() cierra la etapa en
+    curso (tiempo, pico de tracemalloc y líneas que más memoria asignan) y
+    empieza la siguiente; el pico de RSS de cada etapa lo reparte RSSSampler.
+    """
+
+    def __init__(self, use_tracemalloc=True, top=DEFAULT_TOP_ALLOCATORS):
+        """
+        Args:
+            use_tracemalloc (bool): Si es True, registra las asignaciones (más lento)
+            top (int): Líneas con más memoria asignada a informar
+        """
+        self.use_tracemalloc = use_tracemalloc
+        self.top = top
+        self.sampler = RSSSampler()
+        self.stage = None
+        self.stage_start = None
+        self.stats = {}
+
+    def start(self):
+        """Inicia el muestreo de RSS y, si corresponde, tracemalloc"""
+        gc.collect()
+        self.sampler.start()
+        if self.use_tracemalloc:
+            tracemalloc.start()
+
+    def mark(self, stage):
+        """
+        Cierra la etapa en curso y empieza la indicada.
+
+        Args:
+            stage (str or None): Etapa que empieza, o None al terminar
+        """
+        if self.stage is not None:
+            stats = {"seconds": round(time.perf_counter() - self.stage_start, 3)}
+            if self.use_tracemalloc:
+                _, traced_peak = tracemalloc.get_traced_memory()
+                stats["traced_peak_mb"] = round(traced_peak / 1024 / 1024, 2)
+                stats["top_allocators"] = _top_allocators(tracemalloc.take_snapshot(), self.top)
+                tracemalloc.reset_peak()
+            self.stats[self.stage] = stats
+        self.sampler.mark(stage)
+        self.stage = stage
+        self.stage_start = time.perf_counter()
+
+    def stop(self):
+        """
+        Cierra la última etapa y detiene el muestreo.
+
+        Returns:
+            dict: Mediciones de cada etapa
+        """
+        try:
+            self.mark(None)
+        finally:
+            if self.use_tracemalloc:
+                tracemalloc.stop()
+            self.sampler.stop()
+        for stage, stats in self.stats.items():
+            peak_rss = self.sampler.peaks.get(stage)
+            stats["peak_rss_mb"] = round(peak_rss / 1024 / 1024, 2) if peak_rss is not None else None
+        return self.stats
+
+
+def _top_allocators(snapshot, top):
+    """Líneas de código con más memoria asignada en una instantánea de tracemalloc"""
+    allocators = []
+    for stat in snapshot.statistics("lineno")[:top]:
+        frame = stat.traceback[0]
+        allocators.append({
+            "location": f"{os.path.basename(frame.filename)}:{frame.lineno}",
+            "size_mb": round(stat.size / 1024 / 1024, 2),
+            "count": stat.count,
+        })
+    return allocators
+
+
+def measure_stage(function, use_tracemalloc=True, top=DEFAULT_TOP_ALLOCATORS):
+    """
+    Ejecuta una etapa midiendo tiempo, pico de RSS y asignaciones de Python.
+
+    Args:
+        function (callable): Etapa a ejecutar, sin argumentos
+        use_tracemalloc (bool): Si es True, registra las asignaciones (más lento)
+        top (int): Líneas con más memoria asignada a informar
+
+    Returns:
+        tuple: (resultado de la etapa, diccionario de mediciones)
+    """
+    gc.collect()
+    sampler = RSSSampler()
+    sampler.start()
+    if use_tracemalloc:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = function()
+        seconds = time.perf_counter() - start
+        stats = {"seconds": round(seconds, 3)}
+        if use_tracemalloc:
+            _, traced_peak = tracemalloc.get_traced_memory()
+            stats["traced_peak_mb"] = round(traced_peak / 1024 / 1024, 2)
+            stats["top_allocators"] = _top_allocators(tracemalloc.take_snapshot(), top)
+    finally:
+        if use_tracemalloc:
+            tracemalloc.stop()
+        peak_rss = sampler.stop()
+    stats["peak_rss_mb"] = round(peak_rss / 1024 / 1024, 2) if peak_rss is not None else None
+    return result, stats
+
+
+def run_pipeline(batch, mark=lambda stage: None):
+    """
+    Procesa un lote como PDFExtractorThread.run: los registros de extract_many
+    pasan uno a uno a SinkStage/ResultSink (con su límite de memoria; si lo
+    superan, el resultado queda en un Parquet temporal) y después el resultado
+    se exporta a Excel en una carpeta temporal.
+
+    Args:
+        batch (list): PDFs del lote
+        mark (callable): Se llama con el nombre de cada etapa al empezarla
+
+    Returns:
+        dict: extracted_rows, spilled y sink_seconds (tiempo ocupado del destino)
+    """
+    from extraction_api import extract_many
+    from pdf_pipeline import ResultSink, SinkStage
+    from data_export import export_excel, export_chunks, iter_parquet_chunks
+
+    class TimedResultSink(ResultSink):
+        """ResultSink que acumula el tiempo de combinación de su hilo"""
+        seconds = 0.0
+
+        def add(self, data):
+            start = time.perf_counter()
+            super().add(data)
+            self.seconds += time.perf_counter() - start
+
+        def finish(self):
+            start = time.perf_counter()
+            try:
+                return super().finish()
+            finally:
+                self.seconds += time.perf_counter() - start
+
+    sink = TimedResultSink()
+    sink_stage = SinkStage(sink)
+    sink_stage.start()
+    extracted_rows = 0
+    try:
+        mark("extraction")
+        for record in extract_many(batch):
+            if record.ok:
+                sink_stage.put(record.to_row())
+                extracted_rows += 1
+
+        mark("merge")
+        result_df = sink_stage.finish()
+
+        mark("excel_export")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = os.path.join(temp_dir, "benchmark.xlsx")
+            if sink.spill_path:
+                export_chunks(iter_parquet_chunks(sink.spill_path), output_path)
+            else:
+                export_excel(result_df, output_path)
+        mark(None)
+        return {"extracted_rows": extracted_rows, "spilled": sink.spill_path is not None,
+                "sink_seconds": round(sink.seconds, 3)}
+    finally:
+        if sink_stage.is_alive():
+            sink_stage.finish()
+        sink.discard()
+
+
+def run_size(pdf_files, size, use_tracemalloc=True, top=DEFAULT_TOP_ALLOCATORS):
+    """
+    Ejecuta todas las etapas sobre un lote de size PDFs (en el proceso actual).
+
+    Args:
+        pdf_files (list): PDFs del corpus
+        size (int): Número de documentos del lote
+        use_tracemalloc (bool): Registrar asignaciones con tracemalloc
+        top (int): Líneas con más memoria asignada a informar
+
+    Returns:
+        dict: Mediciones por etapa y memoria por documento
+    """
+    batch = list(itertools.islice(itertools.cycle(pdf_files), size))
+
+    # Pasada de calentamiento con un documento para cargar las bibliotecas y
+    # que las importaciones diferidas (por ejemplo, dentro de pandas y openpyxl)
+    # no se cuenten en la primera etapa
+    run_pipeline(batch[:1])
+    gc.collect()
+    base_rss = current_rss()
+
+    results = {"documents": size, "base_rss_mb": round(base_rss / 1024 / 1024, 2) if base_rss else None}
+    recorder = StageRecorder(use_tracemalloc, top)
+    recorder.start()
+    try:
+        summary = run_pipeline(batch, recorder.mark)
+    finally:
+        results["stages"] = recorder.stop()
+    results["extracted_rows"] = summary["extracted_rows"]
+    results["spilled"] = summary["spilled"]
+    results["stages"]["merge"]["sink_seconds"] = summary["sink_seconds"]
+
+    for stage in results["stages"].values():
+        if base_rss and stage["peak_rss_mb"] is not None:
+            growth = stage["peak_rss_mb"] * 1024 * 1024 - base_rss
+            stage["rss_kb_per_document"] = round(max(0, growth) / 1024 / size, 2)
+        if "traced_peak_mb" in stage:
+            stage["traced_kb_per_document"] = round(stage["traced_peak_mb"] * 1024 / size, 2)
+    return results
+
+
+def _run_size_worker(args):
+    """Punto de entrada del proceso nuevo de cada tamaño de lote"""
+    return run_size(*args)
+
+
+def run_benchmark(pdf_files, sizes, use_tracemalloc=True, top=DEFAULT_TOP_ALLOCATORS):
+    """
+    Ejecuta la prueba para cada tamaño de lote, cada uno en un proceso nuevo.
+
+    Args:
+        pdf_files (list): PDFs del corpus
+        sizes (list): Tamaños de lote, en orden creciente
+        use_tracemalloc (bool): Registrar asignaciones con tracemalloc
+        top (int): Líneas con más memoria asignada a informar
+
+    Returns:
+        list: Resultado de run_size para cada tamaño
+    """
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for size in sorted(sizes):
+        with context.Pool(1) as pool:
+            results.append(pool.apply(_run_size_worker, ((pdf_files, size, use_tracemalloc, top),)))
+    return results
+
+
+def synthetic_rows(count, seed=0):
+    """
+    Genera filas con la forma de ReportRecord.to_row(): todos los títulos base
+    y de una a cuatro terminales por reporte.
+
+    Args:
+        count (int): Número de filas
+        seed (int): Semilla para que ambas variantes reciban las mismas filas
+
+    Returns:
+        list: Diccionarios de datos
+    """
+    import random
+    from constants import BASE_TITLES
+
+    generator = random.Random(seed)
+    rows = []
+    for i in range(count):
+        row = {"Nombre del Archivo": f"reporte_{i:07d}.pdf"}
+        for title in BASE_TITLES:
+            row[title] = f"{title[:12]} {i % 97}"
+        row.update({"Fecha de Reporte": f"{1 + i % 28:02d}/03/2024", "Correlativo": f"C-{i}",
+                    "Hora de llegada": "9:15 AM GMT-06:00", "Hora de salida": "10:05 AM GMT-06:00",
+                    "Cantidad GSM": str(i % 3)})
+        for terminal in range(1, generator.randint(1, 4) + 1):
+            prefix = "Terminal" if terminal == 1 else f"Terminal {terminal}"
+            row[f"{prefix} - Actualización en Sistema Adquirente"] = generator.choice(("Sí", "No"))
+            row[f"{prefix} - Esta serie fue"] = generator.choice(SYNTHETIC_SERIES_STATES)
+            row[f"{prefix} - Esta serie lleva SIM"] = generator.choice(("Sí", "No"))
+            row[f"{prefix} - Modelo de Terminal"] = generator.choice(SYNTHETIC_MODELS)
+            row[f"{prefix} - Número de Serie"] = f"SN{i:07d}{terminal}"
+            row[f"{prefix} - Número de Terminal"] = f"T{i * 7 + terminal}"
+        rows.append(row)
+    return rows
+
+
+def run_result_types(size, arrow_strings, use_tracemalloc=True, top=DEFAULT_TOP_ALLOCATORS):
+    """
+    Mide la combinación de size filas sintéticas con un tipo de columnas de texto.
+
+    Args:
+        size (int): Número de filas
+        arrow_strings (bool): Columnas de Arrow y categorías (True) u objetos (False)
+        use_tracemalloc (bool): Registrar asignaciones con tracemalloc
+        top (int): Líneas con más memoria asignada a informar
+
+    Returns:
+        dict: Mediciones de la combinación, memoria del resultado y tiempo de recorrido
+    """
+    from pdf_pipeline import ResultSink
+    from data_export import _iter_rows
+
+    def merge():
+        sink = ResultSink(memory_limit=float("inf"), arrow_strings=arrow_strings)
+        for row in rows:
+            sink.add(row)
+        return sink.finish()
+
+    # Calentamiento para no contar importaciones diferidas
+    rows = synthetic_rows(10)
+    merge()
+    rows = synthetic_rows(size)
+    gc.collect()
+    base_rss = current_rss()
+
+    result_df, stats = measure_stage(merge, use_tracemalloc, top)
+    stats["base_rss_mb"] = round(base_rss / 1024 / 1024, 2) if base_rss else None
+    stats["result_mb"] = round(result_df.memory_usage(index=True, deep=True).sum() / 1024 / 1024, 2)
+    stats["dtypes"] = result_df.dtypes.astype(str).value_counts().to_dict()
+    start = time.perf_counter()
+    for _ in _iter_rows(result_df):
+        pass
+    stats["row_walk_seconds"] = round(time.perf_counter() - start, 3)
+    return stats
+
+
+def _run_result_types_worker(args):
+    """Punto de entrada del proceso nuevo de cada variante"""
+    return run_result_types(*args)
+
+
+def run_types_comparison(size, use_tracemalloc=True, top=DEFAULT_TOP_ALLOCATORS):
+    """
+    Compara columnas de objetos y de Arrow sobre las mismas filas sintéticas,
+    cada variante en un proceso nuevo.
+
+    Args:
+        size (int): Número de filas
+        use_tracemalloc (bool): Registrar asignaciones con tracemalloc
+        top (int): Líneas con más memoria asignada a informar
+
+    Returns:
+        dict: Mediciones de las variantes "object" y "arrow"
+    """
+    context = multiprocessing.get_context("spawn")
+    results = {"rows": size}
+    for name, arrow_strings in (("object", False), ("arrow", True)):
+        with context.Pool(1) as pool:
+            results[name] = pool.apply(_run_result_types_worker,
+                                       ((size, arrow_strings, use_tracemalloc, top),))
+    return results
+
+
+def print_types_report(results):
+    """Imprime la comparación de tipos de columnas"""
+    print(f"\n=== {results['rows']} filas sintéticas ===")
+    for name in ("object", "arrow"):
+        stats = results[name]
+        line = (f"  {name:<7} combinación {stats['seconds']:7.2f} s  "
+                f"pico RSS {stats['peak_rss_mb']} MB (inicial {stats['base_rss_mb']} MB)  "
+                f"resultado {stats['result_mb']} MB  recorrido {stats['row_walk_seconds']:.2f} s")
+        if "traced_peak_mb" in stats:
+            line += f"  tracemalloc {stats['traced_peak_mb']} MB"
+        print(line)
+        print(f"          tipos: {stats['dtypes']}")
+
+
+def baseline_from_results(results):
+    """
+    Obtiene la memoria por documento de referencia del lote más grande.
+
+    Args:
+        results (list): Resultado de run_benchmark
+
+    Returns:
+        dict: Tamaño del lote y KB por documento de cada etapa
+    """
+    largest = results[-1]
+    return {
+        "documents": largest["documents"],
+        "stages": {
+            name: {key: stage[key] for key in ("rss_kb_per_document", "traced_kb_per_document")
+                   if key in stage}
+            for name, stage in largest["stages"].items()
+        },
+    }
+
+
+def compare_to_baseline(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compara la memoria por documento del lote más grande con la de referencia.
+
+    Args:
+        results (list): Resultado de run_benchmark
+        baseline (dict): Resultado de baseline_from_results guardado anteriormente
+        tolerance (float): Aumento relativo permitido (0.10 = 10 %)
+
+    Returns:
+        list: Descripción de cada regresión encontrada (vacía si no hay)
+    """
+    current = baseline_from_results(results)["stages"]
+    regressions = []
+    for stage_name, reference in baseline.get("stages", {}).items():
+        for key, reference_value in reference.items():
+            value = current.get(stage_name, {}).get(key)
+            if value is None or not reference_value:
+                continue
+            if value > reference_value * (1 + tolerance):
+                regressions.append(f"{stage_name}.{key}: {value} KB/doc > "
+                                   f"{reference_value} KB/doc (+{tolerance:.0%})")
+    return regressions
+
+
+def print_report(results):
+    """Imprime un resumen legible de las mediciones"""
+    for result in results:
+        print(f"\n=== {result['documents']} documentos "
+              f"(RSS inicial {result['base_rss_mb']} MB, filas {result['extracted_rows']}"
+              f"{', volcado a disco' if result.get('spilled') else ''}) ===")
+        for name in STAGES:
+            stage = result["stages"][name]
+            line = (f"  {name:<13} {stage['seconds']:8.2f} s  pico RSS {stage['peak_rss_mb']} MB"
+                    f"  ({stage.get('rss_kb_per_document')} KB/doc)")
+            if "sink_seconds" in stage:
+                line += f"  destino ocupado {stage['sink_seconds']:.2f} s"
+            if "traced_peak_mb" in stage:
+                line += (f"  tracemalloc {stage['traced_peak_mb']} MB"
+                         f"  ({stage['traced_kb_per_document']} KB/doc)")
+            print(line)
+            for allocator in stage.get("top_allocators", []):
+                print(f"      {allocator['size_mb']:8.2f} MB  {allocator['count']:8d}  {allocator['location']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prueba de escalabilidad de memoria del procesamiento")
+    parser.add_argument("pdf_dir", nargs="?", help="Carpeta con los PDFs del corpus")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500, 1000])
+    parser.add_argument("--synthetic", type=int,
+                        help="Comparar columnas de objetos y de Arrow con N filas sintéticas")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP_ALLOCATORS)
+    parser.add_argument("--no-tracemalloc", action="store_true",
+                        help="Medir solo RSS (tracemalloc hace las etapas más lentas)")
+    parser.add_argument("--json", help="Guardar las mediciones completas en un archivo JSON")
+    parser.add_argument("--baseline", help="Archivo de referencia con el que comparar")
+    parser.add_argument("--save-baseline", help="Guardar la memoria por documento como referencia")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+
+    args = parser.parse_args()
+    if args.synthetic:
+        comparison = run_types_comparison(args.synthetic, not args.no_tracemalloc, args.top)
+        print_types_report(comparison)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as json_file:
+                json.dump(comparison, json_file, indent=2)
+        sys.exit(0)
+    if not args.pdf_dir:
+        parser.error("se requiere la carpeta de PDFs o --synthetic")
+
+    pdf_files = sorted(glob.glob(os.path.join(args.pdf_dir, "**", "*.pdf"), recursive=True))
+    if not pdf_files:
+        print(f"No se encontraron PDFs en {args.pdf_dir}")
+        sys.exit(2)
+
+    results = run_benchmark(pdf_files, args.sizes, not args.no_tracemalloc, args.top)
+    print_report(results)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as json_file:
+            json.dump(results, json_file, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as baseline_file:
+            json.dump(baseline_from_results(results), baseline_file, indent=2)
+        print(f"\nReferencia guardada en {args.save_baseline}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            regressions = compare_to_baseline(results, json.load(baseline_file), args.tolerance)
+        if regressions:
+            print("\nERROR: la memoria por documento supera la referencia:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("\nLa memoria por documento está dentro de la referencia")
@@ -0,0 +1,294 @@
+# page_text_cache.py
+
+"""
+Caché en disco del texto de cada página de los PDFs.
+La mayor parte del tiempo de extracción se dedica a obtener el texto con
+PyMuPDF, no al análisis. El caché guarda, comprimido, el texto de las páginas
+de cada archivo identificado por el hash de su contenido, de modo que al cambiar
+las reglas de data_extraction.py o los títulos de constants.py se pueda volver
+a analizar todo el corpus sin abrir los PDFs ("re-análisis desde el caché").
+
+Estructura de la carpeta del caché:
+    ab/abcdef....json.gz   Entrada de un archivo (hash SHA-256 de su contenido)
+
+Cada entrada contiene la versión del formato, la versión de PyMuPDF que obtuvo
+el texto, la ruta original del archivo y el texto de cada página. Al extraer,
+las entradas de otra versión de PyMuPDF se consideran ausentes y se vuelven a
+generar; el re-análisis, en cambio, usa todas las entradas del caché.
+
+Uso:
+    python page_text_cache.py fill CARPETA_CACHE archivo1.pdf ...
+    python page_text_cache.py reparse CARPETA_CACHE salida.xlsx
+    python page_text_cache.py stats CARPETA_CACHE
+
+Módulos relacionados:
+- data_extraction.py: Obtiene el texto de las páginas y lo analiza
+- extraction_api.py: Usa el caché en extract_one/extract_many y re-analiza las entradas
+- pdf_processor.py: Usa el caché desde la interfaz si la opción está activada
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+from constants import EXCEL_MAX_ROWS_PER_SHEET, EXCEL_DEFAULT_MAX_MB_PER_FILE
+
+# Versión del formato de las entradas; cambiarla invalida el caché completo
+CACHE_FORMAT_VERSION = 1
+
+# Carpeta del caché por defecto
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "pdf_extractor", "page_texts")
+
+# Nivel de compresión gzip (1 rápido - 9 más pequeño)
+COMPRESS_LEVEL = 6
+
+# Extensión de las entradas del caché
+ENTRY_EXTENSION = ".json.gz"
+
+
+def hash_bytes(data):
+    """
+    Calcula la clave de caché de un archivo a partir de su contenido.
+
+    Args:
+        data (bytes): Contenido del archivo
+
+    Returns:
+        str: Hash SHA-256 en hexadecimal
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def _extractor_version():
+    """Versión de PyMuPDF que obtiene el texto de las páginas"""
+    import fitz
+    return fitz.VersionBind
+
+
+class PageTextCache:
+    """Caché comprimido en disco del texto de las páginas, por hash de archivo"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        """
+        Args:
+            cache_dir (str): Carpeta donde se guardan las entradas
+        """
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._version = None
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @property
+    def extractor_version(self):
+        """Versión de PyMuPDF registrada en las entradas nuevas"""
+        if self._version is None:
+            self._version = _extractor_version()
+        return self._version
+
+    def entry_path(self, file_hash):
+        """Ruta de la entrada de un hash (subcarpeta con los dos primeros caracteres)"""
+        return os.path.join(self.cache_dir, file_hash[:2], file_hash + ENTRY_EXTENSION)
+
+    def get(self, file_hash):
+        """
+        Obtiene el texto de las páginas guardado para un hash.
+
+        Args:
+            file_hash (str): Hash del contenido del archivo
+
+        Returns:
+            list or None: Texto de cada página, o None si no hay entrada válida
+        """
+        entry = self._load_entry(self.entry_path(file_hash))
+        if entry is None or entry.get("extractor") != self.extractor_version:
+            return None
+        return entry["pages"]
+
+    def put(self, file_hash, pdf_path, page_texts):
+        """
+        Guarda el texto de las páginas de un archivo.
+        La entrada se escribe en un archivo temporal y se renombra, de modo que
+        un proceso interrumpido no deja entradas incompletas.
+
+        Args:
+            file_hash (str): Hash del contenido del archivo
+            pdf_path (str): Ruta original del archivo
+            page_texts (list): Texto de cada página
+        """
+        entry = {
+            "version": CACHE_FORMAT_VERSION,
+            "extractor": self.extractor_version,
+            "path": pdf_path,
+            "file_name": os.path.basename(pdf_path),
+            "pages": page_texts,
+        }
+        path = self.entry_path(file_hash)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(temp_path, "wt", encoding="utf-8", compresslevel=COMPRESS_LEVEL) as entry_file:
+            json.dump(entry, entry_file, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    def read_page_texts(self, pdf_path, pdf_bytes=None, check_form=False):
+        """
+        Obtiene el texto de las páginas desde el caché o, si no está, desde el
+        PDF, guardándolo para la próxima vez.
+
+        Args:
+            pdf_path (str): Ruta al archivo PDF
+            pdf_bytes (bytes, optional): Contenido del archivo ya leído
+            check_form (bool): Comprobar que el PDF sea un reporte F-COM (ver
+                data_extraction.read_page_texts); los que no lo son no se guardan
+
+        Returns:
+            list: Texto de cada página, en orden
+
+        Raises:
+            NotReportFormError: Si check_form es True y el PDF no es un reporte F-COM
+        """
+        from data_extraction import read_page_texts, is_report_form, NotReportFormError
+
+        if pdf_bytes is None:
+            with open(pdf_path, "rb") as pdf_file:
+                pdf_bytes = pdf_file.read()
+        file_hash = hash_bytes(pdf_bytes)
+
+        page_texts = self.get(file_hash)
+        if page_texts is not None:
+            self.hits += 1
+            if check_form and not (page_texts and is_report_form(page_texts[0])):
+                raise NotReportFormError(f"{os.path.basename(pdf_path)} no es un reporte F-COM")
+            return page_texts
+
+        self.misses += 1
+        page_texts = read_page_texts(pdf_path, pdf_bytes, check_form=check_form)
+        self.put(file_hash, pdf_path, page_texts)
+        return page_texts
+
+    def _load_entry(self, path):
+        """Lee una entrada; devuelve None si no existe, está dañada o es de otro formato"""
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as entry_file:
+                entry = json.load(entry_file)
+        except (OSError, EOFError, ValueError):
+            return None
+        if entry.get("version") != CACHE_FORMAT_VERSION:
+            return None
+        return entry
+
+    def iter_entries(self):
+        """
+        Recorre las entradas válidas del caché en un orden estable (por hash).
+        Incluye las entradas obtenidas con otra versión de PyMuPDF: su texto
+        sigue siendo válido para re-analizarlo, solo get() las descarta.
+
+        Yields:
+            dict: Entrada con path, file_name y pages
+        """
+        entry_paths = []
+        with os.scandir(self.cache_dir) as subdirs:
+            for subdir in subdirs:
+                if not subdir.is_dir():
+                    continue
+                with os.scandir(subdir.path) as entries:
+                    entry_paths.extend(entry.path for entry in entries
+                                       if entry.name.endswith(ENTRY_EXTENSION))
+
+        for path in sorted(entry_paths):
+            entry = self._load_entry(path)
+            if entry is not None:
+                yield entry
+
+    def stats(self):
+        """
+        Resume el contenido del caché.
+
+        Returns:
+            dict: entries (número de entradas) y bytes (tamaño en disco)
+        """
+        entries = 0
+        total_bytes = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(ENTRY_EXTENSION):
+                    entries += 1
+                    total_bytes += os.path.getsize(os.path.join(root, name))
+        return {"entries": entries, "bytes": total_bytes}
+
+
+def reparse_to_file(cache_dir, output_path, max_rows_per_sheet=EXCEL_MAX_ROWS_PER_SHEET,
+                    max_mb_per_file=EXCEL_DEFAULT_MAX_MB_PER_FILE):
+    """
+    Vuelve a analizar todas las entradas del caché con las reglas actuales y
+    exporta el resultado, sin abrir ningún PDF.
+
+    Args:
+        cache_dir (str): Carpeta del caché
+        output_path (str): Archivo de salida (.xlsx, .csv, .parquet o .sqlite)
+        max_rows_per_sheet (int): Filas de datos por hoja (solo Excel)
+        max_mb_per_file (int): Tamaño estimado máximo por archivo en MB (solo Excel)
+
+    Returns:
+        tuple: (filas exportadas, entradas con error)
+    """
+    from extraction_api import reparse_cache
+    from pdf_pipeline import ResultSink
+    from data_export import export_dataframe, export_chunks, iter_parquet_chunks
+
+    sink = ResultSink()
+    errors = 0
+    for record in reparse_cache(cache_dir):
+        if record.ok:
+            sink.add(record.to_row())
+        else:
+            errors += 1
+            print(f"Error al analizar {record.path}: {record.error}")
+
+    result_df = sink.finish()
+    limits = (max_rows_per_sheet, max_mb_per_file * 1024 * 1024)
+    try:
+        if sink.spill_path:
+            export_chunks(iter_parquet_chunks(sink.spill_path), output_path, *limits)
+        elif sink.row_count:
+            export_dataframe(result_df, output_path, *limits)
+        return sink.row_count, errors
+    finally:
+        sink.discard()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Caché del texto de las páginas de los PDFs")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    fill_parser = subparsers.add_parser("fill", help="Guardar en el caché el texto de los PDFs")
+    fill_parser.add_argument("cache_dir")
+    fill_parser.add_argument("pdf_files", nargs="+")
+
+    reparse_parser = subparsers.add_parser("reparse", help="Re-analizar el caché y exportar el resultado")
+    reparse_parser.add_argument("cache_dir")
+    reparse_parser.add_argument("output_path")
+    reparse_parser.add_argument("--max-rows-per-sheet", type=int, default=EXCEL_MAX_ROWS_PER_SHEET,
+                                help="Filas de datos por hoja en las exportaciones a Excel")
+    reparse_parser.add_argument("--max-mb-per-file", type=int, default=EXCEL_DEFAULT_MAX_MB_PER_FILE,
+                                help="Tamaño estimado máximo (MB) de cada archivo Excel")
+
+    stats_parser = subparsers.add_parser("stats", help="Mostrar el tamaño del caché")
+    stats_parser.add_argument("cache_dir")
+
+    args = parser.parse_args()
+    if args.command == "fill":
+        cache = PageTextCache(args.cache_dir)
+        for pdf_path in args.pdf_files:
+            try:
+                cache.read_page_texts(pdf_path)
+            except Exception as e:
+                print(f"Error al leer {pdf_path}: {str(e)}")
+        print(f"Entradas nuevas: {cache.misses}, ya existentes: {cache.hits}")
+    elif args.command == "reparse":
+        rows, errors = reparse_to_file(args.cache_dir, args.output_path,
+                                       args.max_rows_per_sheet, args.max_mb_per_file)
+        print(f"Se exportaron {rows} filas a {args.output_path} ({errors} con error)")
+    elif args.command == "stats":
+        print(json.dumps(PageTextCache(args.cache_dir).stats(), indent=2))
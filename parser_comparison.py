@@ -0,0 +1,315 @@
+# parser_comparison.py
+
+"""
+Comparación A/B de dos implementaciones del extractor sobre un corpus de PDFs.
+Sirve para comprobar que una optimización del análisis produce exactamente los
+mismos valores: cada PDF se lee una vez y se entrega a ambas implementaciones,
+y se comparan campo por campo los reportes que devuelven. También se mide el
+tiempo de cada implementación por archivo (el mejor de --repeat ejecuciones,
+alternando cuál se ejecuta primero).
+
+Implementaciones disponibles:
+    actual          split_report_pages + parse_page_texts (extract_reports_from_pdf
+                    sin capturar los errores)
+    unico           extract_data_from_pdf: el PDF completo como un solo reporte
+    cache[:CARPETA] Texto de las páginas desde page_text_cache.py (con --repeat 2
+                    la segunda ejecución mide el caché ya lleno)
+    modulo:funcion  Función candidata que recibe (pdf_path, pdf_bytes) y devuelve
+                    un diccionario, una lista de diccionarios o None
+
+El informe lista los archivos con diferencias, el número de reportes con
+diferencias por campo (las columnas de terminal y los títulos repetidos se
+agrupan por campo, como en result_index.py) y la comparación de tiempos.
+Termina con código 1 si hay diferencias o errores.
+
+Uso:
+    python parser_comparison.py CARPETA_PDFS --a actual --b candidato:extraer
+    python parser_comparison.py CARPETA_PDFS --b cache --repeat 2 --json comparacion.json
+
+Módulos relacionados:
+- data_extraction.py: Implementación actual del análisis
+- page_text_cache.py: Caché del texto de las páginas
+- result_index.py: Agrupa las columnas de terminal por campo
+"""
+
+import argparse
+import glob
+import importlib
+import json
+import os
+import re
+import statistics
+import sys
+import time
+
+# Implementaciones comparadas por defecto
+DEFAULT_A = "actual"
+DEFAULT_B = "cache"
+
+# Ejemplos de diferencias que se imprimen
+DEFAULT_MAX_EXAMPLES = 20
+
+# Largo máximo de los valores en los ejemplos impresos
+EXAMPLE_VALUE_WIDTH = 60
+
+# Títulos repetidos sin formatear ("Número de Serie (21)"), agrupados con su campo
+REPEATED_TITLE_PATTERN = re.compile(r"^(.+) \(\d+\)$")
+
+
+def _as_reports(result):
+    """
+    Normaliza el resultado de una implementación a una lista de reportes.
+
+    Args:
+        result (dict, list or None): Valor devuelto por el extractor
+
+    Returns:
+        list: Diccionarios de datos, uno por reporte
+    """
+    if result is None:
+        raise ValueError("el extractor no devolvió datos")
+    if isinstance(result, dict):
+        return [result]
+    return list(result)
+
+
+def load_extractor(spec):
+    """
+    Obtiene la función de extracción de una especificación.
+
+    Args:
+        spec (str): "actual", "unico", "cache", "cache:CARPETA" o "modulo:funcion"
+
+    Returns:
+        callable: Función (pdf_path, pdf_bytes) -> lista de reportes
+    """
+    from data_extraction import (iter_page_texts, split_report_pages, parse_page_texts,
+                                 add_report_source, extract_data_from_pdf)
+
+    if spec == "actual":
+        def extractor(pdf_path, pdf_bytes):
+            file_name = os.path.basename(pdf_path)
+            return [add_report_source(parse_page_texts(report_pages, file_name), pdf_path, report_index)
+                    for report_index, report_pages
+                    in enumerate(split_report_pages(iter_page_texts(pdf_path, pdf_bytes)), start=1)]
+        return extractor
+
+    if spec == "unico":
+        def extractor(pdf_path, pdf_bytes):
+            return _as_reports(extract_data_from_pdf(pdf_path, pdf_bytes))
+        return extractor
+
+    if spec == "cache" or spec.startswith("cache:"):
+        from page_text_cache import PageTextCache, DEFAULT_CACHE_DIR
+        cache = PageTextCache(spec[len("cache:"):] or DEFAULT_CACHE_DIR)
+
+        def extractor(pdf_path, pdf_bytes):
+            file_name = os.path.basename(pdf_path)
+            page_texts = cache.read_page_texts(pdf_path, pdf_bytes)
+            return [add_report_source(parse_page_texts(report_pages, file_name), pdf_path, report_index)
+                    for report_index, report_pages in enumerate(split_report_pages(page_texts), start=1)]
+        return extractor
+
+    module_name, separator, function_name = spec.partition(":")
+    if not separator or not function_name:
+        raise ValueError(f"Implementación desconocida: {spec} (use actual, unico, cache o modulo:funcion)")
+    function = getattr(importlib.import_module(module_name), function_name)
+
+    def extractor(pdf_path, pdf_bytes):
+        return _as_reports(function(pdf_path, pdf_bytes))
+    return extractor
+
+
+def _run_timed(extractor, pdf_path, pdf_bytes):
+    """
+    Ejecuta una implementación sobre un PDF.
+
+    Returns:
+        tuple: (reportes o None, error o None, segundos)
+    """
+    start = time.perf_counter()
+    try:
+        reports = extractor(pdf_path, pdf_bytes)
+        error = None
+    except Exception as e:
+        reports = None
+        error = f"{type(e).__name__}: {e}"
+    return reports, error, time.perf_counter() - start
+
+
+def diff_reports(reports_a, reports_b):
+    """
+    Compara campo por campo los reportes de ambas implementaciones. Un campo
+    ausente equivale a None; los reportes sobrantes se comparan con uno vacío.
+
+    Args:
+        reports_a (list): Reportes de la implementación A
+        reports_b (list): Reportes de la implementación B
+
+    Returns:
+        list: Diferencias (diccionarios con report, column, a y b)
+    """
+    differences = []
+    for report_index in range(max(len(reports_a), len(reports_b))):
+        report_a = reports_a[report_index] if report_index < len(reports_a) else {}
+        report_b = reports_b[report_index] if report_index < len(reports_b) else {}
+        columns = list(report_a) + [column for column in report_b if column not in report_a]
+        for column in columns:
+            value_a = report_a.get(column)
+            value_b = report_b.get(column)
+            if value_a != value_b:
+                differences.append({"report": report_index + 1, "column": column,
+                                    "a": value_a, "b": value_b})
+    return differences
+
+
+def compare_corpus(pdf_files, spec_a=DEFAULT_A, spec_b=DEFAULT_B, repeat=1):
+    """
+    Ejecuta ambas implementaciones sobre cada PDF y compara sus resultados.
+
+    Args:
+        pdf_files (list): Rutas de los PDFs
+        spec_a (str): Implementación de referencia
+        spec_b (str): Implementación candidata
+        repeat (int): Ejecuciones por archivo e implementación; se toma la más rápida
+
+    Returns:
+        list: Un diccionario por archivo con reportes, errores, tiempos y diferencias
+    """
+    extractors = {"a": load_extractor(spec_a), "b": load_extractor(spec_b)}
+    results = []
+    for position, pdf_path in enumerate(pdf_files):
+        with open(pdf_path, "rb") as pdf_file:
+            pdf_bytes = pdf_file.read()
+
+        outcome = {side: {"reports": None, "error": None, "seconds": []} for side in extractors}
+        for run in range(max(1, repeat)):
+            # Alternar el orden para no favorecer siempre a la misma implementación
+            order = ("a", "b") if (position + run) % 2 == 0 else ("b", "a")
+            for side in order:
+                reports, error, seconds = _run_timed(extractors[side], pdf_path, pdf_bytes)
+                outcome[side]["reports"] = reports
+                outcome[side]["error"] = error
+                outcome[side]["seconds"].append(seconds)
+
+        reports_a = outcome["a"]["reports"] or []
+        reports_b = outcome["b"]["reports"] or []
+        results.append({
+            "file": pdf_path,
+            "reports_a": len(reports_a),
+            "reports_b": len(reports_b),
+            "error_a": outcome["a"]["error"],
+            "error_b": outcome["b"]["error"],
+            "seconds_a": min(outcome["a"]["seconds"]),
+            "seconds_b": min(outcome["b"]["seconds"]),
+            "differences": diff_reports(reports_a, reports_b),
+        })
+    return results
+
+
+def summarize(results):
+    """
+    Resume la comparación: archivos idénticos, diferencias por campo y tiempos.
+
+    Args:
+        results (list): Resultado de compare_corpus
+
+    Returns:
+        dict: Resumen con files, identical, errors_a, errors_b, field_differences,
+            seconds_a, seconds_b, speedup y median_file_speedup
+    """
+    from result_index import get_field_name
+
+    field_differences = {}
+    for result in results:
+        reports_by_field = {}
+        for difference in result["differences"]:
+            field = get_field_name(difference["column"])
+            match = REPEATED_TITLE_PATTERN.match(field)
+            field = match.group(1) if match else field
+            reports_by_field.setdefault(field, set()).add(difference["report"])
+        for field, reports in reports_by_field.items():
+            field_differences[field] = field_differences.get(field, 0) + len(reports)
+
+    seconds_a = sum(result["seconds_a"] for result in results)
+    seconds_b = sum(result["seconds_b"] for result in results)
+    ratios = [result["seconds_a"] / result["seconds_b"] for result in results if result["seconds_b"] > 0]
+    return {
+        "files": len(results),
+        "identical": sum(1 for result in results if not result["differences"]
+                         and not result["error_a"] and not result["error_b"]),
+        "errors_a": sum(1 for result in results if result["error_a"]),
+        "errors_b": sum(1 for result in results if result["error_b"]),
+        "field_differences": dict(sorted(field_differences.items(), key=lambda item: -item[1])),
+        "seconds_a": round(seconds_a, 4),
+        "seconds_b": round(seconds_b, 4),
+        "speedup": round(seconds_a / seconds_b, 3) if seconds_b > 0 else None,
+        "median_file_speedup": round(statistics.median(ratios), 3) if ratios else None,
+    }
+
+
+def _short(value):
+    """Representación de un valor recortada para el informe"""
+    text = repr(value)
+    return text if len(text) <= EXAMPLE_VALUE_WIDTH else text[:EXAMPLE_VALUE_WIDTH - 3] + "..."
+
+
+def print_report(results, summary, spec_a, spec_b, max_examples=DEFAULT_MAX_EXAMPLES):
+    """Imprime un resumen legible de la comparación"""
+    print(f"A = {spec_a}   B = {spec_b}")
+    print(f"\n{'Archivo':<40} {'A (s)':>9} {'B (s)':>9} {'A/B':>7} {'Rep.':>7} {'Dif.':>6}")
+    for result in results:
+        ratio = result["seconds_a"] / result["seconds_b"] if result["seconds_b"] > 0 else float("inf")
+        reports = f"{result['reports_a']}/{result['reports_b']}"
+        print(f"{os.path.basename(result['file'])[:40]:<40} {result['seconds_a']:9.4f} "
+              f"{result['seconds_b']:9.4f} {ratio:7.2f} {reports:>7} {len(result['differences']):6d}")
+        for side in ("a", "b"):
+            if result[f"error_{side}"]:
+                print(f"    error en {side.upper()}: {result[f'error_{side}']}")
+
+    print(f"\nArchivos: {summary['files']}  idénticos: {summary['identical']}  "
+          f"errores A: {summary['errors_a']}  errores B: {summary['errors_b']}")
+    print(f"Tiempo total A: {summary['seconds_a']:.3f} s  B: {summary['seconds_b']:.3f} s  "
+          f"(A/B {summary['speedup']}, mediana por archivo {summary['median_file_speedup']})")
+
+    if summary["field_differences"]:
+        print("\nReportes con diferencias por campo:")
+        for field, count in summary["field_differences"].items():
+            print(f"  {count:6d}  {field}")
+
+        print("\nEjemplos:")
+        examples = ((result, difference) for result in results for difference in result["differences"])
+        for number, (result, difference) in enumerate(examples):
+            if number >= max_examples:
+                break
+            print(f"  {os.path.basename(result['file'])} #{difference['report']} {difference['column']}")
+            print(f"      A: {_short(difference['a'])}")
+            print(f"      B: {_short(difference['b'])}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Comparación A/B de dos implementaciones del extractor")
+    parser.add_argument("pdf_dir", help="Carpeta con los PDFs del corpus")
+    parser.add_argument("--a", default=DEFAULT_A, help="Implementación de referencia")
+    parser.add_argument("--b", default=DEFAULT_B, help="Implementación candidata")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="Ejecuciones por archivo; se informa la más rápida")
+    parser.add_argument("--examples", type=int, default=DEFAULT_MAX_EXAMPLES)
+    parser.add_argument("--json", help="Guardar la comparación completa en un archivo JSON")
+
+    args = parser.parse_args()
+    pdf_files = sorted(glob.glob(os.path.join(args.pdf_dir, "**", "*.pdf"), recursive=True))
+    if not pdf_files:
+        print(f"No se encontraron PDFs en {args.pdf_dir}")
+        sys.exit(2)
+
+    results = compare_corpus(pdf_files, args.a, args.b, args.repeat)
+    summary = summarize(results)
+    print_report(results, summary, args.a, args.b, args.examples)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as json_file:
+            json.dump({"a": args.a, "b": args.b, "summary": summary, "files": results},
+                      json_file, indent=2, ensure_ascii=False, default=str)
+
+    sys.exit(0 if summary["identical"] == summary["files"] else 1)
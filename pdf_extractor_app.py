@@ -5,21 +5,36 @@ Presenta una interfaz más intuitiva y profesional con mejor organización de el
 
 Módulos relacionados:
 - pdf_processor.py: Contiene la clase para procesar PDFs en segundo plano
+- data_export.py: Exporta los resultados a Excel, CSV, Parquet o SQLite
+- result_index.py: Índice invertido para buscar en los resultados
+- progress_stats.py: Estadísticas de velocidad y tiempo restante
+- folder_scan.py: Recorrido recursivo de carpetas con manifiesto para reanudar
 """
 
 import os
 from PyQt6.QtWidgets import (QMainWindow, QPushButton, QVBoxLayout, QHBoxLayout,
                              QFileDialog, QLabel, QTableWidget, QTableWidgetItem,
                              QWidget, QProgressBar, QMessageBox, QGroupBox,
-                             QSplitter, QFrame, QStatusBar, QHeaderView)
-from PyQt6.QtCore import Qt, QSize
+                             QSplitter, QFrame, QStatusBar, QHeaderView, QCheckBox,
+                             QLineEdit, QComboBox, QSpinBox)
+from PyQt6.QtCore import Qt, QSize, QTimer
 from PyQt6.QtGui import QIcon, QFont, QAction
-from pdf_processor import PDFExtractorThread
-import pandas as pd
-import openpyxl
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
-from openpyxl.formatting.rule import FormulaRule
+from result_index import ResultIndex
+from progress_stats import format_duration
+from folder_scan import DEFAULT_INCLUDE
+from constants import EXCEL_MAX_ROWS_PER_SHEET, EXCEL_DEFAULT_MAX_MB_PER_FILE
+
+# pdf_processor (PyMuPDF, pandas) y data_export (openpyxl, pyarrow) se importan
+# al usarse por primera vez para que la ventana aparezca sin esperar a cargarlos
+
+# Filas que se muestran en la tabla cuando el resultado quedó volcado en disco
+PREVIEW_ROWS = 1000
+
+# Intervalo de actualización de las estadísticas de avance (milisegundos)
+STATS_REFRESH_MS = 500
+
+# Espera tras la última tecla antes de filtrar los resultados (milisegundos)
+SEARCH_DEBOUNCE_MS = 250
 
 
 class PDFExtractorApp(QMainWindow):
@@ -31,7 +46,14 @@ class PDFExtractorApp(QMainWindow):
         self.setWindowTitle("Extractor de Datos PDF - Sistema de Gestión")
         self.setGeometry(100, 100, 1000, 800)  # Ventana más grande
         self.pdf_files = []
+        self.scan_folder = None
         self.original_df = None
+        self.append_target = None
+        self.result_path = None
+        self.folder_scan = None
+        self.result_index = None
+        self.index_thread = None
+        self.hidden_rows = set()
 
         # Crear barra de estado
         self.statusBar = QStatusBar()
@@ -79,15 +101,33 @@ class PDFExtractorApp(QMainWindow):
         self.select_btn.setMinimumHeight(30)
         self.select_btn.clicked.connect(self.select_pdfs)
 
+        self.folder_btn = QPushButton("Procesar carpeta")
+        self.folder_btn.setMinimumHeight(30)
+        self.folder_btn.clicked.connect(self.select_folder)
+
         self.clear_btn = QPushButton("Limpiar selección")
         self.clear_btn.setMinimumHeight(30)
         self.clear_btn.clicked.connect(self.clear_selection)
         self.clear_btn.setEnabled(False)
 
         file_btn_layout.addWidget(self.select_btn)
+        file_btn_layout.addWidget(self.folder_btn)
         file_btn_layout.addWidget(self.clear_btn)
         file_layout.addLayout(file_btn_layout)
 
+        # Patrones para el recorrido de carpetas, separados por ';'
+        pattern_layout = QHBoxLayout()
+        pattern_layout.addWidget(QLabel("Incluir:"))
+        self.include_input = QLineEdit(";".join(DEFAULT_INCLUDE))
+        self.include_input.setFont(QFont("Arial", 9))
+        pattern_layout.addWidget(self.include_input)
+        pattern_layout.addWidget(QLabel("Excluir:"))
+        self.exclude_input = QLineEdit()
+        self.exclude_input.setPlaceholderText("por ejemplo: anulados; borrador*")
+        self.exclude_input.setFont(QFont("Arial", 9))
+        pattern_layout.addWidget(self.exclude_input)
+        file_layout.addLayout(pattern_layout)
+
         controls_layout.addWidget(file_group)
 
         # Sección de procesamiento
@@ -95,6 +135,17 @@ class PDFExtractorApp(QMainWindow):
         process_group.setFont(QFont("Arial", 10, QFont.Weight.Bold))
         process_layout = QVBoxLayout(process_group)
 
+        # Guardar el texto de las páginas para re-analizar sin volver a abrir los PDFs
+        self.cache_checkbox = QCheckBox("Usar caché de texto de páginas")
+        self.cache_checkbox.setFont(QFont("Arial", 9))
+        process_layout.addWidget(self.cache_checkbox)
+
+        # Detección previa: omitir facturas, anexos escaneados, etc.
+        self.form_check_checkbox = QCheckBox("Omitir PDFs que no son reportes F-COM")
+        self.form_check_checkbox.setFont(QFont("Arial", 9))
+        self.form_check_checkbox.setChecked(True)
+        process_layout.addWidget(self.form_check_checkbox)
+
         # Botón de procesamiento
         self.process_btn = QPushButton("Procesar PDFs")
         self.process_btn.setMinimumHeight(40)
@@ -114,6 +165,17 @@ class PDFExtractorApp(QMainWindow):
         self.progress_bar.setMinimumHeight(20)
         progress_layout.addWidget(self.progress_bar)
 
+        # Velocidad, tiempo restante, archivo en curso y archivos más lentos
+        self.stats_label = QLabel("")
+        self.stats_label.setFont(QFont("Arial", 9))
+        self.stats_label.setVisible(False)
+        progress_layout.addWidget(self.stats_label)
+
+        # Las estadísticas se consultan periódicamente, no con una señal por archivo
+        self.stats_timer = QTimer(self)
+        self.stats_timer.setInterval(STATS_REFRESH_MS)
+        self.stats_timer.timeout.connect(self.refresh_stats)
+
         process_layout.addLayout(progress_layout)
         controls_layout.addWidget(process_group)
 
@@ -122,8 +184,33 @@ class PDFExtractorApp(QMainWindow):
         export_group.setFont(QFont("Arial", 10, QFont.Weight.Bold))
         export_layout = QVBoxLayout(export_group)
 
+        # Opción para añadir solo las filas nuevas a una exportación existente
+        self.append_checkbox = QCheckBox("Añadir a una exportación existente (omitir PDFs ya exportados)")
+        self.append_checkbox.setFont(QFont("Arial", 9))
+        export_layout.addWidget(self.append_checkbox)
+
+        # Límites de las exportaciones a Excel: al superarlos se crean hojas y
+        # archivos nuevos (_parte2, _parte3, ...)
+        limits_layout = QHBoxLayout()
+        rows_label = QLabel("Filas por hoja:")
+        rows_label.setFont(QFont("Arial", 9))
+        limits_layout.addWidget(rows_label)
+        self.max_rows_spin = QSpinBox()
+        self.max_rows_spin.setRange(1, EXCEL_MAX_ROWS_PER_SHEET)
+        self.max_rows_spin.setValue(EXCEL_MAX_ROWS_PER_SHEET)
+        self.max_rows_spin.setGroupSeparatorShown(True)
+        limits_layout.addWidget(self.max_rows_spin)
+        size_label = QLabel("MB por archivo:")
+        size_label.setFont(QFont("Arial", 9))
+        limits_layout.addWidget(size_label)
+        self.max_mb_spin = QSpinBox()
+        self.max_mb_spin.setRange(1, 100000)
+        self.max_mb_spin.setValue(EXCEL_DEFAULT_MAX_MB_PER_FILE)
+        limits_layout.addWidget(self.max_mb_spin)
+        export_layout.addLayout(limits_layout)
+
         # Botón de exportación
-        self.export_btn = QPushButton("Exportar a Excel")
+        self.export_btn = QPushButton("Exportar resultados")
         self.export_btn.setMinimumHeight(35)
         self.export_btn.clicked.connect(self.export_results)
         self.export_btn.setEnabled(False)
@@ -139,11 +226,36 @@ class PDFExtractorApp(QMainWindow):
         results_group.setFont(QFont("Arial", 10, QFont.Weight.Bold))
         results_layout = QVBoxLayout(results_group)
 
+        # Búsqueda sobre los resultados
+        search_layout = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Buscar comercio, serie, técnico...")
+        self.search_input.setFont(QFont("Arial", 9))
+        self.search_input.setClearButtonEnabled(True)
+        # Filtrar una sola vez cuando se deja de escribir, no con cada tecla
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.apply_search_filter)
+        self.search_input.textChanged.connect(self.search_timer.start)
+        self.search_field_combo = QComboBox()
+        self.search_field_combo.setFont(QFont("Arial", 9))
+        self.search_field_combo.addItem("Todas las columnas", None)
+        self.search_field_combo.currentIndexChanged.connect(self.apply_search_filter)
+        self.search_count_label = QLabel("")
+        self.search_count_label.setFont(QFont("Arial", 9))
+        search_layout.addWidget(self.search_input, 3)
+        search_layout.addWidget(self.search_field_combo, 2)
+        search_layout.addWidget(self.search_count_label)
+        results_layout.addLayout(search_layout)
+
         # Tabla mejorada
         self.results_table = QTableWidget()
         self.results_table.setAlternatingRowColors(True)
         self.results_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.results_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        # Los anchos se ajustan una vez con resizeColumnsToContents() al mostrar
+        # resultados; el modo automático recalcula todo por cada celda o filtro
+        self.results_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
         self.results_table.horizontalHeader().setMinimumSectionSize(100)
 
         results_layout.addWidget(self.results_table)
@@ -171,6 +283,7 @@ class PDFExtractorApp(QMainWindow):
 
         if files:
             self.pdf_files = files
+            self.scan_folder = None
             file_count = len(files)
 
             # Actualizar etiquetas
@@ -188,9 +301,73 @@ class PDFExtractorApp(QMainWindow):
             # Mostrar mensaje de estado
             self.statusBar.showMessage(f"{file_count} archivos PDF seleccionados correctamente")
 
+    def select_folder(self):
+        """Selecciona una carpeta cuyos PDFs se buscan recursivamente al procesar"""
+        folder = QFileDialog.getExistingDirectory(self, "Seleccionar carpeta de reportes")
+        if not folder:
+            return
+
+        self.scan_folder = folder
+        self.pdf_files = []
+        self.file_label.setText("Carpeta seleccionada:")
+        self.file_count_label.setText(folder)
+        self.process_btn.setEnabled(True)
+        self.clear_btn.setEnabled(True)
+        self.statusBar.showMessage("Los PDFs de la carpeta y sus subcarpetas se buscarán al procesar")
+
+    def _split_patterns(self, text):
+        """Convierte el texto 'patrón1; patrón2' en una lista de patrones"""
+        return [pattern.strip() for pattern in text.split(";") if pattern.strip()]
+
+    def _create_folder_scan(self, skip_files, append_target):
+        """
+        Prepara el recorrido de la carpeta seleccionada. Al añadir a una
+        exportación existente se ofrece reanudar si el manifiesto de esa carpeta
+        y esa exportación tiene archivos ya procesados; sin exportación de
+        destino siempre se empieza un manifiesto nuevo.
+
+        Args:
+            skip_files (set): Rutas de los archivos a omitir (ya exportados)
+            append_target (str or None): Exportación a la que se añadirán los resultados
+
+        Returns:
+            FolderScan or None: Recorrido listo, o None si se canceló
+        """
+        from folder_scan import FolderScan, ScanManifest, default_manifest_path
+
+        manifest_path = default_manifest_path(self.scan_folder, append_target)
+        manifest = ScanManifest(manifest_path)
+        resume = False
+        done_count = manifest.done_count() if append_target else 0
+        if done_count:
+            answer = QMessageBox.question(
+                self, "Reanudar procesamiento",
+                f"{done_count} PDFs de esta carpeta ya se añadieron a esta exportación "
+                "en una ejecución anterior.\n"
+                "¿Desea omitirlos y continuar con el resto?\n\n"
+                "Elija 'No' para procesar de nuevo toda la carpeta.",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+                | QMessageBox.StandardButton.Cancel)
+            if answer == QMessageBox.StandardButton.Cancel:
+                manifest.close()
+                return None
+            resume = answer == QMessageBox.StandardButton.Yes
+
+        if not resume and manifest.entries:
+            # Empezar un manifiesto nuevo para esta carpeta
+            manifest.close()
+            os.remove(manifest_path)
+            manifest = ScanManifest(manifest_path)
+
+        return FolderScan(self.scan_folder,
+                          include=self._split_patterns(self.include_input.text()) or DEFAULT_INCLUDE,
+                          exclude=self._split_patterns(self.exclude_input.text()),
+                          manifest=manifest, skip_files=skip_files, defer_ok=True)
+
     def clear_selection(self):
         """Limpia la selección de archivos actual"""
         self.pdf_files = []
+        self.scan_folder = None
         self.file_label.setText("No hay archivos seleccionados")
         self.file_count_label.setText("")
         self.process_btn.setEnabled(False)
@@ -199,37 +376,119 @@ class PDFExtractorApp(QMainWindow):
 
     def process_pdfs(self):
         """Inicia el procesamiento de los PDFs seleccionados"""
-        if not self.pdf_files:
+        if not self.pdf_files and not self.scan_folder:
             return
 
+        files_to_process = self.pdf_files
+        skip_files = set()
+        append_target = None
+
+        # En modo de anexado, omitir los PDFs que ya están en la exportación existente
+        if self.append_checkbox.isChecked():
+            target_path, _ = QFileDialog.getOpenFileName(
+                self,
+                "Seleccionar exportación existente",
+                "",
+                "Exportaciones (*.xlsx *.csv *.parquet *.sqlite *.db)"
+            )
+            if not target_path:
+                return
+
+            try:
+                from data_export import read_existing_keys, filter_new_files
+                existing_keys = read_existing_keys(target_path)
+            except Exception as e:
+                QMessageBox.critical(self, "Error",
+                                     f"No se pudo leer la exportación existente:\n{str(e)}")
+                return
+
+            if self.scan_folder:
+                # Al recorrer una carpeta, los PDFs ya exportados se omiten al encontrarse
+                skip_files = existing_keys['files']
+            else:
+                files_to_process = filter_new_files(self.pdf_files, existing_keys)
+                skipped = len(self.pdf_files) - len(files_to_process)
+                if not files_to_process:
+                    QMessageBox.information(self, "Sin archivos nuevos",
+                                            "Todos los PDFs seleccionados ya están en la exportación existente.")
+                    return
+                self.statusBar.showMessage(f"Se omiten {skipped} PDFs ya exportados")
+
+            append_target = target_path
+
+        # Los PDFs de la carpeta se buscan mientras se procesan
+        if self.scan_folder:
+            files_to_process = self._create_folder_scan(skip_files, append_target)
+            if files_to_process is None:
+                return
+
+        # El resultado anterior (y su archivo temporal) se conserva hasta que la
+        # nueva ejecución realmente empieza, por si se cancela antes
+        self.append_target = append_target
+        self.discard_spilled_results()
+        # Los archivos de la carpeta se registran como procesados al exportar
+        self.folder_scan = None if isinstance(files_to_process, list) else files_to_process
+
         # Configurar y mostrar barra de progreso
         self.progress_bar.setValue(0)
         self.progress_bar.setVisible(True)
         self.progress_label.setVisible(True)
         self.process_btn.setEnabled(False)
         self.select_btn.setEnabled(False)
+        self.folder_btn.setEnabled(False)
         self.clear_btn.setEnabled(False)
 
         # Mostrar mensaje en la barra de estado
         self.statusBar.showMessage("Procesando archivos PDF, por favor espere...")
 
         # Crear y configurar hilo de extracción
-        self.extraction_thread = PDFExtractorThread(self.pdf_files)
+        from pdf_processor import PDFExtractorThread
+        self.extraction_thread = PDFExtractorThread(files_to_process,
+                                                    use_cache=self.cache_checkbox.isChecked(),
+                                                    check_form=self.form_check_checkbox.isChecked())
         self.extraction_thread.progress_updated.connect(self.update_progress)
         self.extraction_thread.extraction_finished.connect(self.display_results)
+        self.extraction_thread.extraction_spilled.connect(self.display_spilled_results)
         self.extraction_thread.error_occurred.connect(self.show_error)
 
         # Iniciar procesamiento
         self.extraction_thread.start()
+        self.stats_label.setText("")
+        self.stats_label.setVisible(True)
+        self.stats_timer.start()
 
     def update_progress(self, value):
         """Actualiza la barra de progreso"""
         self.progress_bar.setValue(value)
-        if value < 100:
-            self.statusBar.showMessage(f"Procesando... {value}% completado")
-        else:
+        if value >= 100:
+            self.stats_timer.stop()
             self.statusBar.showMessage("Finalizando el procesamiento...")
 
+    def refresh_stats(self):
+        """Muestra velocidad, tiempo restante y archivo en curso en la interfaz"""
+        stats = self.extraction_thread.tracker.snapshot()
+
+        eta = format_duration(stats["eta_seconds"])
+        self.statusBar.showMessage(
+            f"Procesando... {stats['percent']}% completado - "
+            f"{stats['processed']}/{stats['total']} archivos - "
+            f"quedan {eta}"
+        )
+
+        lines = [
+            f"{stats['files_per_second']:.1f} archivos/s - "
+            f"{stats['pages_per_second']:.1f} páginas/s - "
+            f"transcurrido {format_duration(stats['elapsed'])} - restante {eta}"
+        ]
+        if stats["current_file"]:
+            lines.append(f"Archivo actual: {stats['current_file']} "
+                         f"({format_duration(stats['current_file_seconds'])})")
+        if stats["slowest"]:
+            slowest = ", ".join(f"{name} ({seconds:.1f} s, {pages} pág.)"
+                                for name, seconds, pages in stats["slowest"])
+            lines.append(f"Más lentos: {slowest}")
+        self.stats_label.setText("\n".join(lines))
+
     def display_results(self, dataframe):
         """Muestra los resultados en la tabla"""
         # Acortar nombres de columna para mejor visualización
@@ -241,28 +500,32 @@ class PDFExtractorApp(QMainWindow):
             else:
                 short_names[col] = col
 
-        # Crear una copia del dataframe con nombres cortos para mostrar
-        display_df = dataframe.copy()
-        display_df.columns = [short_names[col] for col in dataframe.columns]
-
-        # Configurar tabla con los resultados
-        self.results_table.setRowCount(len(display_df))
-        self.results_table.setColumnCount(len(display_df.columns))
-        self.results_table.setHorizontalHeaderLabels(display_df.columns)
+        # Configurar tabla con los resultados; los nombres cortos solo se usan
+        # en los encabezados, sin copiar el dataframe
+        self.results_table.setRowCount(len(dataframe))
+        self.results_table.setColumnCount(len(dataframe.columns))
+        self.results_table.setHorizontalHeaderLabels([short_names[col] for col in dataframe.columns])
 
         # Configurar fuente del encabezado
         header_font = QFont("Arial", 9, QFont.Weight.Bold)
         self.results_table.horizontalHeader().setFont(header_font)
 
-        # Llenar la tabla con datos
-        for row in range(len(display_df)):
-            for col in range(len(display_df.columns)):
-                item = QTableWidgetItem(str(display_df.iloc[row, col]))
+        # Llenar la tabla por columnas: cada columna (de Arrow, categoría o tipada)
+        # se convierte de una vez; los nulos (NaT, <NA>) se muestran como "None"
+        self.results_table.setUpdatesEnabled(False)
+        for col, (_, values) in enumerate(dataframe.items()):
+            missing = values.isna().tolist()
+            for row, value in enumerate(values.tolist()):
+                item = QTableWidgetItem("None" if missing[row] else str(value))
                 self.results_table.setItem(row, col, item)
+        self.results_table.setUpdatesEnabled(True)
 
         # Guardar el dataframe original para exportación
         self.original_df = dataframe
 
+        # Construir el índice de búsqueda una sola vez por conjunto de resultados
+        self.build_search_index(dataframe)
+
         # Ajustar la tabla
         self.results_table.resizeColumnsToContents()
 
@@ -270,163 +533,218 @@ class PDFExtractorApp(QMainWindow):
         self.export_btn.setEnabled(True)
         self.process_btn.setEnabled(True)
         self.select_btn.setEnabled(True)
+        self.folder_btn.setEnabled(True)
         self.clear_btn.setEnabled(True)
 
         # Ocultar elementos de progreso
         self.progress_bar.setVisible(False)
         self.progress_label.setVisible(False)
+        self.stats_timer.stop()
+        self.stats_label.setVisible(False)
 
         # Actualizar barra de estado
-        self.statusBar.showMessage(f"Procesamiento completado: {len(self.pdf_files)} archivos procesados")
+        skipped_files = self.extraction_thread.skipped_files
+        processed = self.extraction_thread.tracker.processed_files - len(skipped_files)
+        self.statusBar.showMessage(f"Procesamiento completado: {processed} archivos procesados")
+
+        # Mostrar mensaje de éxito; los PDFs que no son reportes se listan aparte
+        message = QMessageBox(QMessageBox.Icon.Information, "Proceso completado",
+                              f"Se procesaron {processed} archivos PDF con éxito.\n"
+                              f"Se extrajeron {len(dataframe.columns)} campos de datos.", parent=self)
+        if skipped_files:
+            message.setInformativeText(f"Se omitieron {len(skipped_files)} PDFs que no son "
+                                       f"reportes F-COM (ver detalles).")
+            message.setDetailedText("\n".join(skipped_files))
+        message.exec()
+
+    def build_search_index(self, dataframe):
+        """
+        Crea en segundo plano el índice de búsqueda para los resultados
+        mostrados; mientras se construye, la tabla muestra todas las filas.
 
-        # Mostrar mensaje de éxito
-        QMessageBox.information(self, "Proceso completado",
-                                f"Se procesaron {len(self.pdf_files)} archivos PDF con éxito.\n"
-                                f"Se extrajeron {len(dataframe.columns)} campos de datos.")
+        Args:
+            dataframe (pd.DataFrame): Resultados mostrados en la tabla
+        """
+        from pdf_processor import SearchIndexThread
 
-    def show_error(self, message):
-        """Muestra un mensaje de error"""
-        # Restaurar estado de la interfaz
-        self.progress_bar.setVisible(False)
-        self.progress_label.setVisible(False)
-        self.process_btn.setEnabled(True)
-        self.select_btn.setEnabled(True)
-        self.clear_btn.setEnabled(True)
+        # Un índice anterior todavía en construcción se descarta al terminar
+        if self.index_thread is not None:
+            self.index_thread.wait()
+        self.result_index = None
+        self.search_timer.stop()
 
-        # Actualizar barra de estado
-        self.statusBar.showMessage("Error en el procesamiento")
+        # La tabla conserva el estado oculto de las filas del resultado anterior
+        self.set_hidden_rows(set())
 
-        # Mostrar mensaje de error
-        QMessageBox.critical(self, "Error", message)
+        self.search_field_combo.blockSignals(True)
+        self.search_field_combo.clear()
+        self.search_field_combo.addItem("Todas las columnas", None)
+        self.search_field_combo.blockSignals(False)
+        self.search_count_label.setText("Indexando...")
+
+        self.index_thread = SearchIndexThread(dataframe)
+        self.index_thread.index_ready.connect(self.set_search_index)
+        self.index_thread.start()
 
-    def apply_excel_styles(self, workbook, worksheet):
+    def set_search_index(self, result_index):
         """
-        Aplica estilos al archivo Excel para mejorar su apariencia.
+        Recibe el índice construido por SearchIndexThread y aplica la búsqueda
+        que se haya escrito mientras tanto.
 
         Args:
-            workbook: Libro de Excel (objeto openpyxl.Workbook)
-            worksheet: Hoja de cálculo (objeto openpyxl.Worksheet)
+            result_index (ResultIndex): Índice de los resultados mostrados
         """
-        # Definir estilos para los encabezados
-        header_font = Font(name='Arial', size=11, bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-        header_alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-        header_border = Border(
-            left=Side(style='thin', color="000000"),
-            right=Side(style='thin', color="000000"),
-            top=Side(style='thin', color="000000"),
-            bottom=Side(style='thin', color="000000")
-        )
+        if self.sender() is not self.index_thread:
+            # Índice de un resultado que ya fue reemplazado
+            return
+        self.result_index = result_index
 
-        # Definir estilos para las filas de datos
-        data_font = Font(name='Arial', size=10)
-        data_alignment = Alignment(vertical='center', wrap_text=True)
-        data_border = Border(
-            left=Side(style='thin', color="000000"),
-            right=Side(style='thin', color="000000"),
-            top=Side(style='thin', color="000000"),
-            bottom=Side(style='thin', color="000000")
-        )
+        # Actualizar la lista de campos sin disparar búsquedas intermedias
+        self.search_field_combo.blockSignals(True)
+        for field in self.result_index.fields:
+            self.search_field_combo.addItem(field, field)
+        self.search_field_combo.blockSignals(False)
+        self.search_count_label.setText("")
+
+        self.apply_search_filter()
 
-        # Colores alternos para las filas (celeste claro y blanco)
-        light_blue_fill = PatternFill(start_color="DEEBF7", end_color="DEEBF7", fill_type="solid")
+    def apply_search_filter(self):
+        """Muestra solo las filas que coinciden con la búsqueda actual"""
+        if self.result_index is None:
+            return
 
-        # Aplicar estilo a los encabezados (primera fila)
-        for col in range(1, worksheet.max_column + 1):
-            cell = worksheet.cell(1, col)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = header_alignment
-            cell.border = header_border
+        matches = self.result_index.search(self.search_input.text(),
+                                           self.search_field_combo.currentData())
+        if matches is None:
+            hidden_rows = set()
+            self.search_count_label.setText("")
+        else:
+            hidden_rows = set(range(self.result_index.row_count)) - matches
+            self.search_count_label.setText(f"{len(matches)} de {self.result_index.row_count} filas")
+        self.set_hidden_rows(hidden_rows)
 
-        # Ajustar el alto de la primera fila
-        worksheet.row_dimensions[1].height = 30
+    def set_hidden_rows(self, hidden_rows):
+        """
+        Oculta las filas indicadas y muestra las demás en una sola actualización
+        de la tabla, cambiando solo las filas cuyo estado de visibilidad cambia.
 
-        # Aplicar estilos a las filas de datos con colores alternados
-        for row in range(2, worksheet.max_row + 1):
-            for col in range(1, worksheet.max_column + 1):
-                cell = worksheet.cell(row, col)
-                cell.font = data_font
-                cell.alignment = data_alignment
-                cell.border = data_border
+        Args:
+            hidden_rows (set): Filas que deben quedar ocultas
+        """
+        row_count = self.results_table.rowCount()
+        self.results_table.setUpdatesEnabled(False)
+        for row in hidden_rows - self.hidden_rows:
+            self.results_table.setRowHidden(row, True)
+        for row in self.hidden_rows - hidden_rows:
+            if row < row_count:
+                self.results_table.setRowHidden(row, False)
+        self.results_table.setUpdatesEnabled(True)
+        self.hidden_rows = hidden_rows
+
+    def display_spilled_results(self, result_path):
+        """
+        Muestra una vista previa de un resultado que superó el límite de memoria
+        y quedó volcado en un archivo Parquet temporal.
+
+        Args:
+            result_path (str): Ruta al archivo Parquet con todos los resultados
+        """
+        import pandas as pd
+        from data_export import iter_parquet_chunks
 
-                # Aplicar color alterno a las filas
-                if row % 2 == 0:
-                    cell.fill = light_blue_fill
+        self.result_path = result_path
+        preview_df = next(iter_parquet_chunks(result_path, batch_size=PREVIEW_ROWS), pd.DataFrame())
+        self.display_results(preview_df)
 
-        # Ajustar el ancho de las columnas para mejor visualización
-        for col in range(1, worksheet.max_column + 1):
-            column_letter = get_column_letter(col)
-            max_length = 0
+        import pyarrow.parquet as pq
+        total_rows = pq.ParquetFile(result_path).metadata.num_rows
+        self.statusBar.showMessage(
+            f"Mostrando las primeras {len(preview_df)} de {total_rows} filas; "
+            f"la exportación incluye todas las filas")
 
-            # Encontrar la celda con el contenido más largo en esta columna
-            for row in range(1, worksheet.max_row + 1):
-                cell_value = str(worksheet.cell(row, col).value)
-                max_length = max(max_length, len(cell_value))
+    def discard_spilled_results(self):
+        """Elimina el archivo temporal de un resultado volcado a disco"""
+        if self.result_path and os.path.exists(self.result_path):
+            os.remove(self.result_path)
+        self.result_path = None
 
-            # Limitar el ancho máximo a 50 caracteres para evitar columnas demasiado anchas
-            adjusted_width = min(max_length + 2, 50)
-            worksheet.column_dimensions[column_letter].width = adjusted_width
+    def show_error(self, message):
+        """Muestra un mensaje de error"""
+        # Restaurar estado de la interfaz
+        self.progress_bar.setVisible(False)
+        self.progress_label.setVisible(False)
+        self.stats_timer.stop()
+        self.stats_label.setVisible(False)
+        self.process_btn.setEnabled(True)
+        self.select_btn.setEnabled(True)
+        self.folder_btn.setEnabled(True)
+        self.clear_btn.setEnabled(True)
 
-        # Congelar la primera fila
-        worksheet.freeze_panes = "A2"
+        # Actualizar barra de estado
+        self.statusBar.showMessage("Error en el procesamiento")
 
-        # Aplicar autofilter para facilitar la navegación
-        worksheet.auto_filter.ref = f"A1:{get_column_letter(worksheet.max_column)}{worksheet.max_row}"
+        # Mostrar mensaje de error
+        QMessageBox.critical(self, "Error", message)
 
     def export_results(self):
-        """Exporta los resultados a un archivo Excel con estilos mejorados"""
+        """Exporta los resultados a Excel, CSV, Parquet o SQLite con estilos mejorados"""
         if self.original_df is None or len(self.original_df) == 0:
             QMessageBox.warning(self, "Advertencia", "No hay datos para exportar.")
             return
 
-        # Sugerir un nombre basado en la fecha
-        import datetime
-        default_name = f"datos_extraidos_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+        if self.append_target:
+            # Añadir solo las filas nuevas a la exportación elegida antes de procesar
+            file_path = self.append_target
+        else:
+            # Sugerir un nombre basado en la fecha
+            import datetime
+            default_name = f"datos_extraidos_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
 
-        file_path, _ = QFileDialog.getSaveFileName(
-            self,
-            "Guardar como Excel",
-            default_name,
-            "Excel Files (*.xlsx)"
-        )
+            file_path, _ = QFileDialog.getSaveFileName(
+                self,
+                "Guardar resultados",
+                default_name,
+                "Excel Files (*.xlsx);;CSV Files (*.csv);;Parquet Files (*.parquet);;SQLite (*.sqlite *.db)"
+            )
 
         if file_path:
             try:
                 # Mostrar progreso en la barra de estado
-                self.statusBar.showMessage("Exportando datos a Excel...")
-
-                # Crear un libro y hoja de trabajo de Excel usando openpyxl
-                workbook = openpyxl.Workbook()
-                worksheet = workbook.active
-                worksheet.title = "Datos Extraídos"
-
-                # Añadir encabezados
-                for col_idx, column_name in enumerate(self.original_df.columns, start=1):
-                    worksheet.cell(row=1, column=col_idx).value = column_name
-
-                # Añadir datos
-                for row_idx, row in enumerate(self.original_df.itertuples(index=False), start=2):
-                    for col_idx, value in enumerate(row, start=1):
-                        # Evitar valores None
-                        cell_value = "" if value is None else value
-                        worksheet.cell(row=row_idx, column=col_idx).value = cell_value
-
-                # Aplicar estilos
-                self.apply_excel_styles(workbook, worksheet)
-
-                # Guardar el archivo
-                workbook.save(file_path)
+                self.statusBar.showMessage("Exportando datos...")
+
+                from data_export import (export_dataframe, export_chunks, append_to_export,
+                                         append_chunks_to_export, iter_parquet_chunks)
+
+                # Límites de Excel elegidos en la interfaz (se ignoran en otros formatos)
+                limits = (self.max_rows_spin.value(), self.max_mb_spin.value() * 1024 * 1024)
+
+                if self.append_target:
+                    if self.result_path:
+                        # Las claves existentes se leen una vez y los bloques del
+                        # archivo temporal se escriben en una sola pasada
+                        added_rows = append_chunks_to_export(iter_parquet_chunks(self.result_path),
+                                                             file_path, *limits)
+                    else:
+                        added_rows = append_to_export(self.original_df, file_path, *limits)
+                    message = (f"Se añadieron {added_rows} filas nuevas a:\n{file_path}")
+                else:
+                    if self.result_path:
+                        # Exportar por bloques desde el archivo temporal
+                        export_chunks(iter_parquet_chunks(self.result_path), file_path, *limits)
+                    else:
+                        export_dataframe(self.original_df, file_path, *limits)
+                    message = f"Los datos fueron exportados correctamente a:\n{file_path}"
+
+                # Solo ahora que sus filas están escritas, los PDFs de la carpeta
+                # quedan como procesados en el manifiesto para reanudar
+                if self.folder_scan is not None:
+                    self.folder_scan.commit_ok()
 
                 # Actualizar barra de estado
                 self.statusBar.showMessage(f"Datos exportados exitosamente a {os.path.basename(file_path)}")
 
                 # Mostrar mensaje de éxito
-                QMessageBox.information(
-                    self,
-                    "Exportación exitosa",
-                    f"Los datos fueron exportados correctamente a:\n{file_path}"
-                )
+                QMessageBox.information(self, "Exportación exitosa", message)
             except Exception as e:
                 self.statusBar.showMessage("Error en la exportación")
                 QMessageBox.critical(
@@ -441,4 +759,7 @@ class PDFExtractorApp(QMainWindow):
         if hasattr(self, 'extraction_thread') and self.extraction_thread.isRunning():
             self.extraction_thread.stop()
             self.extraction_thread.wait()
+        if self.index_thread is not None:
+            self.index_thread.wait()
+        self.discard_spilled_results()
         event.accept()
\ No newline at end of file
@@ -0,0 +1,372 @@
+# pdf_pipeline.py
+
+"""
+Etapa de destino con memoria acotada para lotes grandes de PDFs.
+Recibe los diccionarios extraídos a través de una cola limitada (que frena al
+extractor cuando el destino va atrasado), los combina por bloques y, cuando la
+memoria ocupada supera el límite configurado, vuelca los bloques a un archivo
+Parquet temporal en disco.
+
+Etapas del procesamiento:
+- Lectura: pdf_prefetch.py (limitada por presupuesto de bytes)
+- Análisis: data_extraction.py, ejecutado en el hilo de extracción
+- Destino: ResultSink en este módulo (limitado por memory_limit)
+
+Módulos relacionados:
+- data_processing.py: Combina y ordena las columnas de cada bloque
+- pdf_processor.py: Conecta las etapas en el hilo de extracción
+"""
+
+import os
+import queue
+import sys
+import tempfile
+import threading
+import pandas as pd
+from data_processing import (merge_dataframes, order_result_columns, normalize_result_types,
+                             categorize_result_columns, dataframe_to_arrow, result_string_dtype)
+
+# Límite de memoria para los resultados acumulados (512 MB)
+DEFAULT_MEMORY_LIMIT = 512 * 1024 * 1024
+
+# Filas que se combinan juntas en cada bloque
+DEFAULT_CHUNK_ROWS = 500
+
+# Capacidad de la cola entre el extractor y el destino
+DEFAULT_QUEUE_SIZE = 64
+
+# Marca de fin de la cola
+_END_OF_STREAM = object()
+
+
+def row_memory(data):
+    """
+    Estima la memoria de un diccionario extraído (el diccionario y sus valores;
+    las claves son en su mayoría los títulos compartidos de constants.py).
+
+    Args:
+        data (dict): Datos extraídos de un reporte
+
+    Returns:
+        int: Bytes aproximados
+    """
+    return sys.getsizeof(data) + sum(sys.getsizeof(value) for value in data.values())
+
+
+class ResultSink:
+    """
+    Acumula los resultados por bloques sin superar un límite de memoria.
+
+    Los bloques se mantienen en memoria mientras quepan; al superar el límite se
+    escriben en un archivo Parquet temporal y a partir de ese momento todos los
+    bloques siguientes se escriben también en disco. La memoria contada incluye
+    los bloques, las filas pendientes de combinar y las que esperan en la cola
+    de SinkStage (queued_memory).
+
+    Un bloque puede traer columnas que los anteriores no tenían (por ejemplo una
+    terminal más): el conjunto de columnas crece y los bloques anteriores las
+    reciben vacías al terminar. Si ya se estaba escribiendo en disco, se empieza
+    una parte nueva del archivo temporal y finish() las une con el esquema final.
+    """
+
+    def __init__(self, memory_limit=DEFAULT_MEMORY_LIMIT, chunk_rows=DEFAULT_CHUNK_ROWS,
+                 spill_dir=None, normalize_types=True, arrow_strings=True):
+        """
+        Inicializa el destino de resultados.
+
+        Args:
+            memory_limit (int): Máximo de bytes de resultados en memoria
+            chunk_rows (int): Filas que se combinan en cada bloque
+            spill_dir (str, optional): Carpeta para el archivo temporal
+            normalize_types (bool): Convierte fechas, horas y cantidades con
+                normalize_result_types
+            arrow_strings (bool): Guarda el texto en columnas de Arrow y los
+                campos de CATEGORY_FIELDS como categorías en el resultado final
+        """
+        self.memory_limit = memory_limit
+        self.chunk_rows = max(1, chunk_rows)
+        self.spill_dir = spill_dir
+        self.normalize_types = normalize_types
+        self.arrow_strings = arrow_strings
+        self.rows = []
+        self.rows_memory = 0
+        self.queued_memory = 0
+        self.chunks = []
+        self.columns = None
+        self.output_columns = []
+        self.memory_used = 0
+        self.peak_memory = 0
+        self.row_count = 0
+        self.spill_path = None
+        self.spill_parts = []
+        self.spill_writer = None
+        self.spill_schema = None
+
+    def pending_memory(self):
+        """Memoria de las filas que todavía no forman parte de un bloque"""
+        return self.rows_memory + self.queued_memory
+
+    def _track_peak(self):
+        """Actualiza el pico de memoria contada"""
+        self.peak_memory = max(self.peak_memory, self.memory_used + self.pending_memory())
+
+    def add(self, data):
+        """
+        Añade el diccionario extraído de un PDF.
+
+        Args:
+            data (dict): Datos extraídos por extract_data_from_pdf
+        """
+        # Las filas pendientes también cuentan: si la nueva ya no cabe, volcar los
+        # bloques a disco y combinar las pendientes antes de aceptarla
+        data_memory = row_memory(data)
+        if self.memory_used + self.pending_memory() + data_memory > self.memory_limit:
+            self._spill_chunks()
+            self._flush_rows()
+
+        self.rows.append(data)
+        self.rows_memory += data_memory
+        self._track_peak()
+        if len(self.rows) >= self.chunk_rows:
+            self._flush_rows()
+
+    def _missing_values(self, length):
+        """Columna vacía para las columnas que un bloque no tiene"""
+        if self.arrow_strings:
+            return pd.array([None] * length, dtype=result_string_dtype())
+        return [None] * length
+
+    def _align_columns(self, chunk, columns):
+        """
+        Reordena un bloque con las columnas indicadas, añadiendo vacías las que
+        no tiene.
+
+        Args:
+            chunk (pd.DataFrame): Bloque a alinear
+            columns (list): Columnas en el orden final
+
+        Returns:
+            pd.DataFrame: Bloque con exactamente esas columnas
+        """
+        if list(chunk.columns) == columns:
+            return chunk
+        missing_values = self._missing_values(len(chunk))
+        data = {column: chunk[column] if column in chunk.columns else missing_values
+                for column in columns}
+        return pd.DataFrame(data, index=chunk.index, columns=columns)
+
+    def _flush_rows(self):
+        """Convierte las filas pendientes en un bloque con las columnas finales"""
+        if not self.rows:
+            return
+
+        chunk = merge_dataframes([pd.DataFrame(self.rows)], arrow_strings=self.arrow_strings)
+        self.rows = []
+        self.rows_memory = 0
+
+        # Las columnas nuevas de este bloque se suman al orden del resultado
+        if self.columns is None:
+            self.columns = order_result_columns(chunk.columns)
+        else:
+            known_columns = set(self.columns)
+            new_columns = [column for column in chunk.columns if column not in known_columns]
+            if new_columns:
+                self.columns = order_result_columns(self.columns + new_columns)
+        chunk = self._align_columns(chunk, self.columns)
+        if self.normalize_types:
+            chunk = normalize_result_types(chunk)
+        self.output_columns = list(chunk.columns)
+        self.row_count += len(chunk)
+
+        if self.spill_writer is not None:
+            self._write_spill(chunk)
+            return
+
+        # Si el bloque nuevo no cabe en el límite, volcar todo a disco
+        chunk_memory = int(chunk.memory_usage(index=True, deep=True).sum())
+        if self.memory_used + chunk_memory + self.pending_memory() > self.memory_limit:
+            self._spill_chunks()
+            self._write_spill(chunk)
+            return
+
+        self.chunks.append(chunk)
+        self.memory_used += chunk_memory
+        self._track_peak()
+
+    def _write_spill(self, chunk):
+        """
+        Escribe un bloque en el archivo temporal; si el bloque tiene columnas
+        nuevas, cierra la parte actual y empieza otra con el esquema ampliado.
+
+        Args:
+            chunk (pd.DataFrame): Bloque con las columnas finales
+        """
+        import pyarrow.parquet as pq
+
+        if self.spill_writer is not None and list(chunk.columns) != self.spill_schema.names:
+            self.spill_writer.close()
+            self.spill_writer = None
+            self.spill_schema = None
+
+        table = dataframe_to_arrow(chunk, self.spill_schema)
+        if self.spill_writer is None:
+            self.spill_schema = table.schema
+            spill_file = tempfile.NamedTemporaryFile(
+                prefix="resultados_", suffix=".parquet", dir=self.spill_dir, delete=False)
+            spill_file.close()
+            self.spill_path = spill_file.name
+            self.spill_parts.append(self.spill_path)
+            self.spill_writer = pq.ParquetWriter(self.spill_path, self.spill_schema)
+
+        self.spill_writer.write_table(table)
+
+    def _spill_chunks(self):
+        """Vuelca a disco todos los bloques que están en memoria"""
+        while self.chunks:
+            self._write_spill(self._align_columns(self.chunks.pop(0), self.output_columns))
+        self.memory_used = 0
+
+    def _merge_spill_parts(self):
+        """
+        Une las partes del archivo temporal en un solo archivo con el esquema de
+        la última parte (que tiene todas las columnas, en el orden final); las
+        columnas que una parte no tiene se escriben vacías.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pq.read_schema(self.spill_parts[-1])
+        merged_file = tempfile.NamedTemporaryFile(
+            prefix="resultados_", suffix=".parquet", dir=self.spill_dir, delete=False)
+        merged_file.close()
+
+        with pq.ParquetWriter(merged_file.name, schema) as writer:
+            for part_path in self.spill_parts:
+                for batch in pq.ParquetFile(part_path).iter_batches():
+                    columns = [batch.column(field.name) if field.name in batch.schema.names
+                               else pa.nulls(batch.num_rows, field.type)
+                               for field in schema]
+                    table = pa.Table.from_arrays(columns, names=schema.names)
+                    writer.write_table(table.cast(schema))
+                os.remove(part_path)
+
+        self.spill_parts = [merged_file.name]
+        self.spill_path = merged_file.name
+
+    def finish(self):
+        """
+        Cierra el destino y devuelve el resultado.
+
+        Returns:
+            pd.DataFrame or None: El DataFrame combinado si cabe en memoria, o
+                None si el resultado quedó en el archivo indicado por spill_path
+        """
+        self._flush_rows()
+
+        # Concatenar duplica temporalmente la memoria: si no cabe, volcar a disco
+        if self.spill_writer is None and self.memory_used * 2 > self.memory_limit:
+            self._spill_chunks()
+
+        if self.spill_writer is not None:
+            self._spill_chunks()
+            self.spill_writer.close()
+            self.spill_writer = None
+            if len(self.spill_parts) > 1:
+                self._merge_spill_parts()
+            return None
+
+        if not self.chunks:
+            return pd.DataFrame()
+        result_df = pd.concat([self._align_columns(chunk, self.output_columns)
+                               for chunk in self.chunks], ignore_index=True)
+        self.chunks = []
+        self.memory_used = 0
+        if self.arrow_strings:
+            result_df = categorize_result_columns(result_df)
+        return result_df
+
+    def discard(self):
+        """Descarta los resultados acumulados y elimina los archivos temporales"""
+        self.rows = []
+        self.rows_memory = 0
+        self.chunks = []
+        self.memory_used = 0
+        if self.spill_writer is not None:
+            self.spill_writer.close()
+            self.spill_writer = None
+        for part_path in self.spill_parts:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+        self.spill_parts = []
+        self.spill_path = None
+
+
+class SinkStage(threading.Thread):
+    """
+    Ejecuta un ResultSink en su propio hilo alimentado por una cola limitada.
+    put() bloquea cuando la cola está llena, de modo que el extractor no avanza
+    más rápido de lo que el destino puede consumir. La memoria de las filas en
+    cola se suma a sink.queued_memory para que cuente dentro del límite.
+    """
+
+    def __init__(self, sink, queue_size=DEFAULT_QUEUE_SIZE):
+        """
+        Inicializa la etapa de destino.
+
+        Args:
+            sink (ResultSink): Destino que recibe los datos
+            queue_size (int): Capacidad de la cola de entrada
+        """
+        super().__init__(name="pdf-sink", daemon=True)
+        self.sink = sink
+        self.queue = queue.Queue(maxsize=max(1, queue_size))
+        self.memory_lock = threading.Lock()
+        self.result = None
+        self.error = None
+
+    def run(self):
+        """Consume la cola hasta recibir la marca de fin"""
+        while True:
+            item = self.queue.get()
+            if item is _END_OF_STREAM:
+                break
+            data, data_memory = item
+            with self.memory_lock:
+                self.sink.queued_memory -= data_memory
+            if self.error is not None:
+                continue
+            try:
+                self.sink.add(data)
+            except Exception as e:
+                self.error = e
+
+        if self.error is None:
+            try:
+                self.result = self.sink.finish()
+            except Exception as e:
+                self.error = e
+
+    def put(self, data):
+        """
+        Envía un diccionario extraído al destino.
+
+        Args:
+            data (dict): Datos extraídos por extract_data_from_pdf
+        """
+        data_memory = row_memory(data)
+        with self.memory_lock:
+            self.sink.queued_memory += data_memory
+        self.queue.put((data, data_memory))
+
+    def finish(self):
+        """
+        Espera a que el destino procese todos los datos.
+
+        Returns:
+            pd.DataFrame or None: Resultado de ResultSink.finish()
+        """
+        self.queue.put(_END_OF_STREAM)
+        self.join()
+        if self.error is not None:
+            raise self.error
+        return self.result
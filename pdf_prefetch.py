@@ -0,0 +1,122 @@
+# pdf_prefetch.py
+
+"""
+Lector anticipado de archivos PDF.
+Carga en memoria, mediante hilos en segundo plano, el contenido de los
+siguientes archivos de la lista mientras el archivo actual se analiza, de modo
+que la lectura de disco (por ejemplo, desde una carpeta compartida SMB) se
+solape con el análisis del texto. La lectura anticipada está limitada por un
+presupuesto de bytes para no consumir memoria sin límite.
+
+Módulos relacionados:
+- data_extraction.py: Abre los documentos desde memoria con los bytes leídos
+- pdf_processor.py: Utiliza este lector durante el procesamiento
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Número de hilos de lectura en segundo plano
+DEFAULT_READ_WORKERS = 4
+
+# Máximo de archivos leídos por adelantado
+DEFAULT_MAX_AHEAD = 8
+
+# Presupuesto de memoria para los archivos leídos por adelantado (256 MB)
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def _read_file(pdf_path):
+    """
+    Lee el contenido completo de un archivo.
+
+    Args:
+        pdf_path (str): Ruta al archivo PDF
+
+    Returns:
+        bytes: Contenido del archivo
+    """
+    with open(pdf_path, 'rb') as pdf_file:
+        return pdf_file.read()
+
+
+class PDFPrefetcher:
+    """
+    Itera sobre una lista de PDFs devolviendo (ruta, bytes) en el orden original.
+
+    Si la lectura anticipada de un archivo falla, se devuelve None en lugar de
+    los bytes para que el extractor intente abrirlo directamente desde la ruta
+    y reporte el error de la forma habitual.
+    """
+
+    def __init__(self, pdf_files, max_workers=DEFAULT_READ_WORKERS,
+                 max_ahead=DEFAULT_MAX_AHEAD, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Inicializa el lector anticipado.
+
+        Args:
+            pdf_files (iterable): Rutas a archivos PDF
+            max_workers (int): Número de hilos de lectura
+            max_ahead (int): Máximo de archivos leídos por adelantado
+            max_bytes (int): Máximo de bytes en memoria entre los archivos
+                leídos por adelantado. Siempre se permite al menos un archivo,
+                aunque supere el presupuesto por sí solo.
+        """
+        self.pdf_files = iter(pdf_files)
+        self.max_ahead = max(1, max_ahead)
+        self.max_bytes = max_bytes
+        self.executor = ThreadPoolExecutor(max_workers=max(1, max_workers),
+                                           thread_name_prefix="pdf-prefetch")
+        self.pending = deque()
+        self.pending_bytes = 0
+        self.next_file = None
+
+    def _fill(self):
+        """Encola lecturas mientras haya espacio en el presupuesto"""
+        while len(self.pending) < self.max_ahead:
+            if self.next_file is None:
+                pdf_path = next(self.pdf_files, None)
+                if pdf_path is None:
+                    return
+                try:
+                    size = os.path.getsize(pdf_path)
+                except OSError:
+                    size = 0
+                self.next_file = (pdf_path, size)
+
+            pdf_path, size = self.next_file
+            if self.pending and self.pending_bytes + size > self.max_bytes:
+                return
+
+            future = self.executor.submit(_read_file, pdf_path)
+            self.pending.append((pdf_path, size, future))
+            self.pending_bytes += size
+            self.next_file = None
+
+    def __iter__(self):
+        self._fill()
+        while self.pending:
+            pdf_path, size, future = self.pending.popleft()
+            try:
+                pdf_bytes = future.result()
+            except Exception:
+                pdf_bytes = None
+            self.pending_bytes -= size
+            self._fill()
+            yield pdf_path, pdf_bytes
+
+    def close(self):
+        """Cancela las lecturas pendientes y libera los hilos"""
+        for _, _, future in self.pending:
+            future.cancel()
+        self.pending.clear()
+        self.pending_bytes = 0
+        self.executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
@@ -1,116 +1,134 @@
 # pdf_processor.py
 """
-Clase para procesar PDFs en segundo plano usando QThread.
-Maneja la extracción de datos sin bloquear la interfaz de usuario.
+Clases para procesar PDFs en segundo plano usando QThread.
+Maneja la extracción de datos y el índice de búsqueda de los resultados sin
+bloquear la interfaz de usuario.
 
 Módulos relacionados:
 - data_extraction.py: Contiene las funciones de extracción de datos
 - pdf_extractor_app.py: Utiliza esta clase para procesar PDFs
+- pdf_prefetch.py: Lee por adelantado los archivos mientras se procesan
+- pdf_pipeline.py: Acumula los resultados con memoria acotada
+- progress_stats.py: Estadísticas de velocidad y tiempo restante
+- page_text_cache.py: Caché opcional del texto de las páginas
+- folder_scan.py: Recorrido recursivo de carpetas con manifiesto
+- result_index.py: Índice invertido para buscar en los resultados
 """
 
-import re
 import pandas as pd
 from PyQt6.QtCore import QThread, pyqtSignal
-from data_extraction import extract_data_from_pdf, merge_dataframes
-from constants import BASE_TITLES, REPEATING_TITLES, ALL_POSSIBLE_TITLES, TERMINAL_FORMATTED_TITLES
+from extraction_api import extract_reports, STATUS_OK, STATUS_ERROR, STATUS_SKIPPED
+from pdf_prefetch import PDFPrefetcher
+from pdf_pipeline import ResultSink, SinkStage, DEFAULT_MEMORY_LIMIT
+from page_text_cache import PageTextCache, DEFAULT_CACHE_DIR
+from folder_scan import FolderScan
+from progress_stats import ProgressTracker, Throttle
+from result_index import ResultIndex
+from constants import ALL_POSSIBLE_TITLES, TERMINAL_FORMATTED_TITLES
+
+# Intervalo mínimo entre señales de progreso (segundos)
+PROGRESS_SIGNAL_INTERVAL = 0.25
+
 
 class PDFExtractorThread(QThread):
     """Hilo para procesar PDFs sin bloquear la interfaz"""
     progress_updated = pyqtSignal(int)
     extraction_finished = pyqtSignal(pd.DataFrame)
+    extraction_spilled = pyqtSignal(str)
     error_occurred = pyqtSignal(str)
 
-    def __init__(self, pdf_files):
+    def __init__(self, pdf_files, memory_limit=DEFAULT_MEMORY_LIMIT, use_cache=False,
+                 cache_dir=DEFAULT_CACHE_DIR, check_form=False):
         """
         Inicializa el hilo de extracción.
 
         Args:
-            pdf_files (list): Lista de rutas a archivos PDF
+            pdf_files (list or FolderScan): Lista de rutas a archivos PDF, o el
+                recorrido de una carpeta (los archivos se procesan a medida que se
+                encuentran y su estado se registra en el manifiesto)
+            memory_limit (int): Máximo de bytes de resultados en memoria; al
+                superarlo los resultados se vuelcan a un archivo Parquet temporal
+            use_cache (bool): Si es True, toma y guarda el texto de las páginas
+                en el caché de page_text_cache.py
+            cache_dir (str): Carpeta del caché de texto
+            check_form (bool): Si es True, omite los PDFs que según su primera
+                página no son reportes F-COM; quedan listados en skipped_files
         """
         super().__init__()
         self.pdf_files = pdf_files
+        self.memory_limit = memory_limit
+        self.use_cache = use_cache
+        self.cache_dir = cache_dir
+        self.check_form = check_form
+        self.skipped_files = []
         self.running = True
+        # La interfaz consulta tracker.snapshot() periódicamente
+        self.tracker = ProgressTracker(self._initial_total())
 
-    def get_terminal_sort_key(self, column_name):
-        """
-        Crea una clave de ordenación segura para nombres de columna de terminal.
-
-        Args:
-            column_name (str): Nombre de la columna
-
-        Returns:
-            tuple: Clave de ordenación (número de terminal, parte del campo)
-        """
-        # Intentar extraer un número después de "Terminal"
-        match = re.search(r"Terminal\s*(\d+)", column_name)
-        terminal_num = int(match.group(1)) if match else 1
-
-        # Obtener la parte después del guión si existe
-        field_part = column_name.split(" - ")[1] if " - " in column_name else column_name
-
-        return (terminal_num, field_part)
+    def _initial_total(self):
+        """Archivos conocidos al inicio; al recorrer una carpeta se suman al descubrirse"""
+        return 0 if isinstance(self.pdf_files, FolderScan) else len(self.pdf_files)
 
     def run(self):
         """Procesa los PDFs y emite señales de progreso y finalización"""
+        sink = ResultSink(memory_limit=self.memory_limit)
+        sink_stage = SinkStage(sink)
+        sink_stage.start()
         try:
-            # Lista para almacenar los resultados de cada PDF
-            all_data = []
-
-            # Procesar cada archivo PDF
-            total_files = len(self.pdf_files)
-            for i, pdf_file in enumerate(self.pdf_files):
-                if not self.running:
-                    break
-
-                # Extraer datos del PDF
-                data = extract_data_from_pdf(pdf_file)
-                if data:
-                    # Convertir el diccionario a DataFrame (una sola fila)
-                    df = pd.DataFrame([data])
-                    all_data.append(df)
-
-                # Actualizar progreso
-                progress = int((i + 1) / total_files * 100)
-                self.progress_updated.emit(progress)
-
-            # Crear DataFrame con todos los resultados
-            if all_data and self.running:
-                # Combinar todos los DataFrames asegurando que tengan todas las columnas posibles
-                result_df = merge_dataframes(all_data)
-
-                # Definir el orden de las columnas
-                # 1. Primero las columnas importantes
-                important_cols = ['Nombre del Archivo', 'Fecha de Reporte', 'Correlativo',
-                                 'Número Afiliado Gestión', 'Nombre del Afiliado']
-
-                # 2. Luego los títulos base (una sola vez)
-                ordered_cols = [col for col in important_cols if col in result_df.columns]
-
-                # 3. Añadir el resto de títulos base en orden alfabético
-                other_base_cols = [col for col in BASE_TITLES
-                                  if col in result_df.columns and col not in ordered_cols]
-                other_base_cols.sort()
-                ordered_cols.extend(other_base_cols)
-
-                # 4. Añadir las columnas de terminal formateadas
-                terminal_cols = [col for col in result_df.columns
-                                if "Terminal" in col and " - " in col]
-
-                # Ordenar columnas de terminal usando la función segura de extracción de número
-                terminal_cols.sort(key=self.get_terminal_sort_key)
-                ordered_cols.extend(terminal_cols)
-
-                # 5. Finalmente, añadir cualquier columna restante
-                remaining_cols = [col for col in result_df.columns
-                                 if col not in ordered_cols]
-                remaining_cols.sort()
-                ordered_cols.extend(remaining_cols)
-
-                # Reordenar el DataFrame
-                result_df = result_df[ordered_cols]
-
+            # Procesar cada archivo PDF; el lector anticipado carga los siguientes
+            # archivos en segundo plano mientras se analiza el actual y el destino
+            # combina los resultados por bloques en su propio hilo
+            progress_throttle = Throttle(PROGRESS_SIGNAL_INTERVAL)
+            self.tracker = ProgressTracker(self._initial_total())
+            self.skipped_files = []
+            folder_scan = self.pdf_files if isinstance(self.pdf_files, FolderScan) else None
+            if folder_scan is not None:
+                folder_scan.on_discovered = lambda path: self.tracker.add_files(1)
+            cache = PageTextCache(self.cache_dir) if self.use_cache else None
+            with PDFPrefetcher(self.pdf_files) as prefetcher:
+                for i, (pdf_file, pdf_bytes) in enumerate(prefetcher):
+                    if not self.running:
+                        break
+
+                    # Extraer datos del PDF; un PDF con varios reportes seguidos
+                    # produce una fila por reporte
+                    self.tracker.file_started(pdf_file)
+                    pages = 0
+                    seconds = 0.0
+                    file_status = STATUS_ERROR
+                    for record in extract_reports(pdf_file, pdf_bytes, cache=cache,
+                                                  check_form=self.check_form):
+                        pages += record.pages
+                        seconds += record.elapsed_seconds
+                        if record.ok:
+                            file_status = STATUS_OK
+                            sink_stage.put(record.to_row())
+                        elif record.status == STATUS_SKIPPED:
+                            file_status = STATUS_SKIPPED
+                            self.skipped_files.append(pdf_file)
+                        else:
+                            print(f"Error al procesar el PDF {pdf_file}: {record.error}")
+                    self.tracker.file_finished(pdf_file, pages, seconds)
+                    if folder_scan is not None:
+                        folder_scan.mark(pdf_file, file_status)
+
+                    # Actualizar progreso como máximo cada PROGRESS_SIGNAL_INTERVAL segundos
+                    total_files = self.tracker.total_files
+                    if i + 1 == total_files and (folder_scan is None or folder_scan.finished):
+                        self.progress_updated.emit(100)
+                    elif progress_throttle.ready():
+                        self.progress_updated.emit(min(99, int((i + 1) / total_files * 100)))
+
+            result_df = sink_stage.finish()
+
+            if not self.running:
+                sink.discard()
+            elif sink.spill_path:
+                # El resultado superó el límite de memoria y quedó en disco
+                self.extraction_spilled.emit(sink.spill_path)
+            elif sink.row_count:
                 self.extraction_finished.emit(result_df)
-            elif self.running:
+            else:
                 # Si no hay datos, crear un DataFrame vacío con todas las columnas posibles
                 empty_df = pd.DataFrame(columns=['Nombre del Archivo'] + ALL_POSSIBLE_TITLES + TERMINAL_FORMATTED_TITLES)
                 self.error_occurred.emit("No se pudieron extraer datos de los PDFs seleccionados")
@@ -120,9 +138,38 @@ class PDFExtractorThread(QThread):
             import traceback
             error_msg = f"Error durante la extracción: {str(e)}\n{traceback.format_exc()}"
             print(error_msg)  # Imprimir detalles en la consola para diagnóstico
+            if sink_stage.is_alive():
+                sink_stage.finish()
+            sink.discard()
             if self.running:
                 self.error_occurred.emit(f"Error durante la extracción: {str(e)}")
 
+        finally:
+            # El manifiesto ya tiene registrado cada archivo procesado
+            if isinstance(self.pdf_files, FolderScan) and self.pdf_files.manifest is not None:
+                self.pdf_files.manifest.close()
+
     def stop(self):
         """Detiene el procesamiento"""
-        self.running = False
\ No newline at end of file
+        self.running = False
+
+
+class SearchIndexThread(QThread):
+    """Hilo que construye el índice de búsqueda de un resultado"""
+    index_ready = pyqtSignal(object)
+
+    def __init__(self, dataframe):
+        """
+        Inicializa el hilo del índice.
+
+        Args:
+            dataframe (pd.DataFrame): Resultados mostrados en la tabla (solo se leen)
+        """
+        super().__init__()
+        self.dataframe = dataframe
+
+    def run(self):
+        """Construye el índice y lo entrega con la señal index_ready"""
+        result_index = ResultIndex()
+        result_index.add_rows(self.dataframe)
+        self.index_ready.emit(result_index)
@@ -0,0 +1,160 @@
+# progress_stats.py
+
+"""
+Estadísticas de avance del procesamiento: archivos y páginas por segundo,
+tiempo restante estimado, archivo en curso y archivos más lentos.
+El hilo de extracción registra cada archivo y la interfaz consulta una copia
+de las estadísticas cada cierto tiempo, en lugar de recibir una señal por archivo.
+
+Módulos relacionados:
+- pdf_processor.py: Registra el inicio y fin de cada archivo
+- pdf_extractor_app.py: Muestra las estadísticas en la barra de estado y el panel de progreso
+"""
+
+import heapq
+import os
+import threading
+import time
+
+# Número de archivos más lentos que se conservan
+DEFAULT_SLOWEST_COUNT = 5
+
+
+def format_duration(seconds):
+    """
+    Da formato legible a una duración.
+
+    Args:
+        seconds (float): Duración en segundos
+
+    Returns:
+        str: Texto como "45 s", "3 min 20 s" o "1 h 05 min"
+    """
+    if seconds is None:
+        return "--"
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds} s"
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{minutes} min {seconds:02d} s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours} h {minutes:02d} min"
+
+
+class Throttle:
+    """Permite una acción como máximo una vez por intervalo de tiempo"""
+
+    def __init__(self, interval):
+        """
+        Args:
+            interval (float): Segundos mínimos entre acciones
+        """
+        self.interval = interval
+        self.last_time = None
+
+    def ready(self):
+        """
+        Indica si ya pasó el intervalo desde la última acción y, en ese caso,
+        registra la acción actual.
+
+        Returns:
+            bool: True si la acción puede realizarse ahora
+        """
+        now = time.monotonic()
+        if self.last_time is not None and now - self.last_time < self.interval:
+            return False
+        self.last_time = now
+        return True
+
+
+class ProgressTracker:
+    """Acumula estadísticas de avance de forma segura entre hilos"""
+
+    def __init__(self, total_files, slowest_count=DEFAULT_SLOWEST_COUNT):
+        """
+        Args:
+            total_files (int): Número de archivos del lote
+            slowest_count (int): Número de archivos más lentos a conservar
+        """
+        self.total_files = total_files
+        self.slowest_count = slowest_count
+        self.lock = threading.Lock()
+        self.start_time = time.monotonic()
+        self.processed_files = 0
+        self.processed_pages = 0
+        self.current_file = None
+        self.current_start = None
+        self.slowest = []
+
+    def add_files(self, count):
+        """
+        Suma archivos al total, cuando el lote se descubre durante el procesamiento.
+
+        Args:
+            count (int): Archivos nuevos
+        """
+        with self.lock:
+            self.total_files += count
+
+    def file_started(self, pdf_path):
+        """
+        Registra el inicio del procesamiento de un archivo.
+
+        Args:
+            pdf_path (str): Ruta al archivo PDF
+        """
+        with self.lock:
+            self.current_file = os.path.basename(pdf_path)
+            self.current_start = time.monotonic()
+
+    def file_finished(self, pdf_path, pages, seconds):
+        """
+        Registra el fin del procesamiento de un archivo.
+
+        Args:
+            pdf_path (str): Ruta al archivo PDF
+            pages (int): Páginas del documento
+            seconds (float): Tiempo dedicado al archivo
+        """
+        with self.lock:
+            self.processed_files += 1
+            self.processed_pages += pages
+            self.current_file = None
+            self.current_start = None
+            entry = (seconds, os.path.basename(pdf_path), pages)
+            if len(self.slowest) < self.slowest_count:
+                heapq.heappush(self.slowest, entry)
+            elif entry > self.slowest[0]:
+                heapq.heapreplace(self.slowest, entry)
+
+    def snapshot(self):
+        """
+        Obtiene una copia de las estadísticas actuales.
+
+        Returns:
+            dict: processed, total, percent, elapsed, files_per_second,
+                pages_per_second, eta_seconds, current_file,
+                current_file_seconds y slowest (lista de (nombre, segundos, páginas))
+        """
+        with self.lock:
+            now = time.monotonic()
+            elapsed = now - self.start_time
+            processed = self.processed_files
+            files_per_second = processed / elapsed if elapsed > 0 else 0.0
+            pages_per_second = self.processed_pages / elapsed if elapsed > 0 else 0.0
+            remaining = self.total_files - processed
+            eta_seconds = remaining / files_per_second if files_per_second > 0 else None
+            return {
+                "processed": processed,
+                "total": self.total_files,
+                "percent": int(processed / self.total_files * 100) if self.total_files else 100,
+                "elapsed": elapsed,
+                "files_per_second": files_per_second,
+                "pages_per_second": pages_per_second,
+                "eta_seconds": eta_seconds,
+                "current_file": self.current_file,
+                "current_file_seconds": now - self.current_start if self.current_start else 0.0,
+                "slowest": [(name, seconds, pages)
+                            for seconds, name, pages in sorted(self.slowest, reverse=True)],
+            }
@@ -0,0 +1,163 @@
+# result_index.py
+
+"""
+Índice invertido en memoria sobre el DataFrame de resultados.
+Relaciona cada palabra (token) con las filas donde aparece, tanto en general
+como por campo, para filtrar miles de reportes sin recorrer todas las celdas.
+Las columnas de terminal ('Terminal 3 - Número de Serie') se agrupan bajo su
+campo ('Número de Serie') para poder buscar en todas las terminales a la vez.
+
+Módulos relacionados:
+- pdf_extractor_app.py: Usa el índice para el cuadro de búsqueda de resultados
+"""
+
+import bisect
+import re
+import unicodedata
+
+# Separa los tokens en cualquier carácter que no sea letra o número
+TOKEN_PATTERN = re.compile(r"[^\w]+")
+
+# Columnas de terminal formateadas por process_terminal_data
+TERMINAL_COLUMN_PATTERN = re.compile(r"^Terminal(?: \d+)? - (.+)$")
+
+
+def normalize_text(text):
+    """
+    Convierte el texto a minúsculas y sin tildes para comparar tokens.
+
+    Args:
+        text (str): Texto original
+
+    Returns:
+        str: Texto normalizado
+    """
+    decomposed = unicodedata.normalize("NFKD", str(text).lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text):
+    """
+    Divide un texto en tokens normalizados.
+
+    Args:
+        text (str): Texto a dividir
+
+    Returns:
+        list: Tokens no vacíos
+    """
+    return [token for token in TOKEN_PATTERN.split(normalize_text(text)) if token]
+
+
+def get_field_name(column_name):
+    """
+    Obtiene el campo de búsqueda de una columna, agrupando las de terminal.
+
+    Args:
+        column_name (str): Nombre de la columna
+
+    Returns:
+        str: Nombre del campo
+    """
+    match = TERMINAL_COLUMN_PATTERN.match(column_name)
+    return match.group(1) if match else column_name
+
+
+class ResultIndex:
+    """Índice invertido token -> filas, global y por campo"""
+
+    def __init__(self):
+        """Inicializa un índice vacío"""
+        self.row_count = 0
+        self.postings = {}
+        self.field_postings = {}
+        self.fields = []
+        self._sorted_tokens = None
+        self._sorted_field_tokens = {}
+
+    def add_rows(self, dataframe):
+        """
+        Añade las filas de un DataFrame al índice. Los identificadores de fila
+        continúan la numeración de las filas añadidas anteriormente.
+
+        Args:
+            dataframe (pd.DataFrame): Filas nuevas de resultados
+        """
+        first_row = self.row_count
+        for column in dataframe.columns:
+            field = get_field_name(column)
+            if field not in self.field_postings:
+                self.field_postings[field] = {}
+                self.fields.append(field)
+            field_postings = self.field_postings[field]
+
+            values = dataframe[column]
+            present = values.notna().tolist()
+            for position, value in enumerate(values.tolist()):
+                if not present[position] or value == "":
+                    continue
+                row_id = first_row + position
+                for token in tokenize(value):
+                    self.postings.setdefault(token, set()).add(row_id)
+                    field_postings.setdefault(token, set()).add(row_id)
+
+        self.row_count += len(dataframe)
+        self._sorted_tokens = None
+        self._sorted_field_tokens = {}
+
+    def _match_prefix(self, postings, sorted_tokens, prefix):
+        """
+        Une las filas de todos los tokens que empiezan con un prefijo.
+
+        Args:
+            postings (dict): Token -> filas
+            sorted_tokens (list): Tokens de postings ordenados
+            prefix (str): Prefijo buscado
+
+        Returns:
+            set: Filas que contienen algún token con ese prefijo
+        """
+        rows = set()
+        position = bisect.bisect_left(sorted_tokens, prefix)
+        while position < len(sorted_tokens) and sorted_tokens[position].startswith(prefix):
+            rows |= postings[sorted_tokens[position]]
+            position += 1
+        return rows
+
+    def search(self, query, field=None):
+        """
+        Busca las filas que contienen todas las palabras de la consulta. La
+        última palabra se compara como prefijo para filtrar mientras se escribe.
+
+        Args:
+            query (str): Texto de búsqueda
+            field (str, optional): Campo donde buscar; None busca en todos
+
+        Returns:
+            set or None: Filas que coinciden, o None si la consulta está vacía
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return None
+
+        if field is None:
+            postings = self.postings
+            if self._sorted_tokens is None:
+                self._sorted_tokens = sorted(postings)
+            sorted_tokens = self._sorted_tokens
+        else:
+            postings = self.field_postings.get(field, {})
+            if field not in self._sorted_field_tokens:
+                self._sorted_field_tokens[field] = sorted(postings)
+            sorted_tokens = self._sorted_field_tokens[field]
+
+        # Palabras completas primero, de la menos frecuente a la más frecuente
+        exact_sets = sorted((postings.get(token, set()) for token in tokens[:-1]), key=len)
+        matches = None
+        for rows in exact_sets:
+            matches = set(rows) if matches is None else matches & rows
+            if not matches:
+                return set()
+
+        prefix_rows = self._match_prefix(postings, sorted_tokens, tokens[-1])
+        return prefix_rows if matches is None else matches & prefix_rows
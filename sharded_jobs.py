@@ -0,0 +1,482 @@
+# sharded_jobs.py
+
+"""
+Procesamiento distribuido en varias máquinas mediante una carpeta compartida.
+No requiere ningún servicio intermedio: el coordinador divide la lista de PDFs
+en fragmentos (archivos JSON) dentro de la carpeta de trabajo y cada trabajador
+reclama un fragmento renombrándolo de forma atómica. Los trabajadores escriben
+resultados parciales en Parquet y un paso final los combina con merge_dataframes.
+
+Estructura de la carpeta de trabajo:
+    pending/   Fragmentos pendientes (shard_00001.json, ...)
+    claimed/   Fragmentos reclamados (shard_00001.json__<trabajador>)
+    done/      Fragmentos terminados
+    results/   Resultados parciales (shard_00001.parquet)
+    failed/    PDFs que no se pudieron procesar en cada fragmento (shard_00001.json)
+
+Un trabajador escribe un latido (un contador que aumenta) en
+claimed/<reclamo>.heartbeat después de cada PDF. Los demás trabajadores no
+comparan fechas de otra máquina con su propio reloj: recuerdan el último latido
+que vieron de cada reclamo y, si no cambia durante stale_seconds medidos con su
+reloj monotónico, el reclamo se considera abandonado (por ejemplo, de un
+trabajador que se cayó) y vuelve a pending/. Así los relojes de las máquinas no
+necesitan estar sincronizados.
+
+Uso:
+    python sharded_jobs.py init CARPETA archivo1.pdf ... [--shard-size 50]
+    python sharded_jobs.py worker CARPETA
+    python sharded_jobs.py local CARPETA --processes 4
+    python sharded_jobs.py status CARPETA
+    python sharded_jobs.py merge CARPETA salida.xlsx
+
+Módulos relacionados:
+- extraction_api.py: Extrae los reportes de cada PDF y sus errores
+- data_processing.py: Combina los resultados parciales
+- data_export.py: Exporta el resultado final
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import time
+from constants import EXCEL_MAX_ROWS_PER_SHEET, EXCEL_DEFAULT_MAX_MB_PER_FILE
+
+# Archivos por fragmento
+DEFAULT_SHARD_SIZE = 50
+
+# Segundos sin actividad tras los que un reclamo se considera abandonado
+DEFAULT_STALE_SECONDS = 600
+
+# Segundos de espera entre intentos cuando solo quedan fragmentos reclamados
+DEFAULT_POLL_SECONDS = 5
+
+# Separador entre el nombre del fragmento y el trabajador en claimed/
+CLAIM_SEPARATOR = "__"
+
+# Extensión del archivo de latido de cada reclamo en claimed/
+HEARTBEAT_SUFFIX = ".heartbeat"
+
+JOB_SUBDIRS = ("pending", "claimed", "done", "results", "failed")
+
+
+def _job_path(job_dir, subdir, name=""):
+    """Devuelve la ruta de un archivo dentro de la carpeta de trabajo"""
+    return os.path.join(job_dir, subdir, name)
+
+
+def _write_json(path, data):
+    """Escribe un archivo JSON de forma atómica"""
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as json_file:
+        json.dump(data, json_file, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+
+def init_job(job_dir, pdf_files, shard_size=DEFAULT_SHARD_SIZE):
+    """
+    Crea la carpeta de trabajo y divide la lista de PDFs en fragmentos.
+
+    Args:
+        job_dir (str): Carpeta de trabajo compartida
+        pdf_files (list): Rutas a los PDFs, accesibles desde todas las máquinas
+        shard_size (int): Archivos por fragmento
+
+    Returns:
+        int: Número de fragmentos creados
+    """
+    for subdir in JOB_SUBDIRS:
+        os.makedirs(_job_path(job_dir, subdir), exist_ok=True)
+
+    shard_size = max(1, shard_size)
+    shard_count = 0
+    for start in range(0, len(pdf_files), shard_size):
+        shard_count += 1
+        shard_name = f"shard_{shard_count:05d}.json"
+        _write_json(_job_path(job_dir, "pending", shard_name),
+                    {"files": [os.path.abspath(pdf) for pdf in pdf_files[start:start + shard_size]]})
+    return shard_count
+
+
+def _list_shards(job_dir, subdir):
+    """Lista los archivos de fragmento de una subcarpeta, ignorando temporales y latidos"""
+    try:
+        return sorted(name for name in os.listdir(_job_path(job_dir, subdir))
+                      if not name.endswith((".tmp", HEARTBEAT_SUFFIX)))
+    except FileNotFoundError:
+        return []
+
+
+def write_heartbeat(claim_path, beat):
+    """
+    Escribe el latido de un reclamo de forma atómica.
+
+    Args:
+        claim_path (str): Ruta del reclamo en claimed/
+        beat (int): Contador de latidos; cada valor nuevo indica actividad
+    """
+    heartbeat_path = claim_path + HEARTBEAT_SUFFIX
+    temp_path = heartbeat_path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as heartbeat_file:
+        heartbeat_file.write(str(beat))
+    os.replace(temp_path, heartbeat_path)
+
+
+def read_heartbeat(claim_path):
+    """
+    Lee el latido de un reclamo.
+
+    Args:
+        claim_path (str): Ruta del reclamo en claimed/
+
+    Returns:
+        str or None: Último latido escrito, o None si todavía no hay
+    """
+    try:
+        with open(claim_path + HEARTBEAT_SUFFIX, encoding="utf-8") as heartbeat_file:
+            return heartbeat_file.read()
+    except FileNotFoundError:
+        return None
+
+
+def _remove_heartbeat(claim_path):
+    """Elimina el archivo de latido de un reclamo, si existe"""
+    try:
+        os.remove(claim_path + HEARTBEAT_SUFFIX)
+    except OSError:
+        pass
+
+
+def reclaim_stale(job_dir, observed, stale_seconds=DEFAULT_STALE_SECONDS):
+    """
+    Devuelve a pending/ los reclamos cuyo latido no cambió durante stale_seconds.
+    El tiempo se mide con el reloj monotónico de este proceso desde que vio el
+    latido por última vez, sin usar fechas escritas por otras máquinas.
+
+    Args:
+        job_dir (str): Carpeta de trabajo compartida
+        observed (dict): Estado entre llamadas: reclamo -> (último latido visto,
+            momento en que se vio); el trabajador conserva el mismo diccionario
+        stale_seconds (float): Segundos sin actividad para considerar abandonado
+
+    Returns:
+        list: Nombres de los fragmentos recuperados
+    """
+    reclaimed = []
+    now = time.monotonic()
+    claim_names = _list_shards(job_dir, "claimed")
+    for claim_name in list(observed):
+        if claim_name not in claim_names:
+            del observed[claim_name]
+
+    for claim_name in claim_names:
+        claim_path = _job_path(job_dir, "claimed", claim_name)
+        heartbeat = read_heartbeat(claim_path)
+        last_heartbeat, seen_at = observed.get(claim_name, (None, None))
+        if seen_at is None or heartbeat != last_heartbeat:
+            observed[claim_name] = (heartbeat, now)
+            continue
+        if now - seen_at < stale_seconds:
+            continue
+
+        shard_name = claim_name.split(CLAIM_SEPARATOR, 1)[0]
+        try:
+            # Si otro proceso lo recupera o lo termina antes, el renombrado falla
+            os.rename(claim_path, _job_path(job_dir, "pending", shard_name))
+        except OSError:
+            continue
+        _remove_heartbeat(claim_path)
+        del observed[claim_name]
+        reclaimed.append(shard_name)
+    return reclaimed
+
+
+def claim_shard(job_dir, worker_id):
+    """
+    Reclama el siguiente fragmento pendiente renombrándolo a claimed/.
+
+    Args:
+        job_dir (str): Carpeta de trabajo compartida
+        worker_id (str): Identificador del trabajador
+
+    Returns:
+        tuple or None: (nombre del fragmento, ruta del reclamo) o None si no hay pendientes
+    """
+    for shard_name in _list_shards(job_dir, "pending"):
+        claim_path = _job_path(job_dir, "claimed", f"{shard_name}{CLAIM_SEPARATOR}{worker_id}")
+        try:
+            os.rename(_job_path(job_dir, "pending", shard_name), claim_path)
+        except OSError:
+            # Otro trabajador lo reclamó primero
+            continue
+        write_heartbeat(claim_path, 0)
+        return shard_name, claim_path
+    return None
+
+
+def _empty_result():
+    """
+    Resultado sin filas con todas las columnas de merge_dataframes, para que un
+    fragmento sin reportes tenga el mismo esquema que los demás.
+    """
+    import pandas as pd
+    from constants import FILE_PATH_COLUMN, REPORT_INDEX_COLUMN
+    from data_processing import merge_dataframes
+
+    return merge_dataframes([pd.DataFrame({FILE_PATH_COLUMN: pd.Series(dtype="string"),
+                                           REPORT_INDEX_COLUMN: pd.Series(dtype="int64")})])
+
+
+def process_shard(job_dir, shard_name, claim_path):
+    """
+    Extrae los PDFs de un fragmento reclamado y escribe su resultado parcial.
+    Los PDFs que no se pudieron procesar se guardan con su error en failed/
+    para que merge_results los informe.
+
+    Args:
+        job_dir (str): Carpeta de trabajo compartida
+        shard_name (str): Nombre del fragmento
+        claim_path (str): Ruta del reclamo en claimed/
+
+    Returns:
+        tuple: (reportes extraídos correctamente, PDFs con error)
+    """
+    import pandas as pd
+    import pyarrow.parquet as pq
+    from data_processing import merge_dataframes, dataframe_to_arrow
+    from extraction_api import extract_reports
+    from pdf_prefetch import PDFPrefetcher
+
+    try:
+        with open(claim_path, encoding="utf-8") as shard_file:
+            pdf_files = json.load(shard_file)["files"]
+    except FileNotFoundError:
+        # El reclamo fue recuperado por otro trabajador antes de empezar
+        return 0, 0
+
+    rows = []
+    failed = []
+    with PDFPrefetcher(pdf_files) as prefetcher:
+        for beat, (pdf_file, pdf_bytes) in enumerate(prefetcher, start=1):
+            # Un PDF con varios reportes seguidos produce una fila por reporte
+            for record in extract_reports(pdf_file, pdf_bytes):
+                if record.ok:
+                    rows.append(record.to_row())
+                else:
+                    failed.append({"path": record.path, "error": record.error or "No se pudo procesar el PDF"})
+            # Señal de actividad para que el reclamo no se considere abandonado;
+            # si ya fue recuperado, el latido no tiene reclamo y no se escribe
+            if os.path.exists(claim_path):
+                try:
+                    write_heartbeat(claim_path, beat)
+                except OSError:
+                    pass
+
+    # Escribir el resultado parcial de forma atómica; si el fragmento se
+    # procesa dos veces, el segundo resultado reemplaza al primero. Los tipos
+    # de merge_dataframes se conservan (la posición del reporte sigue siendo
+    # un entero)
+    result_name = os.path.splitext(shard_name)[0] + ".parquet"
+    temp_path = _job_path(job_dir, "results", result_name + ".tmp")
+    result_df = merge_dataframes([pd.DataFrame(rows)]) if rows else _empty_result()
+    pq.write_table(dataframe_to_arrow(result_df), temp_path)
+    os.replace(temp_path, _job_path(job_dir, "results", result_name))
+
+    failed_path = _job_path(job_dir, "failed", shard_name)
+    if failed:
+        # Carpetas de trabajo creadas antes de que existiera failed/
+        os.makedirs(_job_path(job_dir, "failed"), exist_ok=True)
+        _write_json(failed_path, {"files": failed})
+    elif os.path.exists(failed_path):
+        # Errores de un procesamiento anterior del mismo fragmento
+        os.remove(failed_path)
+
+    try:
+        os.rename(claim_path, _job_path(job_dir, "done", shard_name))
+    except OSError:
+        # El reclamo fue recuperado por otro trabajador; el resultado ya está escrito
+        pass
+    _remove_heartbeat(claim_path)
+    return len(rows), len(failed)
+
+
+def run_worker(job_dir, worker_id=None, stale_seconds=DEFAULT_STALE_SECONDS,
+               poll_seconds=DEFAULT_POLL_SECONDS):
+    """
+    Procesa fragmentos hasta que no quede ninguno pendiente ni reclamado.
+
+    Args:
+        job_dir (str): Carpeta de trabajo compartida
+        worker_id (str, optional): Identificador; por defecto equipo-pid
+        stale_seconds (float): Segundos sin actividad para recuperar un reclamo
+        poll_seconds (float): Espera entre intentos mientras otros terminan
+
+    Returns:
+        int: Número de fragmentos procesados por este trabajador
+    """
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    processed = 0
+    observed = {}
+    while True:
+        reclaim_stale(job_dir, observed, stale_seconds)
+        claim = claim_shard(job_dir, worker_id)
+        if claim is not None:
+            shard_name, claim_path = claim
+            extracted, errors = process_shard(job_dir, shard_name, claim_path)
+            processed += 1
+            print(f"[{worker_id}] {shard_name}: {extracted} reportes extraídos, {errors} PDFs con error")
+            continue
+
+        # Sin pendientes: esperar mientras otros trabajadores tengan reclamos,
+        # por si alguno se abandona y debe recuperarse
+        if not _list_shards(job_dir, "claimed"):
+            return processed
+        time.sleep(poll_seconds)
+
+
+def run_local(job_dir, processes, stale_seconds=DEFAULT_STALE_SECONDS,
+              poll_seconds=DEFAULT_POLL_SECONDS):
+    """
+    Lanza varios trabajadores como procesos locales, útil para probar el modo
+    distribuido en una sola máquina.
+
+    Args:
+        job_dir (str): Carpeta de trabajo compartida
+        processes (int): Número de procesos trabajadores
+        stale_seconds (float): Segundos sin actividad para recuperar un reclamo
+        poll_seconds (float): Espera entre intentos mientras otros terminan
+
+    Returns:
+        list: Códigos de salida de los procesos
+    """
+    import multiprocessing
+
+    workers = [
+        multiprocessing.Process(target=run_worker, args=(job_dir, None, stale_seconds, poll_seconds))
+        for _ in range(max(1, processes))
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return [worker.exitcode for worker in workers]
+
+
+def job_status(job_dir):
+    """
+    Cuenta los fragmentos en cada estado.
+
+    Args:
+        job_dir (str): Carpeta de trabajo compartida
+
+    Returns:
+        dict: Cantidad de fragmentos por subcarpeta
+    """
+    return {subdir: len(_list_shards(job_dir, subdir)) for subdir in JOB_SUBDIRS}
+
+
+def read_failed(job_dir):
+    """
+    Lee los PDFs que no se pudieron procesar en todos los fragmentos.
+
+    Args:
+        job_dir (str): Carpeta de trabajo compartida
+
+    Returns:
+        list: Diccionarios con path y error, en el orden de los fragmentos
+    """
+    failed = []
+    for name in _list_shards(job_dir, "failed"):
+        with open(_job_path(job_dir, "failed", name), encoding="utf-8") as failed_file:
+            failed.extend(json.load(failed_file)["files"])
+    return failed
+
+
+def merge_results(job_dir, output_path=None, max_rows_per_sheet=EXCEL_MAX_ROWS_PER_SHEET,
+                  max_mb_per_file=EXCEL_DEFAULT_MAX_MB_PER_FILE):
+    """
+    Combina los resultados parciales en un único DataFrame e informa los PDFs
+    que no se pudieron procesar (ver read_failed). Si ningún fragmento tiene
+    filas, el resultado conserva igualmente todas las columnas.
+
+    Args:
+        job_dir (str): Carpeta de trabajo compartida
+        output_path (str, optional): Si se indica, exporta el resultado
+            (.xlsx, .csv, .parquet o .sqlite)
+        max_rows_per_sheet (int): Filas de datos por hoja (solo Excel)
+        max_mb_per_file (int): Tamaño estimado máximo por archivo en MB (solo Excel)
+
+    Returns:
+        pd.DataFrame: Resultado combinado con las columnas ordenadas y los tipos normalizados
+    """
+    import pandas as pd
+    from data_processing import (merge_dataframes, order_result_columns, normalize_result_types,
+                                 categorize_result_columns)
+
+    # merge_dataframes pasa el texto leído de Parquet a columnas de Arrow sin
+    # convertirlo antes a objetos de Python
+    partial_dfs = [
+        pd.read_parquet(_job_path(job_dir, "results", name))
+        for name in _list_shards(job_dir, "results")
+    ]
+    result_df = merge_dataframes([df for df in partial_dfs if len(df)] or [_empty_result()])
+    result_df = normalize_result_types(result_df[order_result_columns(result_df.columns)])
+    result_df = categorize_result_columns(result_df)
+
+    failed = read_failed(job_dir)
+    if failed:
+        print(f"{len(failed)} PDFs no se pudieron procesar:")
+        for entry in failed:
+            print(f"  {entry['path']}: {entry['error']}")
+
+    if output_path:
+        from data_export import export_dataframe
+        export_dataframe(result_df, output_path, max_rows_per_sheet, max_mb_per_file * 1024 * 1024)
+    return result_df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Procesamiento distribuido mediante una carpeta compartida")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    init_parser = subparsers.add_parser("init", help="Crear los fragmentos de trabajo")
+    init_parser.add_argument("job_dir")
+    init_parser.add_argument("pdf_files", nargs="+")
+    init_parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE)
+
+    for command in ("worker", "local"):
+        command_parser = subparsers.add_parser(
+            command, help="Procesar fragmentos" if command == "worker" else "Lanzar trabajadores locales")
+        command_parser.add_argument("job_dir")
+        command_parser.add_argument("--stale-seconds", type=float, default=DEFAULT_STALE_SECONDS)
+        command_parser.add_argument("--poll-seconds", type=float, default=DEFAULT_POLL_SECONDS)
+        if command == "local":
+            command_parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+
+    status_parser = subparsers.add_parser("status", help="Mostrar el estado de los fragmentos")
+    status_parser.add_argument("job_dir")
+
+    merge_parser = subparsers.add_parser("merge", help="Combinar y exportar los resultados")
+    merge_parser.add_argument("job_dir")
+    merge_parser.add_argument("output_path")
+    merge_parser.add_argument("--max-rows-per-sheet", type=int, default=EXCEL_MAX_ROWS_PER_SHEET,
+                              help="Filas de datos por hoja en las exportaciones a Excel")
+    merge_parser.add_argument("--max-mb-per-file", type=int, default=EXCEL_DEFAULT_MAX_MB_PER_FILE,
+                              help="Tamaño estimado máximo (MB) de cada archivo Excel")
+
+    args = parser.parse_args()
+    if args.command == "init":
+        count = init_job(args.job_dir, args.pdf_files, args.shard_size)
+        print(f"Se crearon {count} fragmentos en {args.job_dir}")
+    elif args.command == "worker":
+        run_worker(args.job_dir, stale_seconds=args.stale_seconds, poll_seconds=args.poll_seconds)
+    elif args.command == "local":
+        exit_codes = run_local(args.job_dir, args.processes, args.stale_seconds, args.poll_seconds)
+        sys.exit(0 if all(code == 0 for code in exit_codes) else 1)
+    elif args.command == "status":
+        print(json.dumps(job_status(args.job_dir), indent=2))
+    elif args.command == "merge":
+        result = merge_results(args.job_dir, args.output_path, args.max_rows_per_sheet,
+                               args.max_mb_per_file)
+        print(f"Se exportaron {len(result)} filas a {args.output_path}")
@@ -0,0 +1,414 @@
+# sqlite_export.py
+
+"""
+Exportación de los resultados a una base de datos SQLite consultable.
+La tabla de reportes se crea a partir de la lista canónica de columnas
+(las de merge_dataframes más las derivadas de normalize_result_types) y las
+filas se escriben por lotes con executemany, un lote por transacción.
+Cada reporte se identifica por su clave (ruta del archivo, posición del reporte
+en el archivo y correlativo): volver a exportar los mismos reportes actualiza sus
+filas en lugar de duplicarlas. Las filas sin ruta (exportaciones anteriores) usan
+el nombre del archivo y el correlativo; si tampoco tienen correlativo, varios
+reportes de un mismo archivo tendrían la misma clave y se rechazan.
+
+Índices:
+- Correlativo, Número Afiliado Gestión Afiliado principal y Fecha de Reporte
+  sobre la tabla de reportes
+- Los números de serie de las terminales se copian a la tabla series_terminal
+  (una fila por terminal) con un índice por número de serie, de modo que una
+  sola consulta encuentra la serie en cualquiera de las 20 posiciones
+
+Uso:
+    python sqlite_export.py datos.parquet reportes.sqlite
+    python sqlite_export.py datos.xlsx datos_parte2.xlsx reportes.sqlite
+
+Módulos relacionados:
+- data_export.py: Usa este módulo para las rutas .sqlite y .db
+- data_processing.py: Define el orden de columnas y la normalización de tipos
+"""
+
+import argparse
+import sqlite3
+import pandas as pd
+from constants import (
+    BASE_TITLES,
+    MAX_REPETITIONS,
+    TERMINAL_FORMATTED_TITLES,
+    DATE_COLUMNS,
+    TIME_COLUMNS,
+    INTEGER_COLUMNS,
+    PAPELERIA_TOTAL_COLUMN,
+    VISIT_DURATION_COLUMN,
+    UNPARSED_SUFFIX,
+    TIME_OFFSET_SUFFIX,
+    FILE_PATH_COLUMN,
+    REPORT_INDEX_COLUMN
+)
+
+# Tabla principal, una fila por reporte
+TABLE_NAME = "reportes"
+
+# Tabla con un número de serie por terminal de cada reporte
+SERIALS_TABLE_NAME = "series_terminal"
+
+# Columna con la clave del reporte ("ruta | posición | correlativo", o
+# "archivo.pdf | correlativo" en filas sin ruta; ver data_processing.report_keys)
+KEY_COLUMN = "Clave del reporte"
+
+# Columnas de la tabla de reportes con índice propio
+INDEXED_COLUMNS = ['Correlativo', 'Número Afiliado Gestión Afiliado principal', 'Fecha de Reporte']
+
+# Campo de terminal que se copia a la tabla de series
+SERIAL_FIELD = "Número de Serie"
+
+# Filas por llamada a executemany (y por transacción)
+DEFAULT_BATCH_SIZE = 5000
+
+# Extensiones que se exportan a SQLite
+SQLITE_EXTENSIONS = ('.sqlite', '.db')
+
+
+def canonical_columns():
+    """
+    Lista canónica de columnas de la tabla de reportes, en el orden de
+    presentación: las de merge_dataframes seguidas de las columnas derivadas y
+    de las de valores sin normalizar que añade normalize_result_types.
+
+    Returns:
+        list: Nombres de columna
+    """
+    from data_processing import order_result_columns
+    columns = order_result_columns(['Nombre del Archivo', FILE_PATH_COLUMN, REPORT_INDEX_COLUMN]
+                                   + BASE_TITLES + TERMINAL_FORMATTED_TITLES)
+    columns += [VISIT_DURATION_COLUMN, PAPELERIA_TOTAL_COLUMN]
+    columns += [column + TIME_OFFSET_SUFFIX for column in TIME_COLUMNS]
+    columns += [column + UNPARSED_SUFFIX for column in DATE_COLUMNS + TIME_COLUMNS + INTEGER_COLUMNS]
+    return columns
+
+
+def _quote(name):
+    """Nombre de columna o tabla entre comillas dobles para SQL"""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _column_type(column, series=None):
+    """
+    Tipo SQLite de una columna. Las fechas y horas se guardan como texto ISO
+    ("2024-03-05", "09:15:00") para poder compararlas y usar date()/time().
+
+    Args:
+        column (str): Nombre de la columna
+        series (pd.Series, optional): Datos de una columna fuera de la lista canónica
+
+    Returns:
+        str: "INTEGER", "REAL" o "TEXT"
+    """
+    if column in INTEGER_COLUMNS or column in (VISIT_DURATION_COLUMN, PAPELERIA_TOTAL_COLUMN,
+                                               REPORT_INDEX_COLUMN):
+        return "INTEGER"
+    if column.endswith(TIME_OFFSET_SUFFIX):
+        return "INTEGER"
+    if series is not None:
+        if pd.api.types.is_bool_dtype(series) or pd.api.types.is_integer_dtype(series):
+            return "INTEGER"
+        if pd.api.types.is_float_dtype(series):
+            return "REAL"
+    return "TEXT"
+
+
+def connect(db_path):
+    """
+    Abre la base de datos con opciones adecuadas para cargas por lotes.
+
+    Args:
+        db_path (str): Ruta del archivo .sqlite
+
+    Returns:
+        sqlite3.Connection: Conexión abierta
+    """
+    connection = sqlite3.connect(db_path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+def _table_columns(connection, table_name):
+    """Columnas actuales de una tabla, en orden (vacío si no existe)"""
+    return [row[1] for row in connection.execute(f"PRAGMA table_info({_quote(table_name)})")]
+
+
+def ensure_schema(connection, columns=()):
+    """
+    Crea las tablas e índices si no existen y añade a la tabla de reportes las
+    columnas de los datos que todavía no tenga.
+
+    Args:
+        connection (sqlite3.Connection): Conexión abierta
+        columns (iterable or pd.DataFrame): Columnas de los datos a escribir; con un
+            DataFrame el tipo de las columnas nuevas se toma de sus datos
+
+    Returns:
+        list: Columnas de la tabla de reportes
+    """
+    dataframe = columns if isinstance(columns, pd.DataFrame) else None
+    table_columns = _table_columns(connection, TABLE_NAME)
+
+    with connection:
+        if not table_columns:
+            definitions = [f"{_quote(KEY_COLUMN)} TEXT PRIMARY KEY"]
+            definitions += [f"{_quote(column)} {_column_type(column)}" for column in canonical_columns()]
+            connection.execute(f"CREATE TABLE {_quote(TABLE_NAME)} ({', '.join(definitions)})")
+            table_columns = _table_columns(connection, TABLE_NAME)
+
+        for column in columns:
+            if column not in table_columns:
+                series = dataframe[column] if dataframe is not None else None
+                connection.execute(f"ALTER TABLE {_quote(TABLE_NAME)} "
+                                   f"ADD COLUMN {_quote(column)} {_column_type(column, series)}")
+                table_columns.append(column)
+
+        for column in INDEXED_COLUMNS:
+            connection.execute(f"CREATE INDEX IF NOT EXISTS {_quote('idx_' + column)} "
+                               f"ON {_quote(TABLE_NAME)} ({_quote(column)})")
+
+        connection.execute(f"CREATE TABLE IF NOT EXISTS {_quote(SERIALS_TABLE_NAME)} ("
+                           f"{_quote(KEY_COLUMN)} TEXT NOT NULL, "
+                           f'"Terminal" INTEGER NOT NULL, '
+                           f"{_quote(SERIAL_FIELD)} TEXT NOT NULL, "
+                           f'PRIMARY KEY ({_quote(KEY_COLUMN)}, "Terminal"))')
+        connection.execute(f"CREATE INDEX IF NOT EXISTS {_quote('idx_' + SERIAL_FIELD)} "
+                           f"ON {_quote(SERIALS_TABLE_NAME)} ({_quote(SERIAL_FIELD)})")
+
+    return table_columns
+
+
+def _unidentified_rows(dataframe):
+    """
+    Filas sin ruta ni correlativo: su clave ("archivo.pdf | ") no distingue los
+    reportes de un mismo archivo y se sobrescribirían entre sí.
+
+    Args:
+        dataframe (pd.DataFrame): Datos a exportar
+
+    Returns:
+        pd.Series: True en las filas que no pueden identificarse
+    """
+    missing = pd.Series(True, index=dataframe.index)
+    for column in (FILE_PATH_COLUMN, 'Correlativo'):
+        if column in dataframe.columns:
+            text = dataframe[column].astype("string").str.strip().fillna("")
+            missing &= (text == "").to_numpy()
+    return missing
+
+
+def _sql_values(series):
+    """
+    Convierte una columna a valores que sqlite3 acepta: texto ISO para fechas
+    y horas, enteros de Python y None para los nulos.
+
+    Args:
+        series (pd.Series): Columna del DataFrame exportado
+
+    Returns:
+        list: Valores de la columna
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        series = series.dt.strftime("%Y-%m-%d %H:%M:%S").str.removesuffix(" 00:00:00")
+    elif pd.api.types.is_timedelta64_dtype(series):
+        series = (pd.Timestamp(0) + series).dt.strftime("%H:%M:%S")
+    elif pd.api.types.is_bool_dtype(series):
+        series = series.astype("Int64")
+    values = []
+    for value, is_present in zip(series.tolist(), series.notna().tolist()):
+        if not is_present:
+            values.append(None)
+        else:
+            # Los escalares de NumPy en columnas de objetos pasan a tipos de Python
+            values.append(value.item() if hasattr(value, "item") else value)
+    return values
+
+
+def _serial_rows(dataframe, keys):
+    """
+    Filas de la tabla series_terminal: (clave, número de terminal, serie).
+
+    Args:
+        dataframe (pd.DataFrame): Datos a exportar
+        keys (pd.Series): Claves de los reportes
+
+    Returns:
+        list: Tuplas con las series no vacías
+    """
+    rows = []
+    for i in range(1, MAX_REPETITIONS + 1):
+        prefix = "" if i == 1 else f" {i}"
+        column = f"Terminal{prefix} - {SERIAL_FIELD}"
+        if column not in dataframe.columns:
+            continue
+        serials = dataframe[column].astype("string").str.strip()
+        for key, serial in zip(keys.tolist(), serials.tolist()):
+            if not pd.isna(serial) and serial != "":
+                rows.append((key, i, serial))
+    return rows
+
+
+def upsert_dataframe(connection, dataframe, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Inserta o actualiza las filas de un DataFrame en la tabla de reportes y
+    reemplaza sus números de serie. Cada lote se escribe en una transacción.
+
+    Args:
+        connection (sqlite3.Connection): Conexión abierta
+        dataframe (pd.DataFrame): Datos a exportar
+        batch_size (int): Filas por lote
+
+    Returns:
+        int: Número de filas escritas
+    """
+    from data_processing import report_keys
+
+    unidentified = _unidentified_rows(dataframe)
+    if unidentified.any():
+        print(f"Se omiten {int(unidentified.sum())} filas sin ruta ni correlativo: "
+              "no pueden distinguirse de otros reportes del mismo archivo")
+        dataframe = dataframe[~unidentified.to_numpy()]
+    if dataframe.empty:
+        return 0
+
+    ensure_schema(connection, dataframe)
+    keys = report_keys(dataframe)
+    # Los reportes guardados antes de existir la columna de ruta tienen la clave
+    # "archivo.pdf | correlativo"; al volver a exportarlos con ruta se reemplazan
+    if FILE_PATH_COLUMN in dataframe.columns:
+        has_path = (dataframe[FILE_PATH_COLUMN].astype("string").fillna("") != "").to_numpy()
+        legacy_keys = report_keys(dataframe, by_path=False).where(has_path)
+    else:
+        legacy_keys = pd.Series(None, index=dataframe.index, dtype=object)
+    columns = [KEY_COLUMN] + [column for column in dataframe.columns if column != KEY_COLUMN]
+    values = [keys.tolist()] + [_sql_values(dataframe[column]) for column in columns[1:]]
+
+    quoted = [_quote(column) for column in columns]
+    updates = ", ".join(f"{column}=excluded.{column}" for column in quoted[1:])
+    upsert_sql = (f"INSERT INTO {_quote(TABLE_NAME)} ({', '.join(quoted)}) "
+                  f"VALUES ({', '.join('?' * len(columns))}) "
+                  f"ON CONFLICT({quoted[0]}) DO UPDATE SET {updates}")
+    delete_serials_sql = f"DELETE FROM {_quote(SERIALS_TABLE_NAME)} WHERE {quoted[0]} = ?"
+    delete_legacy_sql = (f"DELETE FROM {_quote(TABLE_NAME)} "
+                         f"WHERE {quoted[0]} = ? AND {_quote(FILE_PATH_COLUMN)} IS NULL")
+    insert_serials_sql = f"INSERT OR REPLACE INTO {_quote(SERIALS_TABLE_NAME)} VALUES (?, ?, ?)"
+
+    rows = list(zip(*values))
+    batch_size = max(1, batch_size)
+    for start in range(0, len(rows), batch_size):
+        batch_keys = keys.iloc[start:start + batch_size]
+        batch_legacy_keys = [(key,) for key in legacy_keys.iloc[start:start + batch_size].dropna().tolist()]
+        serial_rows = _serial_rows(dataframe.iloc[start:start + batch_size], batch_keys)
+        with connection:
+            if batch_legacy_keys:
+                connection.executemany(delete_legacy_sql, batch_legacy_keys)
+                connection.executemany(delete_serials_sql, batch_legacy_keys)
+            connection.executemany(upsert_sql, rows[start:start + batch_size])
+            connection.executemany(delete_serials_sql, ((key,) for key in batch_keys.tolist()))
+            connection.executemany(insert_serials_sql, serial_rows)
+    return len(rows)
+
+
+def export_sqlite_chunks(chunks, db_path, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Exporta bloques de filas a una base SQLite, nueva o existente.
+
+    Args:
+        chunks (iterable): Bloques (pd.DataFrame) a exportar en orden
+        db_path (str): Ruta del archivo .sqlite
+        batch_size (int): Filas por lote
+
+    Returns:
+        int: Número de filas escritas (nuevas o actualizadas)
+    """
+    connection = connect(db_path)
+    try:
+        ensure_schema(connection)
+        return sum(upsert_dataframe(connection, chunk, batch_size) for chunk in chunks)
+    finally:
+        connection.close()
+
+
+def export_sqlite(dataframe, db_path):
+    """
+    Exporta los datos a una base SQLite; los reportes ya presentes se actualizan.
+
+    Args:
+        dataframe (pd.DataFrame): Datos a exportar
+        db_path (str): Ruta del archivo .sqlite
+    """
+    export_sqlite_chunks([dataframe], db_path)
+
+
+def read_sqlite_keys(db_path, columns):
+    """
+    Lee las columnas clave de los reportes ya guardados en la base (ver
+    data_export.read_existing_keys).
+
+    Args:
+        db_path (str): Ruta del archivo .sqlite
+        columns (list): Columnas clave que se leen
+
+    Returns:
+        pd.DataFrame: Columnas clave presentes en la tabla
+    """
+    connection = sqlite3.connect(db_path)
+    try:
+        table_columns = _table_columns(connection, TABLE_NAME)
+        columns = [column for column in columns if column in table_columns]
+        if not columns:
+            return pd.DataFrame()
+        query = f"SELECT {', '.join(_quote(column) for column in columns)} FROM {_quote(TABLE_NAME)}"
+        return pd.DataFrame(connection.execute(query).fetchall(), columns=columns)
+    finally:
+        connection.close()
+
+
+def iter_export_chunks(file_path, batch_size=10000):
+    """
+    Lee una exportación existente (.xlsx, .csv o .parquet) por bloques para
+    cargarla en la base de datos.
+
+    Args:
+        file_path (str): Ruta de la exportación
+        batch_size (int): Filas por bloque (CSV y Parquet)
+
+    Yields:
+        pd.DataFrame: Bloque de filas
+    """
+    from data_export import get_export_format, iter_parquet_chunks, _data_sheets
+    extension = get_export_format(file_path)
+    if extension == '.parquet':
+        yield from iter_parquet_chunks(file_path, batch_size=batch_size)
+    elif extension == '.csv':
+        yield from pd.read_csv(file_path, dtype=str, encoding='utf-8-sig', chunksize=batch_size)
+    elif extension == '.xlsx':
+        import openpyxl
+        workbook = openpyxl.load_workbook(file_path, read_only=True)
+        try:
+            sheet_names = [worksheet.title for worksheet in _data_sheets(workbook)]
+        finally:
+            workbook.close()
+        for sheet_name in sheet_names:
+            yield pd.read_excel(file_path, sheet_name=sheet_name, dtype=str)
+    else:
+        raise ValueError(f"No se puede cargar una base de datos en otra: {file_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cargar exportaciones existentes en una base SQLite")
+    parser.add_argument("export_paths", nargs="+", help="Exportaciones .xlsx, .csv o .parquet")
+    parser.add_argument("db_path", help="Base de datos de destino (.sqlite o .db)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    total_rows = 0
+    for export_path in args.export_paths:
+        rows = export_sqlite_chunks(iter_export_chunks(export_path), args.db_path, args.batch_size)
+        print(f"{export_path}: {rows} filas")
+        total_rows += rows
+    print(f"Se escribieron {total_rows} filas en {args.db_path}")
@@ -0,0 +1,100 @@
+# startup_check.py
+
+"""
+Verificación del tiempo de arranque de la aplicación.
+Importa el módulo de la interfaz en un proceso nuevo con `python -X importtime`,
+informa los módulos más costosos y falla si el tiempo total supera el
+presupuesto o si se cargan al inicio módulos que deben importarse en diferido.
+
+Uso:
+    python startup_check.py [--budget-ms 250] [--top 10]
+
+Módulos relacionados:
+- main.py: Punto de entrada cuyo arranque se mide
+- pdf_extractor_app.py: Difiere las importaciones pesadas hasta su primer uso
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+# Módulo que se importa para medir el arranque
+STARTUP_MODULE = "pdf_extractor_app"
+
+# Presupuesto de importación por defecto en milisegundos
+DEFAULT_BUDGET_MS = 250
+
+# Paquetes que solo deben cargarse al procesar o exportar
+DEFERRED_MODULES = ["fitz", "pymupdf", "pandas", "openpyxl", "pyarrow"]
+
+
+def measure_import_times(module_name=STARTUP_MODULE):
+    """
+    Importa un módulo en un proceso nuevo y recoge los tiempos de importación.
+
+    Args:
+        module_name (str): Módulo a importar
+
+    Returns:
+        list: Tuplas (módulo, tiempo propio en µs, tiempo acumulado en µs)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"No se pudo importar {module_name}:\n{result.stderr}")
+
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        timings.append((name.strip(), int(self_us), int(cumulative_us)))
+    return timings
+
+
+def check_startup(budget_ms=DEFAULT_BUDGET_MS, top=10):
+    """
+    Comprueba el presupuesto de arranque e imprime un resumen.
+
+    Args:
+        budget_ms (int): Tiempo máximo de importación permitido en milisegundos
+        top (int): Número de módulos más costosos a mostrar
+
+    Returns:
+        bool: True si el arranque cumple el presupuesto y no carga módulos diferidos
+    """
+    timings = measure_import_times()
+    total_us = next((cumulative for name, _, cumulative in timings if name == STARTUP_MODULE), 0)
+
+    print(f"Tiempo de importación de {STARTUP_MODULE}: {total_us / 1000:.1f} ms "
+          f"(presupuesto: {budget_ms} ms)")
+    print("Módulos con mayor tiempo propio:")
+    for name, self_us, _ in sorted(timings, key=lambda t: t[1], reverse=True)[:top]:
+        print(f"  {self_us / 1000:8.1f} ms  {name}")
+
+    loaded = {name.split(".")[0] for name, _, _ in timings}
+    eager_modules = [module for module in DEFERRED_MODULES if module in loaded]
+
+    success = True
+    if eager_modules:
+        print(f"ERROR: módulos cargados al inicio que deberían ser diferidos: {', '.join(eager_modules)}")
+        success = False
+    if total_us > budget_ms * 1000:
+        print("ERROR: el tiempo de importación supera el presupuesto")
+        success = False
+    return success
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verifica el tiempo de arranque de la aplicación")
+    parser.add_argument("--budget-ms", type=int, default=DEFAULT_BUDGET_MS,
+                        help="Tiempo máximo de importación en milisegundos")
+    parser.add_argument("--top", type=int, default=10,
+                        help="Número de módulos más costosos a mostrar")
+    args = parser.parse_args()
+    sys.exit(0 if check_startup(args.budget_ms, args.top) else 1)
@@ -0,0 +1,114 @@
+# test_pdf_pipeline.py
+
+"""
+Pruebas del destino con memoria acotada de pdf_pipeline.py.
+
+Ejecutar con:
+    python -m pytest -q test_pdf_pipeline.py
+
+Módulos relacionados:
+- pdf_pipeline.py: ResultSink y SinkStage
+- memory_benchmark.py: Genera las filas sintéticas
+"""
+
+import gc
+import tracemalloc
+import pandas as pd
+import pytest
+from pdf_pipeline import ResultSink, SinkStage
+from memory_benchmark import synthetic_rows
+
+# Límite de memoria de las pruebas (2 MB); cada lote produce varias veces más datos
+MEMORY_LIMIT = 2 * 1024 * 1024
+
+# Columna que solo aparece en los últimos reportes del lote
+LATE_COLUMN = "Cierre de gestión (2)"
+
+
+def _rows(count):
+    """Genera las filas una a una, para que el lote completo nunca esté en memoria"""
+    for i in range(count):
+        row = synthetic_rows(1, seed=i)[0]
+        row["Nombre del Archivo"] = f"reporte_{i:07d}.pdf"
+        row["Correlativo"] = f"C-{i}"
+        if i == count - 1:
+            row[LATE_COLUMN] = "Cerrada"
+        yield row
+
+
+def _run_stage(count, tmp_path, **sink_options):
+    """
+    Pasa count filas por SinkStage midiendo el pico de memoria de Python.
+
+    Returns:
+        tuple: (sink, resultado de finish(), pico de tracemalloc en bytes)
+    """
+    sink = ResultSink(spill_dir=str(tmp_path), **sink_options)
+    stage = SinkStage(sink)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        stage.start()
+        for row in _rows(count):
+            stage.put(row)
+        result_df = stage.finish()
+        _, traced_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return sink, result_df, traced_peak
+
+
+def test_memory_ceiling_holds_whatever_the_batch_size(tmp_path):
+    # Con columnas de objetos todo el resultado es memoria de Python que
+    # tracemalloc ve; sin el límite, el lote grande ocuparía varias veces más
+    peaks = {}
+    for count in (1500, 4500):
+        sink, result_df, traced_peak = _run_stage(count, tmp_path, memory_limit=MEMORY_LIMIT,
+                                                  arrow_strings=False)
+        try:
+            assert result_df is None
+            assert sink.peak_memory <= MEMORY_LIMIT
+            spilled_df = pd.read_parquet(sink.spill_path)
+            assert len(spilled_df) == count
+            assert spilled_df[LATE_COLUMN].notna().sum() == 1
+        finally:
+            sink.discard()
+        peaks[count] = traced_peak
+
+    # El pico no crece con el tamaño del lote
+    assert peaks[4500] < peaks[1500] * 1.5
+    assert peaks[4500] < 4 * MEMORY_LIMIT
+
+
+def test_queued_and_pending_rows_count_towards_the_limit():
+    sink = ResultSink(memory_limit=MEMORY_LIMIT, chunk_rows=10)
+    stage = SinkStage(sink, queue_size=1000)
+    rows = synthetic_rows(5)
+    for row in rows:
+        stage.put(row)
+    # El hilo del destino no se inició: todo está en la cola
+    assert sink.queued_memory > 0
+    assert sink.pending_memory() == sink.queued_memory
+    stage.start()
+    result_df = stage.finish()
+    assert sink.queued_memory == 0
+    assert sink.rows_memory == 0
+    assert len(result_df) == len(rows)
+
+
+@pytest.mark.parametrize("memory_limit", [float("inf"), 1])
+def test_columns_from_later_chunks_are_kept(tmp_path, memory_limit):
+    sink = ResultSink(memory_limit=memory_limit, chunk_rows=2, spill_dir=str(tmp_path))
+    for row in _rows(5):
+        sink.add(row)
+    result_df = sink.finish()
+    try:
+        if result_df is None:
+            assert len(sink.spill_parts) == 1
+            result_df = pd.read_parquet(sink.spill_path)
+        assert len(result_df) == 5
+        assert result_df[LATE_COLUMN].tolist()[-1] == "Cerrada"
+        assert result_df[LATE_COLUMN].isna().sum() == 4
+        assert list(result_df.columns)[0] == "Nombre del Archivo"
+    finally:
+        sink.discard()
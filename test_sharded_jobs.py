@@ -0,0 +1,96 @@
+# test_sharded_jobs.py
+
+"""
+Pruebas del procesamiento distribuido de sharded_jobs.py con trabajadores
+locales sobre una carpeta de trabajo temporal.
+
+Ejecutar con:
+    python -m pytest -q test_sharded_jobs.py
+
+Módulos relacionados:
+- sharded_jobs.py: Fragmentos, reclamos, trabajadores y combinación
+- extraction_api.py: Extrae los reportes de cada PDF
+"""
+
+import os
+import fitz
+import pandas as pd
+import pytest
+from constants import FILE_PATH_COLUMN, REPORT_INDEX_COLUMN
+from sharded_jobs import (init_job, claim_shard, run_local, job_status, merge_results,
+                          read_failed)
+
+# Segundos sin latido tras los que se recupera el reclamo abandonado
+STALE_SECONDS = 0.5
+
+
+def _write_report_pdf(path, number):
+    """Crea un PDF de texto con un reporte F-COM mínimo"""
+    lines = ["F-COM - Reporte de servicio",
+             "Fecha de Reporte", "2024-03-01",
+             "Correlativo", f"C-{number}",
+             "Nombre del Afiliado", f"Comercio {number}",
+             "Esta serie fue", "Instalada",
+             "Número de Serie", f"SN{number}",
+             "Revisión General en cualquier visita", "Todo correcto"]
+    document = fitz.open()
+    document.new_page().insert_text((40, 40), "\n".join(lines), fontsize=9)
+    document.save(path)
+    document.close()
+
+
+@pytest.fixture
+def pdf_files(tmp_path):
+    """Seis PDFs válidos y uno dañado, en orden"""
+    pdf_dir = tmp_path / "pdfs"
+    pdf_dir.mkdir()
+    paths = []
+    for number in range(6):
+        path = str(pdf_dir / f"reporte_{number}.pdf")
+        _write_report_pdf(path, number)
+        paths.append(path)
+    broken_path = pdf_dir / "dañado.pdf"
+    broken_path.write_bytes(b"no es un PDF")
+    return paths, str(broken_path)
+
+
+def test_local_workers_recover_abandoned_claim(tmp_path, pdf_files):
+    valid_paths, broken_path = pdf_files
+    job_dir = str(tmp_path / "trabajo")
+    assert init_job(job_dir, valid_paths + [broken_path], shard_size=2) == 4
+
+    # Un trabajador que reclama un fragmento y se cae sin escribir latidos
+    shard_name, _ = claim_shard(job_dir, "equipo-caido")
+    assert shard_name == "shard_00001.json"
+
+    exit_codes = run_local(job_dir, 2, stale_seconds=STALE_SECONDS, poll_seconds=0.1)
+    assert exit_codes == [0, 0]
+    assert job_status(job_dir) == {"pending": 0, "claimed": 0, "done": 4, "results": 4, "failed": 1}
+
+    result_df = merge_results(job_dir)
+    expected = sorted(os.path.abspath(path) for path in valid_paths)
+    assert sorted(result_df[FILE_PATH_COLUMN].astype(str)) == expected
+    assert result_df[FILE_PATH_COLUMN].is_unique
+    assert pd.api.types.is_integer_dtype(result_df[REPORT_INDEX_COLUMN])
+
+    # El PDF dañado no desaparece: merge_results lo informa con su error
+    failed = read_failed(job_dir)
+    assert [entry["path"] for entry in failed] == [os.path.abspath(broken_path)]
+    assert failed[0]["error"]
+
+
+def test_job_without_reports_keeps_the_full_schema(tmp_path, pdf_files):
+    valid_paths, broken_path = pdf_files
+    full_dir = str(tmp_path / "completo")
+    init_job(full_dir, valid_paths[:1])
+    run_local(full_dir, 1, poll_seconds=0.1)
+
+    empty_dir = str(tmp_path / "vacio")
+    init_job(empty_dir, [broken_path])
+    run_local(empty_dir, 1, poll_seconds=0.1)
+
+    full_df = merge_results(full_dir)
+    empty_df = merge_results(empty_dir)
+    assert len(empty_df) == 0
+    assert list(empty_df.columns) == list(full_df.columns)
+    assert pd.api.types.is_integer_dtype(empty_df[REPORT_INDEX_COLUMN])